@@ -2,8 +2,8 @@ import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import { Plus } from "lucide-react";
 import { useState } from "react";
 import { useTranslation } from "react-i18next";
-import type { Company, CustomFieldDefinition, CustomFieldMetadata, DataTypeEnum } from "~/lib/api/kompello";
-import { KompelloApi } from "~/lib/api/kompelloApi";
+import type { Company, CustomFieldDefinition, CustomFieldDefinitionRead, CustomFieldMetadata, DataTypeEnum } from "~/lib/api/kompello";
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi";
 import { Card, CardAction, CardContent, CardDescription, CardHeader, CardTitle } from "../ui/card";
 import { Button } from "../ui/button";
 import { Skeleton } from "../ui/skeleton";
@@ -33,7 +33,7 @@ export default function CompanyCustomFieldsSettings({ company }: { company: Comp
     const { t } = useTranslation();
     const queryClient = useQueryClient();
     const [dialogOpen, setDialogOpen] = useState(false);
-    const [editingField, setEditingField] = useState<CustomFieldDefinition | null>(null);
+    const [editingField, setEditingField] = useState<CustomFieldDefinitionRead | null>(null);
 
     const metadataQuery = useQuery({
         queryKey: ["custom-fields", "metadata"],
@@ -43,7 +43,7 @@ export default function CompanyCustomFieldsSettings({ company }: { company: Comp
     const fieldsQuery = useQuery({
         queryKey: ["custom-fields", company.uuid],
         queryFn: async () => {
-            const result = await KompelloApi.customFieldsApi.customFieldsList();
+            const result = await fetchAllPages((cursor) => KompelloApi.customFieldsApi.customFieldsList({ cursor }));
             return result.filter((field) => field.company === company.uuid);
         },
     });
@@ -95,12 +95,12 @@ export default function CompanyCustomFieldsSettings({ company }: { company: Comp
         setDialogOpen(true);
     }
 
-    function openEditDialog(field: CustomFieldDefinition) {
+    function openEditDialog(field: CustomFieldDefinitionRead) {
         setEditingField(field);
         setDialogOpen(true);
     }
 
-    async function handleDelete(field: CustomFieldDefinition) {
+    async function handleDelete(field: CustomFieldDefinitionRead) {
         await deleteMutation.mutateAsync(field.uuid);
     }
 
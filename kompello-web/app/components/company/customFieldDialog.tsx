@@ -3,7 +3,7 @@ import { useEffect, useMemo, useState, type ReactNode } from "react";
 import { useForm } from "react-hook-form";
 import { useTranslation } from "react-i18next";
 import z from "zod";
-import type { CustomFieldDefinition, CustomFieldMetadata } from "~/lib/api/kompello";
+import type { CustomFieldDefinitionRead, CustomFieldMetadata } from "~/lib/api/kompello";
 import {
     Dialog,
     DialogContent,
@@ -50,7 +50,7 @@ type CustomFieldDialogProps = {
     onOpenChange: (open: boolean) => void;
     trigger: ReactNode;
     metadata?: CustomFieldMetadata;
-    editingField: CustomFieldDefinition | null;
+    editingField: CustomFieldDefinitionRead | null;
     isSaving: boolean;
     onSubmit: (values: CustomFieldFormValues) => Promise<void>;
 };
@@ -1,18 +1,18 @@
 import { useState } from "react";
 import { Pencil, Trash2 } from "lucide-react";
 import { useTranslation } from "react-i18next";
-import type { CustomFieldDefinition } from "~/lib/api/kompello";
+import type { CustomFieldDefinitionRead } from "~/lib/api/kompello";
 import { Badge } from "../ui/badge";
 import { Button } from "../ui/button";
 import { TableCell, TableRow } from "../ui/table";
 import { Popover, PopoverContent, PopoverTrigger } from "../ui/popover";
 
 type CustomFieldRowProps = {
-    field: CustomFieldDefinition;
+    field: CustomFieldDefinitionRead;
     modelLabel: string | number;
     dataTypeLabel: string | number;
-    onEdit: (field: CustomFieldDefinition) => void;
-    onDelete: (field: CustomFieldDefinition) => void;
+    onEdit: (field: CustomFieldDefinitionRead) => void;
+    onDelete: (field: CustomFieldDefinitionRead) => void;
     disableDelete?: boolean;
 };
 
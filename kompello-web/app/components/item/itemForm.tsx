@@ -4,7 +4,7 @@ import { useForm } from "react-hook-form";
 import { useTranslation } from "react-i18next";
 import z from "zod";
 import type { Item, PatchedItem } from "~/lib/api/kompello";
-import { KompelloApi } from "~/lib/api/kompelloApi";
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi";
 import { useImperativeHandle, useEffect, useState } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "~/components/ui/card";
 import { Form, FormControl, FormField, FormItem, FormLabel, FormMessage } from "~/components/ui/form";
@@ -99,11 +99,11 @@ export default function ItemForm({ item, companyId, onSavingChange, ref }: ItemF
         const fetchData = async () => {
             try {
                 const [currenciesData, unitsData] = await Promise.all([
-                    KompelloApi.currenciesApi.currenciesList({ company: companyId }),
-                    KompelloApi.unitsApi.unitsList({ company: companyId }),
+                    fetchAllPages((cursor) => KompelloApi.currenciesApi.currenciesList({ company: companyId, cursor })),
+                    fetchAllPages((cursor) => KompelloApi.unitsApi.unitsList({ company: companyId, cursor })),
                 ]);
-                setCurrencies(Array.isArray(currenciesData) ? currenciesData : []);
-                setUnits(Array.isArray(unitsData) ? unitsData : []);
+                setCurrencies(currenciesData);
+                setUnits(unitsData);
             } catch (error) {
                 console.error("Error fetching currencies/units:", error);
             }
@@ -15,7 +15,7 @@ import {
     PopoverTrigger,
 } from "~/components/ui/popover"
 import { useQuery } from '@tanstack/react-query'
-import { KompelloApi } from "~/lib/api/kompelloApi"
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi"
 import { Skeleton } from "./ui/skeleton"
 import type { User } from "~/lib/api/kompello"
 import { useState } from "react"
@@ -37,7 +37,7 @@ export function UserSelectInput({ onChange }: { onChange: (value: User | null) =
     const userQuery = useQuery({
         queryKey: ["users"],
         queryFn: async () => {
-            const members = await KompelloApi.userApi.usersList();
+            const members = await fetchAllPages((cursor) => KompelloApi.userApi.usersList({ cursor }));
             return members;
         }
     })
@@ -16,6 +16,7 @@
 import * as runtime from '../runtime';
 import type {
   Company,
+  PaginatedCompanyList,
   PatchedCompany,
   PatchedUuidList,
   User,
@@ -23,6 +24,8 @@ import type {
 import {
     CompanyFromJSON,
     CompanyToJSON,
+    PaginatedCompanyListFromJSON,
+    PaginatedCompanyListToJSON,
     PatchedCompanyFromJSON,
     PatchedCompanyToJSON,
     PatchedUuidListFromJSON,
@@ -39,6 +42,11 @@ export interface CompaniesDestroyRequest {
     uuid: string;
 }
 
+export interface CompaniesListRequest {
+    cursor?: string;
+    pageSize?: number;
+}
+
 export interface CompaniesPartialUpdateRequest {
     uuid: string;
     patchedCompany?: Omit<PatchedCompany, 'uuid'|'logo'|'created_on'|'modified_on'>;
@@ -144,9 +152,17 @@ export class CompaniesApi extends runtime.BaseAPI {
 
     /**
      */
-    async companiesListRaw(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<Company>>> {
+    async companiesListRaw(requestParameters: CompaniesListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedCompanyList>> {
         const queryParameters: any = {};
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -159,13 +175,13 @@ export class CompaniesApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(CompanyFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedCompanyListFromJSON(jsonValue));
     }
 
     /**
      */
-    async companiesList(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<Company>> {
-        const response = await this.companiesListRaw(initOverrides);
+    async companiesList(requestParameters: CompaniesListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedCompanyList> {
+        const response = await this.companiesListRaw(requestParameters, initOverrides);
         return await response.value();
     }
 
@@ -16,11 +16,14 @@
 import * as runtime from '../runtime';
 import type {
   Currency,
+  PaginatedCurrencyList,
   PatchedCurrency,
 } from '../models/index';
 import {
     CurrencyFromJSON,
     CurrencyToJSON,
+    PaginatedCurrencyListFromJSON,
+    PaginatedCurrencyListToJSON,
     PatchedCurrencyFromJSON,
     PatchedCurrencyToJSON,
 } from '../models/index';
@@ -35,6 +38,8 @@ export interface CurrenciesDestroyRequest {
 
 export interface CurrenciesListRequest {
     company?: string;
+    cursor?: string;
+    pageSize?: number;
 }
 
 export interface CurrenciesPartialUpdateRequest {
@@ -133,13 +138,21 @@ export class CurrenciesApi extends runtime.BaseAPI {
     /**
      * List currencies from companies the user is a member of.
      */
-    async currenciesListRaw(requestParameters: CurrenciesListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<Currency>>> {
+    async currenciesListRaw(requestParameters: CurrenciesListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedCurrencyList>> {
         const queryParameters: any = {};
 
         if (requestParameters['company'] != null) {
             queryParameters['company'] = requestParameters['company'];
         }
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -152,13 +165,13 @@ export class CurrenciesApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(CurrencyFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedCurrencyListFromJSON(jsonValue));
     }
 
     /**
      * List currencies from companies the user is a member of.
      */
-    async currenciesList(requestParameters: CurrenciesListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<Currency>> {
+    async currenciesList(requestParameters: CurrenciesListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedCurrencyList> {
         const response = await this.currenciesListRaw(requestParameters, initOverrides);
         return await response.value();
     }
@@ -18,6 +18,7 @@ import type {
   CustomFieldDefinition,
   CustomFieldDefinitionRead,
   CustomFieldMetadata,
+  PaginatedCustomFieldDefinitionReadList,
   PatchedCustomFieldDefinition,
 } from '../models/index';
 import {
@@ -27,6 +28,8 @@ import {
     CustomFieldDefinitionReadToJSON,
     CustomFieldMetadataFromJSON,
     CustomFieldMetadataToJSON,
+    PaginatedCustomFieldDefinitionReadListFromJSON,
+    PaginatedCustomFieldDefinitionReadListToJSON,
     PatchedCustomFieldDefinitionFromJSON,
     PatchedCustomFieldDefinitionToJSON,
 } from '../models/index';
@@ -45,6 +48,11 @@ export interface CustomFieldsForModelListRequest {
     showInUi?: boolean;
 }
 
+export interface CustomFieldsListRequest {
+    cursor?: string;
+    pageSize?: number;
+}
+
 export interface CustomFieldsPartialUpdateRequest {
     uuid: string;
     patchedCustomFieldDefinition?: Omit<PatchedCustomFieldDefinition, 'uuid'|'created_on'|'modified_on'>;
@@ -191,9 +199,17 @@ export class CustomFieldsApi extends runtime.BaseAPI {
 
     /**
      */
-    async customFieldsListRaw(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<CustomFieldDefinition>>> {
+    async customFieldsListRaw(requestParameters: CustomFieldsListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedCustomFieldDefinitionReadList>> {
         const queryParameters: any = {};
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -206,13 +222,13 @@ export class CustomFieldsApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(CustomFieldDefinitionFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedCustomFieldDefinitionReadListFromJSON(jsonValue));
     }
 
     /**
      */
-    async customFieldsList(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<CustomFieldDefinition>> {
-        const response = await this.customFieldsListRaw(initOverrides);
+    async customFieldsList(requestParameters: CustomFieldsListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedCustomFieldDefinitionReadList> {
+        const response = await this.customFieldsListRaw(requestParameters, initOverrides);
         return await response.value();
     }
 
@@ -16,14 +16,14 @@
 import * as runtime from '../runtime';
 import type {
   Customer,
-  CustomerList,
+  PaginatedCustomerListList,
   PatchedCustomer,
 } from '../models/index';
 import {
     CustomerFromJSON,
     CustomerToJSON,
-    CustomerListFromJSON,
-    CustomerListToJSON,
+    PaginatedCustomerListListFromJSON,
+    PaginatedCustomerListListToJSON,
     PatchedCustomerFromJSON,
     PatchedCustomerToJSON,
 } from '../models/index';
@@ -38,7 +38,9 @@ export interface CustomersDestroyRequest {
 
 export interface CustomersListRequest {
     company?: string;
+    cursor?: string;
     isActive?: boolean;
+    pageSize?: number;
 }
 
 export interface CustomersPartialUpdateRequest {
@@ -137,17 +139,25 @@ export class CustomersApi extends runtime.BaseAPI {
     /**
      * List customers from companies the user is a member of.
      */
-    async customersListRaw(requestParameters: CustomersListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<CustomerList>>> {
+    async customersListRaw(requestParameters: CustomersListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedCustomerListList>> {
         const queryParameters: any = {};
 
         if (requestParameters['company'] != null) {
             queryParameters['company'] = requestParameters['company'];
         }
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
         if (requestParameters['isActive'] != null) {
             queryParameters['is_active'] = requestParameters['isActive'];
         }
 
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -160,13 +170,13 @@ export class CustomersApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(CustomerListFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedCustomerListListFromJSON(jsonValue));
     }
 
     /**
      * List customers from companies the user is a member of.
      */
-    async customersList(requestParameters: CustomersListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<CustomerList>> {
+    async customersList(requestParameters: CustomersListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedCustomerListList> {
         const response = await this.customersListRaw(requestParameters, initOverrides);
         return await response.value();
     }
@@ -16,14 +16,14 @@
 import * as runtime from '../runtime';
 import type {
   Item,
-  ItemList,
+  PaginatedItemListList,
   PatchedItem,
 } from '../models/index';
 import {
     ItemFromJSON,
     ItemToJSON,
-    ItemListFromJSON,
-    ItemListToJSON,
+    PaginatedItemListListFromJSON,
+    PaginatedItemListListToJSON,
     PatchedItemFromJSON,
     PatchedItemToJSON,
 } from '../models/index';
@@ -38,6 +38,8 @@ export interface ItemsDestroyRequest {
 
 export interface ItemsListRequest {
     company?: string;
+    cursor?: string;
+    pageSize?: number;
 }
 
 export interface ItemsPartialUpdateRequest {
@@ -136,13 +138,21 @@ export class ItemsApi extends runtime.BaseAPI {
     /**
      * List items from companies the user is a member of.
      */
-    async itemsListRaw(requestParameters: ItemsListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<ItemList>>> {
+    async itemsListRaw(requestParameters: ItemsListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedItemListList>> {
         const queryParameters: any = {};
 
         if (requestParameters['company'] != null) {
             queryParameters['company'] = requestParameters['company'];
         }
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -155,13 +165,13 @@ export class ItemsApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(ItemListFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedItemListListFromJSON(jsonValue));
     }
 
     /**
      * List items from companies the user is a member of.
      */
-    async itemsList(requestParameters: ItemsListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<ItemList>> {
+    async itemsList(requestParameters: ItemsListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedItemListList> {
         const response = await this.itemsListRaw(requestParameters, initOverrides);
         return await response.value();
     }
@@ -15,10 +15,13 @@
 
 import * as runtime from '../runtime';
 import type {
+  PaginatedUnitList,
   PatchedUnit,
   Unit,
 } from '../models/index';
 import {
+    PaginatedUnitListFromJSON,
+    PaginatedUnitListToJSON,
     PatchedUnitFromJSON,
     PatchedUnitToJSON,
     UnitFromJSON,
@@ -35,6 +38,8 @@ export interface UnitsDestroyRequest {
 
 export interface UnitsListRequest {
     company?: string;
+    cursor?: string;
+    pageSize?: number;
 }
 
 export interface UnitsPartialUpdateRequest {
@@ -133,13 +138,21 @@ export class UnitsApi extends runtime.BaseAPI {
     /**
      * List units from companies the user is a member of.
      */
-    async unitsListRaw(requestParameters: UnitsListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<Unit>>> {
+    async unitsListRaw(requestParameters: UnitsListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedUnitList>> {
         const queryParameters: any = {};
 
         if (requestParameters['company'] != null) {
             queryParameters['company'] = requestParameters['company'];
         }
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -152,13 +165,13 @@ export class UnitsApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(UnitFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedUnitListFromJSON(jsonValue));
     }
 
     /**
      * List units from companies the user is a member of.
      */
-    async unitsList(requestParameters: UnitsListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<Unit>> {
+    async unitsList(requestParameters: UnitsListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedUnitList> {
         const response = await this.unitsListRaw(requestParameters, initOverrides);
         return await response.value();
     }
@@ -15,11 +15,14 @@
 
 import * as runtime from '../runtime';
 import type {
+  PaginatedUserList,
   Password,
   PatchedUser,
   User,
 } from '../models/index';
 import {
+    PaginatedUserListFromJSON,
+    PaginatedUserListToJSON,
     PasswordFromJSON,
     PasswordToJSON,
     PatchedUserFromJSON,
@@ -36,6 +39,11 @@ export interface UsersDestroyRequest {
     uuid: string;
 }
 
+export interface UsersListRequest {
+    cursor?: string;
+    pageSize?: number;
+}
+
 export interface UsersPartialUpdateRequest {
     uuid: string;
     patchedUser?: Omit<PatchedUser, 'uuid'|'created_on'|'modified_on'>;
@@ -132,9 +140,17 @@ export class UsersApi extends runtime.BaseAPI {
 
     /**
      */
-    async usersListRaw(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<Array<User>>> {
+    async usersListRaw(requestParameters: UsersListRequest, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<runtime.ApiResponse<PaginatedUserList>> {
         const queryParameters: any = {};
 
+        if (requestParameters['cursor'] != null) {
+            queryParameters['cursor'] = requestParameters['cursor'];
+        }
+
+        if (requestParameters['pageSize'] != null) {
+            queryParameters['page_size'] = requestParameters['pageSize'];
+        }
+
         const headerParameters: runtime.HTTPHeaders = {};
 
         if (this.configuration && (this.configuration.username !== undefined || this.configuration.password !== undefined)) {
@@ -147,13 +163,13 @@ export class UsersApi extends runtime.BaseAPI {
             query: queryParameters,
         }, initOverrides);
 
-        return new runtime.JSONApiResponse(response, (jsonValue) => jsonValue.map(UserFromJSON));
+        return new runtime.JSONApiResponse(response, (jsonValue) => PaginatedUserListFromJSON(jsonValue));
     }
 
     /**
      */
-    async usersList(initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<Array<User>> {
-        const response = await this.usersListRaw(initOverrides);
+    async usersList(requestParameters: UsersListRequest = {}, initOverrides?: RequestInit | runtime.InitOverrideFunction): Promise<PaginatedUserList> {
+        const response = await this.usersListRaw(requestParameters, initOverrides);
         return await response.value();
     }
 
@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { Company } from './Company';
+import {
+    CompanyFromJSON,
+    CompanyFromJSONTyped,
+    CompanyToJSON,
+    CompanyToJSONTyped,
+} from './Company';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedCompanyList
+ */
+export interface PaginatedCompanyList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCompanyList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCompanyList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<Company>}
+     * @memberof PaginatedCompanyList
+     */
+    results: Array<Company>;
+}
+
+/**
+ * Check if a given object implements the PaginatedCompanyList interface.
+ */
+export function instanceOfPaginatedCompanyList(value: object): value is PaginatedCompanyList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedCompanyListFromJSON(json: any): PaginatedCompanyList {
+    return PaginatedCompanyListFromJSONTyped(json, false);
+}
+
+export function PaginatedCompanyListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedCompanyList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(CompanyFromJSON)),
+    };
+}
+
+export function PaginatedCompanyListToJSON(json: any): PaginatedCompanyList {
+    return PaginatedCompanyListToJSONTyped(json, false);
+}
+
+export function PaginatedCompanyListToJSONTyped(value?: PaginatedCompanyList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(CompanyToJSON)),
+    };
+}
+
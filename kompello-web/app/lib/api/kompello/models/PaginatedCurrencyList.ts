@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { Currency } from './Currency';
+import {
+    CurrencyFromJSON,
+    CurrencyFromJSONTyped,
+    CurrencyToJSON,
+    CurrencyToJSONTyped,
+} from './Currency';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedCurrencyList
+ */
+export interface PaginatedCurrencyList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCurrencyList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCurrencyList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<Currency>}
+     * @memberof PaginatedCurrencyList
+     */
+    results: Array<Currency>;
+}
+
+/**
+ * Check if a given object implements the PaginatedCurrencyList interface.
+ */
+export function instanceOfPaginatedCurrencyList(value: object): value is PaginatedCurrencyList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedCurrencyListFromJSON(json: any): PaginatedCurrencyList {
+    return PaginatedCurrencyListFromJSONTyped(json, false);
+}
+
+export function PaginatedCurrencyListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedCurrencyList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(CurrencyFromJSON)),
+    };
+}
+
+export function PaginatedCurrencyListToJSON(json: any): PaginatedCurrencyList {
+    return PaginatedCurrencyListToJSONTyped(json, false);
+}
+
+export function PaginatedCurrencyListToJSONTyped(value?: PaginatedCurrencyList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(CurrencyToJSON)),
+    };
+}
+
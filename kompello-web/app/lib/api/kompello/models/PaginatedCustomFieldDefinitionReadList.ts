@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { CustomFieldDefinitionRead } from './CustomFieldDefinitionRead';
+import {
+    CustomFieldDefinitionReadFromJSON,
+    CustomFieldDefinitionReadFromJSONTyped,
+    CustomFieldDefinitionReadToJSON,
+    CustomFieldDefinitionReadToJSONTyped,
+} from './CustomFieldDefinitionRead';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedCustomFieldDefinitionReadList
+ */
+export interface PaginatedCustomFieldDefinitionReadList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCustomFieldDefinitionReadList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCustomFieldDefinitionReadList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<CustomFieldDefinitionRead>}
+     * @memberof PaginatedCustomFieldDefinitionReadList
+     */
+    results: Array<CustomFieldDefinitionRead>;
+}
+
+/**
+ * Check if a given object implements the PaginatedCustomFieldDefinitionReadList interface.
+ */
+export function instanceOfPaginatedCustomFieldDefinitionReadList(value: object): value is PaginatedCustomFieldDefinitionReadList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedCustomFieldDefinitionReadListFromJSON(json: any): PaginatedCustomFieldDefinitionReadList {
+    return PaginatedCustomFieldDefinitionReadListFromJSONTyped(json, false);
+}
+
+export function PaginatedCustomFieldDefinitionReadListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedCustomFieldDefinitionReadList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(CustomFieldDefinitionReadFromJSON)),
+    };
+}
+
+export function PaginatedCustomFieldDefinitionReadListToJSON(json: any): PaginatedCustomFieldDefinitionReadList {
+    return PaginatedCustomFieldDefinitionReadListToJSONTyped(json, false);
+}
+
+export function PaginatedCustomFieldDefinitionReadListToJSONTyped(value?: PaginatedCustomFieldDefinitionReadList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(CustomFieldDefinitionReadToJSON)),
+    };
+}
+
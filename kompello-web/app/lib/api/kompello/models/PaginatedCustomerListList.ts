@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { CustomerList } from './CustomerList';
+import {
+    CustomerListFromJSON,
+    CustomerListFromJSONTyped,
+    CustomerListToJSON,
+    CustomerListToJSONTyped,
+} from './CustomerList';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedCustomerListList
+ */
+export interface PaginatedCustomerListList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCustomerListList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedCustomerListList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<CustomerList>}
+     * @memberof PaginatedCustomerListList
+     */
+    results: Array<CustomerList>;
+}
+
+/**
+ * Check if a given object implements the PaginatedCustomerListList interface.
+ */
+export function instanceOfPaginatedCustomerListList(value: object): value is PaginatedCustomerListList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedCustomerListListFromJSON(json: any): PaginatedCustomerListList {
+    return PaginatedCustomerListListFromJSONTyped(json, false);
+}
+
+export function PaginatedCustomerListListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedCustomerListList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(CustomerListFromJSON)),
+    };
+}
+
+export function PaginatedCustomerListListToJSON(json: any): PaginatedCustomerListList {
+    return PaginatedCustomerListListToJSONTyped(json, false);
+}
+
+export function PaginatedCustomerListListToJSONTyped(value?: PaginatedCustomerListList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(CustomerListToJSON)),
+    };
+}
+
@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { ItemList } from './ItemList';
+import {
+    ItemListFromJSON,
+    ItemListFromJSONTyped,
+    ItemListToJSON,
+    ItemListToJSONTyped,
+} from './ItemList';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedItemListList
+ */
+export interface PaginatedItemListList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedItemListList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedItemListList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<ItemList>}
+     * @memberof PaginatedItemListList
+     */
+    results: Array<ItemList>;
+}
+
+/**
+ * Check if a given object implements the PaginatedItemListList interface.
+ */
+export function instanceOfPaginatedItemListList(value: object): value is PaginatedItemListList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedItemListListFromJSON(json: any): PaginatedItemListList {
+    return PaginatedItemListListFromJSONTyped(json, false);
+}
+
+export function PaginatedItemListListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedItemListList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(ItemListFromJSON)),
+    };
+}
+
+export function PaginatedItemListListToJSON(json: any): PaginatedItemListList {
+    return PaginatedItemListListToJSONTyped(json, false);
+}
+
+export function PaginatedItemListListToJSONTyped(value?: PaginatedItemListList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(ItemListToJSON)),
+    };
+}
+
@@ -0,0 +1,90 @@
+/* tslint:disable */
+/* eslint-disable */
+/**
+ * Kompello Server API
+ * Kompello API Documentation
+ *
+ * The version of the OpenAPI document: 1.0.0
+ * 
+ *
+ * NOTE: This class is auto generated by OpenAPI Generator (https://openapi-generator.tech).
+ * https://openapi-generator.tech
+ * Do not edit the class manually.
+ */
+
+import { mapValues } from '../runtime';
+import type { Unit } from './Unit';
+import {
+    UnitFromJSON,
+    UnitFromJSONTyped,
+    UnitToJSON,
+    UnitToJSONTyped,
+} from './Unit';
+
+/**
+ * 
+ * @export
+ * @interface PaginatedUnitList
+ */
+export interface PaginatedUnitList {
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedUnitList
+     */
+    next?: string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof PaginatedUnitList
+     */
+    previous?: string | null;
+    /**
+     * 
+     * @type {Array<Unit>}
+     * @memberof PaginatedUnitList
+     */
+    results: Array<Unit>;
+}
+
+/**
+ * Check if a given object implements the PaginatedUnitList interface.
+ */
+export function instanceOfPaginatedUnitList(value: object): value is PaginatedUnitList {
+    if (!('results' in value) || value['results'] === undefined) return false;
+    return true;
+}
+
+export function PaginatedUnitListFromJSON(json: any): PaginatedUnitList {
+    return PaginatedUnitListFromJSONTyped(json, false);
+}
+
+export function PaginatedUnitListFromJSONTyped(json: any, ignoreDiscriminator: boolean): PaginatedUnitList {
+    if (json == null) {
+        return json;
+    }
+    return {
+        
+        'next': json['next'] == null ? undefined : json['next'],
+        'previous': json['previous'] == null ? undefined : json['previous'],
+        'results': ((json['results'] as Array<any>).map(UnitFromJSON)),
+    };
+}
+
+export function PaginatedUnitListToJSON(json: any): PaginatedUnitList {
+    return PaginatedUnitListToJSONTyped(json, false);
+}
+
+export function PaginatedUnitListToJSONTyped(value?: PaginatedUnitList | null, ignoreDiscriminator: boolean = false): any {
+    if (value == null) {
+        return value;
+    }
+
+    return {
+        
+        'next': value['next'],
+        'previous': value['previous'],
+        'results': ((value['results'] as Array<any>).map(UnitToJSON)),
+    };
+}
+
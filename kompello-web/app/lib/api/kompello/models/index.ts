@@ -14,6 +14,13 @@ export * from './DataTypeEnum';
 export * from './Item';
 export * from './ItemList';
 export * from './ModelTypeChoice';
+export * from './PaginatedCompanyList';
+export * from './PaginatedCurrencyList';
+export * from './PaginatedCustomFieldDefinitionReadList';
+export * from './PaginatedCustomerListList';
+export * from './PaginatedItemListList';
+export * from './PaginatedUnitList';
+export * from './PaginatedUserList';
 export * from './Password';
 export * from './PatchedCompany';
 export * from './PatchedCurrency';
@@ -72,6 +72,19 @@ class KompelloApiImpl {
 
 const kompelloApi = new KompelloApiImpl();
 
+// List endpoints are paginated with cursors, this follows the next links and returns the rows of all pages
+async function fetchAllPages<T>(fetchPage: (cursor?: string) => Promise<{ results: Array<T>; next?: string | null }>): Promise<Array<T>> {
+    const results: Array<T> = [];
+    let cursor: string | undefined = undefined;
+    do {
+        const page = await fetchPage(cursor);
+        results.push(...page.results);
+        cursor = page.next ? new URL(page.next).searchParams.get("cursor") ?? undefined : undefined;
+    } while (cursor);
+    return results;
+}
+
 export {
     kompelloApi as KompelloApi,
+    fetchAllPages,
 };
\ No newline at end of file
@@ -3,7 +3,7 @@ import { Button } from "~/components/ui/button"
 import type { Route } from "./+types/appEntry"
 import { useTitle } from "~/components/titleContext"
 import { useEffect } from "react"
-import { KompelloApi } from "~/lib/api/kompelloApi"
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi"
 import type { Company } from "~/lib/api/kompello"
 import { Card, CardHeader, CardTitle, CardDescription, CardContent } from "~/components/ui/card"
 import { useNavigate } from "react-router-dom"
@@ -29,7 +29,7 @@ export default function Home() {
     const query = useQuery({ 
         queryKey: ["companies"],
         queryFn: async () => {
-            const companyData = await KompelloApi.companyApi.companiesList();
+            const companyData = await fetchAllPages((cursor) => KompelloApi.companyApi.companiesList({ cursor }));
             return companyData;
         }
     })
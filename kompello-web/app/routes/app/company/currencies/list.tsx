@@ -4,7 +4,7 @@ import { useOutletContext, useNavigate } from "react-router";
 import type { Company } from "~/lib/api/kompello";
 import { useTranslation } from "react-i18next";
 import { useQuery } from "@tanstack/react-query";
-import { KompelloApi } from "~/lib/api/kompelloApi";
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi";
 import { Button } from "~/components/ui/button";
 import { Plus } from "lucide-react";
 import {
@@ -32,10 +32,10 @@ export default function CurrenciesList() {
     const { data: currenciesData, isLoading, error } = useQuery({
         queryKey: ["currencies", company.uuid],
         queryFn: async () => {
-            const result = await KompelloApi.currenciesApi.currenciesList({
+            return fetchAllPages((cursor) => KompelloApi.currenciesApi.currenciesList({
                 company: company.uuid,
-            });
-            return Array.isArray(result) ? result : [];
+                cursor,
+            }));
         },
     });
 
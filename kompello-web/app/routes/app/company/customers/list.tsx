@@ -4,7 +4,7 @@ import { useOutletContext, useNavigate } from "react-router";
 import type { Company } from "~/lib/api/kompello";
 import { useTranslation } from "react-i18next";
 import { useQuery } from "@tanstack/react-query";
-import { KompelloApi } from "~/lib/api/kompelloApi";
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi";
 import { Button } from "~/components/ui/button";
 import { Badge } from "~/components/ui/badge";
 import { Plus } from "lucide-react";
@@ -33,10 +33,10 @@ export default function CustomersList() {
     const { data: customersData, isLoading, error } = useQuery({
         queryKey: ["customers", company.uuid],
         queryFn: async () => {
-            const result = await KompelloApi.customersApi.customersList({
+            return fetchAllPages((cursor) => KompelloApi.customersApi.customersList({
                 company: company.uuid,
-            });
-            return Array.isArray(result) ? result : [];
+                cursor,
+            }));
         },
     });
 
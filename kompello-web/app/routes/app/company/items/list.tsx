@@ -4,7 +4,7 @@ import { useOutletContext, useNavigate } from "react-router";
 import type { Company } from "~/lib/api/kompello";
 import { useTranslation } from "react-i18next";
 import { useQuery } from "@tanstack/react-query";
-import { KompelloApi } from "~/lib/api/kompelloApi";
+import { fetchAllPages, KompelloApi } from "~/lib/api/kompelloApi";
 import { Button } from "~/components/ui/button";
 import { Plus } from "lucide-react";
 import {
@@ -32,10 +32,10 @@ export default function ItemsList() {
     const { data: itemsData, isLoading, error } = useQuery({
         queryKey: ["items", company.uuid],
         queryFn: async () => {
-            const result = await KompelloApi.itemsApi.itemsList({
+            return fetchAllPages((cursor) => KompelloApi.itemsApi.itemsList({
                 company: company.uuid,
-            });
-            return Array.isArray(result) ? result : [];
+                cursor,
+            }));
         },
     });
 
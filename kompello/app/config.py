@@ -1,13 +1,18 @@
 import json
+import os
 from pathlib import Path
 
 CONFIG_PATH = 'config.json'
+# Every key can be overridden by an environment variable, e.g. KOMPELLO_DATABASE_HOST
+ENV_PREFIX = 'KOMPELLO_'
 
 
 class SystemConfig:
     """
     Singleton class to manage system configuration.
     This class loads configuration from a JSON file and provides access to its data.
+    Environment variables named ENV_PREFIX + key take precedence over the file, their values are
+    parsed as JSON where possible (so "5432", "true" and "null" become numbers, booleans and None).
     """
 
     def __init__(self):
@@ -22,7 +27,13 @@ class SystemConfig:
         pass
 
     def get(self, key, default=None):
-        return self._data[key]
+        value = os.environ.get(ENV_PREFIX + key)
+        if value is not None:
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        return self._data.get(key, default)
 
 
 CONFIG = SystemConfig()
@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import copy
 import mimetypes
 from pathlib import Path
 from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from kompello.app.config import CONFIG
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 
@@ -66,7 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'auditlog.middleware.AuditlogMiddleware',
+    'kompello.core.middleware.AuditlogMiddleware',
     'allauth.account.middleware.AccountMiddleware',
 ]
 
@@ -99,13 +101,126 @@ WSGI_APPLICATION = 'kompello.app.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE selects "sqlite" (default, BASE_DIR / db.sqlite3) or "postgresql".
+# PostgreSQL needs psycopg 3, and psycopg_pool if DATABASE_POOL is enabled.
+
+DATABASE_ENGINE = CONFIG.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': CONFIG.get('DATABASE_NAME') or BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # None keeps Django's DEFERRED transactions. "IMMEDIATE" starts every transaction.atomic()
+                # block, read-only ones included, with the write lock, so concurrent writers wait for each
+                # other (busy_timeout) instead of failing with "database is locked" when a read in the
+                # transaction is followed by a write. Pragmas: kompello.core.sqlite_profile
+                'transaction_mode': CONFIG.get('SQLITE_TRANSACTION_MODE'),
+            },
+        }
+    }
+elif DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': str(CONFIG.get('DATABASE_NAME') or 'kompello'),
+            'USER': str(CONFIG.get('DATABASE_USER', 'kompello')),
+            'PASSWORD': str(CONFIG.get('DATABASE_PASSWORD', '')),
+            'HOST': str(CONFIG.get('DATABASE_HOST', 'localhost')),
+            'PORT': str(CONFIG.get('DATABASE_PORT', 5432)),
+            # Seconds a connection is reused across requests (0 closes it after every request)
+            'CONN_MAX_AGE': CONFIG.get('DATABASE_CONN_MAX_AGE', 60),
+            # Ping reused connections before a request so that dropped connections don't fail it
+            'CONN_HEALTH_CHECKS': CONFIG.get('DATABASE_CONN_HEALTH_CHECKS', True),
+            'OPTIONS': {},
+        }
     }
+    if CONFIG.get('DATABASE_POOL', False):
+        # A psycopg_pool connection pool per worker process, connections go back to the pool
+        # after every request, so Django's own persistent connections must be disabled
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': CONFIG.get('DATABASE_POOL_MIN_SIZE', 2),
+            'max_size': CONFIG.get('DATABASE_POOL_MAX_SIZE', 10),
+            # Seconds a request waits for a free connection before failing
+            'timeout': CONFIG.get('DATABASE_POOL_TIMEOUT', 10),
+        }
+else:
+    raise ImproperlyConfigured(f'Unsupported DATABASE_ENGINE "{DATABASE_ENGINE}", use "sqlite" or "postgresql".')
+
+# Read replicas: every entry of DATABASE_REPLICAS overrides settings of the primary, e.g.
+# [{"HOST": "replica-1"}] or [{"NAME": "/var/lib/kompello/replica.sqlite3"}], and becomes the alias
+# replica_<n>. Safe API requests read from them, see kompello.core.db_router. In tests they mirror
+# the primary test database.
+DATABASE_REPLICAS = []
+for index, overrides in enumerate(CONFIG.get('DATABASE_REPLICAS', []), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**copy.deepcopy(DATABASES['default']), **overrides, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+# Seconds a user's reads stay on the primary after a write request
+DATABASE_REPLICA_STICKY_SECONDS = CONFIG.get('DATABASE_REPLICA_STICKY_SECONDS', 5)
+
+DATABASE_ROUTERS = ['kompello.core.db_router.ReplicaRouter']
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHE_BACKEND selects the backend of every alias: "locmem" (default, per worker process), "file"
+# (a directory per alias in CACHE_LOCATION, default BASE_DIR / cache), "database" (a table per alias
+# named CACHE_LOCATION_<alias>, create them with `manage.py createcachetable`) or "redis"
+# (CACHE_LOCATION is the URL of Redis or a compatible server such as Valkey, needs redis-py).
+# Aliases: "default" (memberships, custom field definitions, autocomplete versions, replica
+# stickiness), "responses" (kompello.core.response_cache) and "sessions" (SESSION_CACHE).
+# CACHE_ALIASES overrides BACKEND, LOCATION, TIMEOUT, MAX_ENTRIES and CULL_FREQUENCY per alias,
+# e.g. {"responses": {"MAX_ENTRIES": 20000}}. MAX_ENTRIES and CULL_FREQUENCY (1/n of the entries is
+# evicted when the cache is full) don't apply to Redis, which evicts by its maxmemory-policy.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'database': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
 }
+# Keeps deployments that share a cache server apart
+CACHE_KEY_PREFIX = CONFIG.get('CACHE_KEY_PREFIX', 'kompello')
+
+CACHES = {}
+_cache_aliases = CONFIG.get('CACHE_ALIASES', {})
+for alias in dict.fromkeys(['default', 'responses', 'sessions', *_cache_aliases]):
+    overrides = _cache_aliases.get(alias, {})
+    backend = overrides.get('BACKEND', CONFIG.get('CACHE_BACKEND', 'locmem'))
+    if backend not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(f'Unsupported cache backend "{backend}", use one of {", ".join(CACHE_BACKENDS)}.')
+    location = CONFIG.get('CACHE_LOCATION')
+    if 'LOCATION' in overrides:
+        location = overrides['LOCATION']
+    elif backend == 'locmem':
+        location = f'kompello-{alias}'
+    elif backend == 'file':
+        location = str(Path(location or BASE_DIR / 'cache') / alias)
+    elif backend == 'database':
+        location = f'{location or "kompello_cache"}_{alias}'
+    elif backend == 'redis':
+        location = location or 'redis://localhost:6379/0'
+    CACHES[alias] = {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'LOCATION': location,
+        'KEY_PREFIX': f'{CACHE_KEY_PREFIX}:{alias}',
+        'TIMEOUT': overrides.get('TIMEOUT', CONFIG.get('CACHE_TIMEOUT', 300)),
+    }
+    if backend != 'redis':
+        CACHES[alias]['OPTIONS'] = {
+            'MAX_ENTRIES': overrides.get('MAX_ENTRIES', CONFIG.get('CACHE_MAX_ENTRIES', 10000)),
+            'CULL_FREQUENCY': overrides.get('CULL_FREQUENCY', CONFIG.get('CACHE_CULL_FREQUENCY', 3)),
+        }
+
+# SESSION_CACHE keeps sessions in the "sessions" cache in front of the database (cached_db), so
+# that requests don't read django_session. Only enable it with a cache shared by all workers,
+# a per-process cache would keep a session alive in other workers after logout.
+if CONFIG.get('SESSION_CACHE', False):
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sessions'
 
 
 # Password validation
@@ -159,7 +274,9 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'kompello.core.pagination.KeysetPagination',
+    'PAGE_SIZE': CONFIG.get('API_PAGE_SIZE', 50),
 }
 
 SPECTACULAR_SETTINGS = {
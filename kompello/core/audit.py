@@ -0,0 +1,352 @@
+"""
+Audit log of all HistoryModel subclasses, written in batches.
+
+auditlog's own receivers INSERT a log entry as soon as an object is saved and read the stored
+row again before every update to diff against it. The HistoryModel subclasses are registered in
+a registry of their own instead, whose receivers build the LogEntry objects without touching the
+database. Objects loaded inside a batch_log_entries() block keep the values they were loaded
+with (HistoryModel.from_db) and their updates are diffed against those; for all other objects
+the stored row is read before the update, like auditlog does. Values are compared as auditlog
+records them (auditlog.diff.get_field_value).
+
+A log entry is handed over when the transaction of its change commits (and dropped with the
+change on a rollback) to the enclosing batch_log_entries() block, which AuditlogMiddleware opens
+around every request. The block writes all its entries with one bulk_create when it ends and
+attributes them to its actor and remote address. Outside of a block every entry is written on
+its own, like auditlog does. Entries of objects that belong to a company are also written to
+the company's activity feed (CompanyLogEntry).
+
+Values changed in place after loading (a dict of a JSONField updated item by item) look
+unchanged to the diff, assign a new value instead. QuerySet.update() and bulk_create() send no
+signals, write paths using them record their changes with log_changes().
+
+Custom field values are recorded as updates of the object they belong to, with one
+"custom_fields.<key>" change per value, and only if their definition has track_history. The
+flag is read from the cached definitions (kompello.core.custom_field_registry), so values of
+untracked definitions are written without reading or writing anything for the audit log.
+CustomFieldMixin writes values with bulk_create and bulk_update and records them with
+log_custom_field_changes(), single values are recorded by the receivers of value_registry.
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache, partial
+from types import SimpleNamespace
+
+from auditlog.cid import get_cid
+from auditlog.context import auditlog_disabled
+from auditlog.diff import get_field_value, mask_str
+from auditlog.models import DEFAULT_OBJECT_REPR, LogEntry
+from auditlog.registry import AuditlogModelRegistry
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.encoding import smart_str
+
+from kompello.core.custom_field_registry import find_definition, get_definition_set
+from kompello.core.models.audit_models import CompanyLogEntry
+from kompello.core.models.base_models import HistoryModel, keep_loaded_values
+from kompello.core.models.company_models import Company
+from kompello.core.models.custom_field_models import CustomFieldInstance
+
+CUSTOM_FIELD_CHANGE = "custom_fields.{key}"
+
+_batch = ContextVar("kompello_log_entry_batch", default=None)
+# Stands in for the old value of a field that was neither loaded nor saved
+_UNKNOWN = object()
+
+
+class LogEntryBatch:
+    """Log entries of committed changes, written by flush() with one bulk_create."""
+
+    def __init__(self, actor=None, remote_addr=None):
+        self.actor = actor
+        self.remote_addr = remote_addr
+        self.entries = []
+
+    def flush(self) -> None:
+        entries, self.entries = self.entries, []
+        if entries:
+            with transaction.atomic():
+                LogEntry.objects.bulk_create(entries)
+                CompanyLogEntry.objects.bulk_create(_company_entries(entries))
+
+
+@contextmanager
+def batch_log_entries(actor=None, remote_addr=None):
+    """
+    Collect the log entries of the changes committed in the block and write them at its end.
+
+    Blocks inside another one add to the outer batch. The block has to enclose the transactions
+    of the changes, entries of transactions committed after it ends are written one by one.
+
+    Args:
+        actor: User the entries are attributed to
+        remote_addr: IP address the changes came from
+    """
+    batch = _batch.get()
+    if batch is not None:
+        yield batch
+        return
+    batch = LogEntryBatch(actor, remote_addr)
+    token = _batch.set(batch)
+    loading_token = keep_loaded_values.set(True)
+    try:
+        yield batch
+    finally:
+        keep_loaded_values.reset(loading_token)
+        _batch.reset(token)
+        batch.flush()
+
+
+def _company_entries(entries) -> list:
+    """The activity feed rows of the saved log entries of objects of a company."""
+    return [
+        CompanyLogEntry(
+            log_entry=entry,
+            company_id=entry._company_id,
+            actor_id=entry.actor_id,
+            timestamp=entry.timestamp,
+            object_uuid=entry._object_uuid,
+        )
+        for entry in entries
+        if entry._company_id is not None
+    ]
+
+
+def _collect(entry) -> None:
+    batch = _batch.get()
+    if batch is None:
+        with transaction.atomic():
+            # save() lets auditlog's set_actor() fill in the actor
+            entry.save()
+            CompanyLogEntry.objects.bulk_create(_company_entries([entry]))
+    else:
+        batch.entries.append(entry)
+
+
+def log_changes(instance, action, changes: dict, using=None) -> None:
+    """
+    Hand over a log entry for a change of the object once its transaction commits. The receivers
+    call this for saves and deletes; write paths that send no signals call it themselves.
+
+    Args:
+        instance: The changed object
+        action: LogEntry.Action of the change
+        changes: {field name: [old, new]} as recorded by auditlog, values as strings
+        using: Alias of the database the change was written to
+    """
+    batch = _batch.get()
+    pk = instance.pk
+    try:
+        object_repr = smart_str(instance)
+    except ObjectDoesNotExist:
+        object_repr = DEFAULT_OBJECT_REPR
+    entry = LogEntry(
+        content_type_id=ContentType.objects.get_for_model(instance).id,
+        object_pk=smart_str(pk),
+        object_id=pk if isinstance(pk, int) else None,
+        object_repr=object_repr,
+        action=action,
+        changes=changes,
+        cid=get_cid(),
+    )
+    # For the activity feed, see _company_entries()
+    entry._company_id = instance.pk if isinstance(instance, Company) else getattr(instance, "company_id", None)
+    entry._object_uuid = getattr(instance, "uuid", None)
+    if batch is not None:
+        entry.actor_id = getattr(batch.actor, "pk", None)
+        entry.remote_addr = batch.remote_addr
+    transaction.on_commit(partial(_collect, entry), using=using)
+
+
+@cache
+def _tracked_fields(model) -> list:
+    """(field, masked) of the concrete fields of a registered model whose changes are recorded."""
+    options = registry.get_model_fields(model)
+    return [
+        (field, field.name in options["mask_fields"])
+        for field in model._meta.concrete_fields
+        if (not options["include_fields"] or field.name in options["include_fields"])
+        and field.name not in options["exclude_fields"]
+    ]
+
+
+def _changes(fields, old: dict | None, new: dict | None) -> dict:
+    """
+    The {field name: [old, new]} changes between two states ({attname: value}) of an object,
+    None standing for no object.
+    """
+    changes = {}
+    # get_field_value() reads foreign keys by their attname and all other fields by their name
+    old_state = None if old is None else SimpleNamespace(**old)
+    new_state = None if new is None else SimpleNamespace(**new)
+    for field, masked in fields:
+        old_value = None if old is None else old.get(field.attname, _UNKNOWN)
+        new_value = None if new is None else new[field.attname]
+        if old_value is _UNKNOWN or old_value == new_value:
+            continue
+        old_text = smart_str(get_field_value(old_state, field))
+        new_text = smart_str(get_field_value(new_state, field))
+        if old_text != new_text:
+            changes[field.name] = [mask_str(old_text), mask_str(new_text)] if masked else [old_text, new_text]
+    return changes
+
+
+def _loaded_state(instance) -> dict | None:
+    loaded = instance._loaded_values
+    if isinstance(loaded, tuple):
+        loaded = instance._loaded_values = dict(zip(*loaded))
+    return loaded
+
+
+def _enabled(raw) -> bool:
+    return not auditlog_disabled.get(False) and not (raw and settings.AUDITLOG_DISABLE_ON_RAW_SAVE)
+
+
+def _saved_fields(sender, update_fields) -> list:
+    fields = _tracked_fields(sender)
+    if update_fields is None:
+        return fields
+    return [(field, masked) for field, masked in fields if field.name in update_fields or field.attname in update_fields]
+
+
+def load_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    """Read the stored values of an object before an update if they were not loaded with it."""
+    # New objects with a primary key given may still update a row
+    if instance.pk is None or instance._loaded_values is not None or not _enabled(raw):
+        return
+    attnames = [field.attname for field, _ in _saved_fields(sender, update_fields)]
+    row = sender._base_manager.using(using).filter(pk=instance.pk).values(*attnames).first()
+    instance._loaded_values = row
+
+
+def log_save(sender, instance, created, raw=False, using=None, update_fields=None, **kwargs):
+    """Record the fields set on a new object or changed by an update."""
+    if not _enabled(raw):
+        return
+    fields = _saved_fields(sender, update_fields)
+    new = {field.attname: getattr(instance, field.attname) for field, _ in fields}
+    old = None if created else _loaded_state(instance)
+    changes = _changes(fields, old, new) if created or old is not None else {}
+    # The next update of the object is diffed against the saved values
+    instance._loaded_values = new if created or old is None else old | new
+    if changes:
+        log_changes(instance, LogEntry.Action.CREATE if created else LogEntry.Action.UPDATE, changes, using)
+
+
+def log_delete(sender, instance, using=None, **kwargs):
+    """Record the values of a deleted object."""
+    if instance.pk is None or not _enabled(False):
+        return
+    fields = _tracked_fields(sender)
+    changes = _changes(fields, {field.attname: getattr(instance, field.attname) for field, _ in fields}, None)
+    log_changes(instance, LogEntry.Action.DELETE, changes, using)
+
+
+def _value_text(value) -> str:
+    return "None" if value is None else json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder)
+
+
+def log_custom_field_changes(obj, changes, using=None) -> None:
+    """
+    Record changed custom field values of an object as one update of the object, skipping the
+    values of definitions without track_history. For write paths that send no signals
+    (bulk_create, bulk_update), single saves and deletes are recorded by value_registry.
+
+    Args:
+        obj: The object the values belong to
+        changes: (definition, old value, new value) per changed value, None standing for no value
+        using: Alias of the database the values were written to
+    """
+    if not _enabled(False):
+        return
+    recorded = {}
+    for definition, old, new in changes:
+        if definition.track_history:
+            old_text, new_text = _value_text(old), _value_text(new)
+            if old_text != new_text:
+                recorded[CUSTOM_FIELD_CHANGE.format(key=definition.key)] = [old_text, new_text]
+    if recorded:
+        log_changes(obj, LogEntry.Action.UPDATE, recorded, using)
+
+
+def _value_definition(instance):
+    """The current definition of a custom field value, from the cached definitions."""
+    definition = find_definition(instance.custom_field_id, instance.content_type_id)
+    if definition is None:
+        # No set containing the definition was compiled in this process yet, save() has loaded it
+        definition = instance.custom_field
+        definition_set = get_definition_set(definition.company_id, instance.content_type_id)
+        definition = definition_set.by_id.get(definition.id, definition)
+    return definition
+
+
+def load_value_state(sender, instance, raw=False, using=None, **kwargs):
+    """Read the stored value before an update of a tracked value if it was not loaded with it."""
+    if instance.pk is None or instance._loaded_values is not None or not _enabled(raw):
+        return
+    if _value_definition(instance).track_history:
+        instance._loaded_values = sender._base_manager.using(using).filter(pk=instance.pk).values("value").first()
+
+
+def log_value_save(sender, instance, created, raw=False, using=None, **kwargs):
+    """Record a new or changed value of a tracked definition on the object it belongs to."""
+    if not _enabled(raw):
+        return
+    old = None if created else _loaded_state(instance)
+    # The next update of the value is diffed against the saved one
+    instance._loaded_values = (old or {}) | {"value": instance.value}
+    old_value = None if created else (old or {}).get("value", _UNKNOWN)
+    if old_value is _UNKNOWN:
+        return
+    definition = _value_definition(instance)
+    if definition.track_history and instance.content_object is not None:
+        log_custom_field_changes(instance.content_object, [(definition, old_value, instance.value)], using)
+
+
+def log_value_delete(sender, instance, using=None, **kwargs):
+    """Record a deleted value of a tracked definition on the object it belongs to."""
+    if instance.pk is None or not _enabled(False):
+        return
+    definition = _value_definition(instance)
+    if definition.track_history and instance.content_object is not None:
+        log_custom_field_changes(instance.content_object, [(definition, instance.value, None)], using)
+
+
+registry = AuditlogModelRegistry(
+    create=False,
+    update=False,
+    delete=False,
+    access=False,
+    m2m=False,
+    custom={pre_save: load_state, post_save: log_save, post_delete: log_delete},
+)
+value_registry = AuditlogModelRegistry(
+    create=False,
+    update=False,
+    delete=False,
+    access=False,
+    m2m=False,
+    custom={pre_save: load_value_state, post_save: log_value_save, post_delete: log_value_delete},
+)
+
+
+def register_history_models() -> None:
+    """Register all HistoryModel subclasses, called from CoreConfig.ready()."""
+    for model in apps.get_models():
+        if not issubclass(model, HistoryModel) or registry.contains(model) or value_registry.contains(model):
+            continue
+        if model is CustomFieldInstance:
+            value_registry.register(model, include_fields=["value"])
+        else:
+            registry.register(
+                model,
+                exclude_fields=list(model.history_exclude_fields),
+                mask_fields=list(model.history_mask_fields),
+            )
@@ -0,0 +1,207 @@
+"""
+In-process prefix indexes for autocompleting item and customer names.
+
+Each index holds the normalized names of one company's items or active customers in a sorted
+list, so a lookup is a binary search followed by a short scan and never touches the database.
+Indexes are built lazily on first use and kept in an LRU over companies (AUTOCOMPLETE_MAX_COMPANIES).
+
+Like the custom field registry, every index has a version token in Django's cache. Saves and
+deletes (signal handlers in kompello.core.signals) patch the index of the writing worker in place
+and replace the token once the transaction commits, which makes every other worker rebuild its copy
+on its next lookup. Writes that bypass signals call invalidate_autocomplete().
+"""
+
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from kompello.app.config import CONFIG
+from kompello.core.models.billing_models import Item
+from kompello.core.models.customer_models import Customer
+
+VERSION_KEY = "autocomplete:version:{company_id}:{kind}"
+CACHE_TIMEOUT = CONFIG.get("AUTOCOMPLETE_CACHE_TIMEOUT", 3600)
+MAX_COMPANIES = CONFIG.get("AUTOCOMPLETE_MAX_COMPANIES", 200)
+
+ITEMS = "items"
+CUSTOMERS = "customers"
+
+_indexes = OrderedDict()  # company_id -> {kind: PrefixIndex}, least recently used first
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    uuid: str
+    label: str
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form of a name ("  Müller " -> "muller")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def item_names(item) -> tuple[str, list[str]]:
+    return item.name, [item.name]
+
+
+def customer_names(customer) -> tuple[str, list[str]]:
+    """Customers are found by "firstname lastname" as well as by "lastname firstname"."""
+    label = customer.get_full_name()
+    return label, [label, f"{customer.lastname} {customer.firstname}"]
+
+
+# Model, row filter, loaded fields and name extraction per kind
+SOURCES = {
+    ITEMS: (Item, {}, ["uuid", "name"], item_names),
+    CUSTOMERS: (Customer, {"is_active": True}, ["uuid", "firstname", "lastname"], customer_names),
+}
+
+
+class PrefixIndex:
+    """Sorted (normalized name, uuid, label) entries of one company and kind."""
+
+    __slots__ = ("version", "entries", "keys_by_uuid")
+
+    def __init__(self, version, rows=()):
+        self.version = version
+        self.entries = []
+        self.keys_by_uuid = {}
+        for uuid, label, names in rows:
+            self._add(uuid, label, names)
+        self.entries.sort()
+
+    def _keys(self, uuid, names) -> set[str]:
+        keys = self.keys_by_uuid[uuid] = {normalize(name) for name in names} - {""}
+        return keys
+
+    def _add(self, uuid, label, names):
+        self.entries.extend((key, uuid, label) for key in self._keys(uuid, names))
+
+    def put(self, uuid, label, names) -> None:
+        self.remove(uuid)
+        for key in self._keys(uuid, names):
+            insort(self.entries, (key, uuid, label))
+
+    def remove(self, uuid) -> None:
+        for key in self.keys_by_uuid.pop(uuid, ()):
+            position = bisect_left(self.entries, (key, uuid))
+            while position < len(self.entries) and self.entries[position][:2] == (key, uuid):
+                del self.entries[position]
+
+    def lookup(self, prefix: str, limit: int) -> list[Suggestion]:
+        """Return up to limit distinct objects with a name starting with the normalized prefix, alphabetically."""
+        prefix = normalize(prefix)
+        entries = self.entries
+        suggestions = {}
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(suggestions) < limit:
+            key, uuid, label = entries[position]
+            if not key.startswith(prefix):
+                break
+            suggestions.setdefault(uuid, Suggestion(uuid, label))
+            position += 1
+        return list(suggestions.values())
+
+
+def suggest(kind: str, company_id: int, prefix: str, limit: int = 10) -> list[Suggestion]:
+    """
+    Return the items or active customers of a company whose name starts with the prefix.
+
+    Args:
+        kind: ITEMS or CUSTOMERS
+        company_id: ID of the company to search in
+        prefix: Start of the name, case and accents are ignored
+        limit: Maximum number of suggestions
+    """
+    return get_index(kind, company_id).lookup(prefix, limit)
+
+
+def get_index(kind: str, company_id: int) -> PrefixIndex:
+    """Return the up-to-date index of a company, (re)building it if needed."""
+    version_key = VERSION_KEY.format(company_id=company_id, kind=kind)
+    version = cache.get(version_key)
+    with _lock:
+        company_indexes = _indexes.get(company_id)
+        if company_indexes is not None:
+            _indexes.move_to_end(company_id)
+            index = company_indexes.get(kind)
+            if index is not None and version is not None and index.version == version:
+                return index
+
+    if version is None:
+        version = uuid4().hex
+        cache.set(version_key, version, CACHE_TIMEOUT)
+
+    model, filters, fields, names = SOURCES[kind]
+    rows = []
+    for obj in model.objects.filter(company_id=company_id, **filters).only(*fields):
+        label, obj_names = names(obj)
+        rows.append((str(obj.uuid), label, obj_names))
+    index = PrefixIndex(version, rows)
+
+    with _lock:
+        _indexes.setdefault(company_id, {})[kind] = index
+        _indexes.move_to_end(company_id)
+        while len(_indexes) > MAX_COMPANIES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def update_autocomplete(kind: str, obj, deleted: bool = False) -> None:
+    """
+    Apply a saved or deleted object to the index of this worker and hand out a new version to the
+    other workers once the current transaction commits.
+    """
+    company_id = obj.company_id
+    _, filters, _, names = SOURCES[kind]
+    uuid = str(obj.uuid)
+    indexed = not deleted and all(getattr(obj, field) == value for field, value in filters.items())
+    label, obj_names = names(obj)
+
+    def apply():
+        version_key = VERSION_KEY.format(company_id=company_id, kind=kind)
+        version = cache.get(version_key)
+        if version is None:
+            # No worker has a valid index to update
+            return
+
+        new_version = uuid4().hex
+        with _lock:
+            index = _indexes.get(company_id, {}).get(kind)
+            # A stale index is rebuilt on its next lookup anyway
+            if index is not None and index.version == version:
+                if indexed:
+                    index.put(uuid, label, obj_names)
+                else:
+                    index.remove(uuid)
+                index.version = new_version
+        cache.set(version_key, new_version, CACHE_TIMEOUT)
+
+    transaction.on_commit(apply)
+
+
+def invalidate_autocomplete(company_ids) -> None:
+    """
+    Drop the indexes of the given companies in all workers (e.g. after bulk writes), right away and
+    again once the current transaction commits, so that no worker keeps an index built in between.
+    """
+    company_ids = set(company_ids)
+
+    def apply():
+        cache.delete_many([
+            VERSION_KEY.format(company_id=company_id, kind=kind) for company_id in company_ids for kind in SOURCES
+        ])
+        with _lock:
+            for company_id in company_ids:
+                _indexes.pop(company_id, None)
+
+    apply()
+    transaction.on_commit(apply)
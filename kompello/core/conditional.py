@@ -0,0 +1,96 @@
+"""
+Validators (ETag, Last-Modified) for conditional GET requests of the API.
+
+Both are computed from data the view loads anyway, before anything is serialized, so that a
+request with a matching If-None-Match (or If-Modified-Since) is answered with 304 Not Modified
+without serializing or rendering the body:
+
+- a single object: its uuid and modified_on, the modified_on of the related objects loaded with
+  select_related (which the representation may show) and the cached custom field values
+  (rewriting them sets modified_on, too, so Last-Modified follows them)
+- a list: the versions of the rows of the page (as of a single object), the links to the
+  neighbouring pages and the company scope of the user. The page is fetched before the
+  comparison, so a 304 saves serializing and rendering it but no query is added for the version
+
+ETags are strong and also cover the query string and the media type of the response, since the
+same object has different representations (sparse fieldsets, includes, browsable API).
+Responses carry "Cache-Control: private, no-cache" so that browsers revalidate every time instead
+of guessing a freshness lifetime from Last-Modified.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from kompello.core.models.custom_field_models import CustomFieldCacheModel
+
+# Depth of select_related relations that are part of an object's version
+MAX_RELATION_DEPTH = 2
+
+
+def make_etag(request, *parts) -> str:
+    """Strong ETag of the given version parts for the representation requested by the request."""
+    accepted = getattr(request, "accepted_media_type", "")
+    payload = json.dumps([request.GET.urlencode(), accepted, *parts], cls=DjangoJSONEncoder, sort_keys=True)
+    return '"' + hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest() + '"'
+
+
+def _related_objects(obj, depth: int):
+    """The related objects cached on obj by select_related, depth relations deep."""
+    if depth <= 0:
+        return
+    for name, related in sorted(obj._state.fields_cache.items()):
+        if related is not None and hasattr(related, "_state"):
+            yield name, related
+            for nested_name, nested in _related_objects(related, depth - 1):
+                yield f"{name}__{nested_name}", nested
+
+
+def object_version(obj) -> tuple[list, object]:
+    """
+    Return the version parts of a single object's representation and its last modification time.
+    """
+    modified = [obj.modified_on]
+    parts = [str(obj.uuid), obj.modified_on]
+    for name, related in _related_objects(obj, MAX_RELATION_DEPTH):
+        related_modified = getattr(related, "modified_on", None)
+        parts.append([name, related.pk, related_modified])
+        if related_modified is not None:
+            modified.append(related_modified)
+    if isinstance(obj, CustomFieldCacheModel) and "custom_fields_cache" in obj.__dict__:
+        parts.append(obj.custom_fields_cache)
+    return parts, max(modified)
+
+
+def has_modified_on(model) -> bool:
+    """Whether the model has a modified_on column that versions its rows."""
+    return any(field.name == "modified_on" for field in model._meta.concrete_fields)
+
+
+def collection_version(rows) -> list:
+    """Return the version parts of a list's rows, see object_version()."""
+    return [object_version(row)[0] for row in rows]
+
+
+def not_modified(request, etag: str, last_modified=None):
+    """
+    Return a 304 (or 412) response if the request's preconditions say the client has the current
+    representation, else None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag: str, last_modified=None):
+    """Add the ETag (and Last-Modified) to the response and make clients revalidate it before reuse."""
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,181 @@
+"""
+Cached custom field definitions per (company, content type).
+
+Every read or write that carries custom fields needs the definitions of the object's company
+and model type. They are loaded once, compiled into a DefinitionSet (key -> definition map,
+accepted value types and archived keys) and kept in two layers:
+
+- an in-process dict, so repeated lookups in the same worker don't deserialize anything
+- Django's cache framework, so other workers can share a set without hitting the database
+
+Both layers are tied to a per-company version token stored in the shared cache. The signal
+handlers in kompello.core.signals drop that token whenever a definition or company changes,
+which invalidates every set of the company in all workers at once.
+"""
+
+from collections import Counter
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from kompello.app.config import CONFIG
+from kompello.core.models.custom_field_models import CustomFieldDefinition
+
+VERSION_KEY = "custom_fields:version:{company_id}"
+DEFINITIONS_KEY = "custom_fields:definitions:{company_id}:{content_type_id}:{version}"
+CACHE_TIMEOUT = CONFIG.get("CUSTOM_FIELD_CACHE_TIMEOUT", 300)
+
+# Python types accepted for each data type, and the name used in error messages
+VALUE_TYPES = {
+    CustomFieldDefinition.FieldDataType.TEXT: ("text", (str,)),
+    CustomFieldDefinition.FieldDataType.NUMBER: ("number", (int, float)),
+    CustomFieldDefinition.FieldDataType.BOOLEAN: ("boolean", (bool,)),
+}
+
+_local_sets = {}
+# Company of every definition in a compiled set, so that a definition can be found by its ID alone
+_definition_companies = {}
+_stats = Counter()
+
+
+class DefinitionSet:
+    """
+    The compiled custom field definitions of one company and content type.
+    Shared between requests, so the contained definitions must be treated as read-only.
+    """
+
+    __slots__ = ("version", "definitions", "by_id", "archived", "value_types")
+
+    def __init__(self, version, definitions):
+        self.version = version
+        self.definitions = {definition.key: definition for definition in definitions}
+        self.by_id = {definition.id: definition for definition in definitions}
+        self.archived = frozenset(key for key, definition in self.definitions.items() if definition.is_archived)
+        self.value_types = {
+            key: VALUE_TYPES[definition.data_type]
+            for key, definition in self.definitions.items()
+            if definition.data_type in VALUE_TYPES
+        }
+
+
+def get_definition_set(company_id, content_type_id) -> DefinitionSet:
+    """
+    Return the custom field definitions of a company for one model type.
+
+    Args:
+        company_id: ID of the company the definitions belong to
+        content_type_id: ID of the model's ContentType
+    """
+    return get_definition_sets([company_id], content_type_id)[company_id]
+
+
+def get_definition_sets(company_ids, content_type_id) -> dict[int, DefinitionSet]:
+    """
+    Return the custom field definitions of several companies for one model type.
+    Definitions that are in neither cache layer are loaded with a single query.
+
+    Args:
+        company_ids: IDs of the companies to look up
+        content_type_id: ID of the model's ContentType
+
+    Returns:
+        dict: DefinitionSet per company ID
+    """
+    company_ids = set(company_ids)
+    version_keys = {company_id: VERSION_KEY.format(company_id=company_id) for company_id in company_ids}
+    cached_versions = cache.get_many(version_keys.values())
+
+    result = {}
+    versions = {}
+    for company_id in company_ids:
+        version = cached_versions.get(version_keys[company_id])
+        local = _local_sets.get((company_id, content_type_id))
+        if version is not None and local is not None and local.version == version:
+            result[company_id] = local
+        else:
+            versions[company_id] = version
+    _stats["hits"] += len(result)
+    if not versions:
+        return result
+
+    # Companies without a version get a fresh one before loading, so that an invalidation
+    # during the load below makes the loaded set unreachable instead of stale
+    new_versions = {company_id: uuid4().hex for company_id, version in versions.items() if version is None}
+    cache.set_many({version_keys[company_id]: version for company_id, version in new_versions.items()}, CACHE_TIMEOUT)
+    versions.update(new_versions)
+
+    definition_keys = {
+        company_id: DEFINITIONS_KEY.format(company_id=company_id, content_type_id=content_type_id, version=version)
+        for company_id, version in versions.items()
+    }
+    shared = cache.get_many([key for company_id, key in definition_keys.items() if company_id not in new_versions])
+    missing = [company_id for company_id, key in definition_keys.items() if key not in shared]
+
+    loaded = {company_id: [] for company_id in missing}
+    if missing:
+        definitions_qs = CustomFieldDefinition.objects.filter(
+            model_type_id=content_type_id,
+            company_id__in=missing,
+        ).select_related("company", "model_type")
+        for definition in definitions_qs:
+            loaded[definition.company_id].append(definition)
+        cache.set_many(
+            {definition_keys[company_id]: definitions for company_id, definitions in loaded.items()},
+            CACHE_TIMEOUT,
+        )
+    _stats["shared_hits"] += len(versions) - len(missing)
+    _stats["misses"] += len(missing)
+
+    for company_id, version in versions.items():
+        definitions = shared[definition_keys[company_id]] if company_id not in loaded else loaded[company_id]
+        result[company_id] = _local_sets[(company_id, content_type_id)] = DefinitionSet(version, definitions)
+        _definition_companies.update((definition.id, company_id) for definition in definitions)
+    return result
+
+
+def find_definition(definition_id, content_type_id) -> CustomFieldDefinition | None:
+    """
+    Return a definition by its ID from the current definitions of its company.
+
+    Args:
+        definition_id: ID of the CustomFieldDefinition
+        content_type_id: ID of the ContentType of the definition's model type
+
+    Returns:
+        CustomFieldDefinition: The definition, None if no set containing it was compiled
+        in this process yet or it was deleted since
+    """
+    company_id = _definition_companies.get(definition_id)
+    if company_id is None:
+        return None
+    return get_definition_set(company_id, content_type_id).by_id.get(definition_id)
+
+
+def invalidate_definition_sets(company_ids) -> None:
+    """
+    Drop the cached definitions of all model types of the given companies, now and once the
+    current transaction commits: a set loaded before the commit holds the old definitions.
+    """
+    company_ids = set(company_ids)
+    keys = [VERSION_KEY.format(company_id=company_id) for company_id in company_ids]
+
+    def apply():
+        cache.delete_many(keys)
+        for key in [key for key in _local_sets if key[0] in company_ids]:
+            _local_sets.pop(key, None)
+
+    apply()
+    transaction.on_commit(apply)
+
+
+def get_registry_stats() -> dict[str, int]:
+    """
+    Return the lookup counters of this process:
+    hits (in-process), shared_hits (shared cache) and misses (loaded from the database).
+    """
+    return {name: _stats[name] for name in ("hits", "shared_hits", "misses")}
+
+
+def reset_registry_stats() -> None:
+    _stats.clear()
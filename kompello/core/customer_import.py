@@ -0,0 +1,166 @@
+"""
+Streaming import of customers from CSV.
+
+The CSV columns are those of the customer export (kompello.core.export), so an export can be
+imported again; uuid, company, created_on and modified_on columns are ignored. Rows are read one
+at a time and handled in batches:
+
+- every row is validated with CustomerImportRowSerializer (the rules of CustomerSerializer and
+  AddressSerializer), invalid rows are reported and left out
+- rows whose natural key (e.g. the email) matches a customer of the company or an earlier row of
+  the import are skipped, so re-running an import doesn't duplicate anything
+- the addresses and customers of a batch are inserted with bulk_create in one transaction
+
+bulk_create sends no signals, so every batch updates the search index and invalidates the
+autocomplete indexes of the company itself.
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from kompello.app.config import CONFIG
+from kompello.core.autocomplete import invalidate_autocomplete
+from kompello.core.models.customer_models import Address, Customer
+from kompello.core.search import index_customers
+from kompello.core.serializers.customer_serializers import CustomerImportRowSerializer
+
+BATCH_SIZE = CONFIG.get("CUSTOMER_IMPORT_BATCH_SIZE", 1000)
+# Address columns of the customer export, "address_city" -> "city"
+ADDRESS_PREFIX = "address_"
+
+
+class ImportFileError(ValueError):
+    """The uploaded file can't be read as a customer CSV."""
+
+
+@dataclass
+class ImportProgress:
+    """Running totals of an import and the errors of the last batch (row numbers start at 1 after the header)."""
+
+    rows: int = 0
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def read_csv(file, key: str) -> csv.DictReader:
+    """
+    Return a reader over the rows of a binary CSV file, decoded as UTF-8 (with or without BOM).
+
+    Raises:
+        ImportFileError: If the file can't be decoded or its header lacks the key column
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    try:
+        columns = reader.fieldnames or []
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"The file is not a UTF-8 CSV file: {e}")
+    if key not in columns:
+        raise ImportFileError(f"Missing column: {key}.")
+    return reader
+
+
+def row_data(row: dict) -> dict:
+    """Turn a CSV row into serializer data. Empty cells are left out, the address_* cells become the address."""
+    data = {}
+    address = {}
+    for column, value in row.items():
+        if column is None or value is None or value == "":
+            continue
+        if column.startswith(ADDRESS_PREFIX):
+            address[column[len(ADDRESS_PREFIX):]] = value
+        elif column in CustomerImportRowSerializer.Meta.fields and column != "address":
+            data[column] = value
+    if address:
+        data["address"] = address
+    return data
+
+
+def import_customers(rows, company, key: str = "email", batch_size: int | None = None):
+    """
+    Import the given CSV rows as customers of the company, batch by batch.
+
+    Args:
+        rows: Iterable of {column: value} dicts, e.g. a read_csv() reader
+        company: Company the customers are imported into
+        key: Field identifying a customer, one of CustomerImportRowSerializer.key_fields
+        batch_size: Number of rows validated and inserted at a time, CUSTOMER_IMPORT_BATCH_SIZE by default
+
+    Yields:
+        ImportProgress: The totals so far and the errors of the batch, after every batch
+    """
+    batch_size = batch_size or BATCH_SIZE
+    progress = ImportProgress()
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield _import_batch(batch, company, key, progress)
+            batch = []
+    if batch or not progress.rows:
+        yield _import_batch(batch, company, key, progress)
+
+
+def _import_batch(batch, company, key, progress: ImportProgress) -> ImportProgress:
+    # One serializer validates every row, building its fields per row would cost more than the validation
+    serializer = CustomerImportRowSerializer()
+    progress.errors = []
+    valid = {}
+    for number, row in enumerate(batch, progress.rows + 1):
+        try:
+            data = serializer.run_validation(row_data(row))
+        except ValidationError as e:
+            progress.errors.append({"row": number, "errors": as_serializer_error(e)})
+            continue
+        value = data.get(key)
+        if not value:
+            progress.errors.append({"row": number, "errors": {key: ["This field is required to import the row."]}})
+            continue
+        if value in valid:
+            progress.skipped += 1
+            continue
+        valid[value] = data
+    progress.rows += len(batch)
+    progress.failed += len(progress.errors)
+
+    # Earlier batches are already inserted, so this also skips duplicates across batches
+    existing = set(Customer.objects.filter(company=company, **{f"{key}__in": list(valid)}).values_list(key, flat=True))
+    progress.skipped += len(existing)
+    rows = [data for value, data in valid.items() if value not in existing]
+    if not rows:
+        return progress
+
+    with transaction.atomic():
+        addresses = Address.objects.bulk_create(
+            [Address(**data["address"]) for data in rows if data.get("address")]
+        )
+        addresses = iter(addresses)
+        customers = Customer.objects.bulk_create(
+            [
+                Customer(
+                    **{name: value for name, value in data.items() if name != "address"},
+                    company=company,
+                    address=next(addresses) if data.get("address") else None,
+                )
+                for data in rows
+            ]
+        )
+        index_customers([customer.id for customer in customers])
+        invalidate_autocomplete([company.id])
+    progress.created += len(customers)
+    return progress
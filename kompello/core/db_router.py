@@ -0,0 +1,92 @@
+"""
+Database router that sends the reads of safe API requests to read replicas.
+
+Replicas are the aliases in settings.DATABASE_REPLICAS (configured with DATABASE_REPLICAS in
+config.json). Everything is read from and written to the primary ("default") unless a viewset
+opened a routing scope and allowed replica reads for the request (see BaseModelViewSet), which it
+does for GET/HEAD/OPTIONS requests only. Inside such a request the primary is used again:
+
+- as soon as anything is written, for the rest of the request
+- inside transaction.atomic() blocks, which need the transaction's view of the data
+- for a user who sent a write request within the last DATABASE_REPLICA_STICKY_SECONDS, so that
+  a create followed by a retrieve doesn't hit a replica that hasn't caught up yet ("read your
+  writes"). The last write is remembered in Django's cache, shared by all workers if the cache is.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_CACHE_KEY = "db_router:written:{user_id}"
+# App label of the models of the database cache backend (django.core.cache.backends.db)
+CACHE_APP_LABEL = "django_cache"
+
+# Whether reads in the current request may go to a replica
+_replica_reads = ContextVar("kompello_replica_reads", default=False)
+
+
+def pick_replica(replicas: list[str]) -> str:
+    """Return the replica alias to read from, spreading the reads evenly."""
+    return random.choice(replicas)
+
+
+@contextmanager
+def routing_scope():
+    """Read from the primary in the block unless read_from_replicas() is called, and reset afterwards."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replicas(user=None) -> bool:
+    """
+    Allow replica reads for the rest of the current routing scope.
+
+    Args:
+        user: The requesting user, whose recent writes keep the reads on the primary
+
+    Returns:
+        bool: Whether reads go to the replicas
+    """
+    if not settings.DATABASE_REPLICAS:
+        return False
+    if user is not None and user.is_authenticated and cache.get(STICKY_CACHE_KEY.format(user_id=user.id)):
+        return False
+    _replica_reads.set(True)
+    return True
+
+
+def record_write(user) -> None:
+    """Keep the user's reads on the primary for DATABASE_REPLICA_STICKY_SECONDS."""
+    timeout = settings.DATABASE_REPLICA_STICKY_SECONDS
+    if settings.DATABASE_REPLICAS and timeout and user is not None and user.is_authenticated:
+        cache.set(STICKY_CACHE_KEY.format(user_id=user.id), True, timeout)
+
+
+class ReplicaRouter:
+    """Routes reads to the replicas where the routing scope allows it, and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        # Cache tables of the database cache backend are written on reads, replicas would serve stale entries
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return pick_replica(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Later reads of the request have to see this write
+        _replica_reads.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,171 @@
+"""
+Streaming CSV and NDJSON exports of querysets.
+
+An export walks the queryset with .iterator(chunk_size=...) over a values_list() of the exported
+columns, so no model instances are built and the database driver holds one chunk of rows at a
+time. Rows are encoded into text one chunk at a time as well and handed to a StreamingHttpResponse,
+which keeps the memory of an export flat however many rows it has.
+
+Custom field values are read from the denormalized custom_fields_cache column of each row, so a
+chunk never needs a second query for them. In CSV every custom field key of the exported companies
+becomes a "cf.<key>" column, in NDJSON the values are a "custom_fields" object like in the API.
+
+Text cells of CSV exports that start with =, +, -, @, a tab or a carriage return get a leading '
+so that spreadsheet applications show them as text instead of evaluating them as formulas.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from kompello.core.models.custom_field_models import CustomFieldCacheModel, CustomFieldDefinition
+
+CUSTOM_FIELDS = "custom_fields"
+CUSTOM_FIELD_PREFIX = "cf."
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+_encoder = DjangoJSONEncoder()
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    lookup: str
+
+
+class CSVRenderer(BaseRenderer):
+    """Selects CSV exports (?format=csv) and renders error responses of an export as a CSV row."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not isinstance(data, dict):
+            data = {"detail": data}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(data.keys())
+        writer.writerow(csv_value(value) for value in data.values())
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Selects NDJSON exports (?format=ndjson), error responses are a single JSON line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+def csv_value(value):
+    """Cell value of a CSV export, formatted like the JSON API formats it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return _encoder.default(value)
+
+
+def get_custom_field_keys(queryset) -> list[str]:
+    """The custom field keys defined by the companies of the exported rows, alphabetically."""
+    return list(
+        CustomFieldDefinition.objects.filter(
+            model_type=ContentType.objects.get_for_model(queryset.model),
+            company_id__in=queryset.order_by().values("company_id"),
+        )
+        .order_by("key")
+        .values_list("key", flat=True)
+        .distinct()
+    )
+
+
+def iter_rows(queryset, columns: list[ExportColumn], chunk_size: int):
+    """
+    Yield the rows of the queryset as lists of chunk_size column value tuples.
+    Models with cached custom field values get the {key: value} dict as the last value.
+    """
+    lookups = [column.lookup for column in columns]
+    if issubclass(queryset.model, CustomFieldCacheModel):
+        lookups.append("custom_fields_cache")
+    chunk = []
+    for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(queryset, columns: list[ExportColumn], chunk_size: int):
+    """Yield the CSV export of the queryset, one chunk of rows per string."""
+    keys = get_custom_field_keys(queryset) if issubclass(queryset.model, CustomFieldCacheModel) else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    header = [column.name for column in columns]
+    if keys is not None:
+        header.extend(CUSTOM_FIELD_PREFIX + key for key in keys)
+    writer.writerow(header)
+
+    for chunk in iter_rows(queryset, columns, chunk_size):
+        for row in chunk:
+            if keys is None:
+                writer.writerow(csv_value(value) for value in row)
+            else:
+                custom_fields = row[-1] or {}
+                writer.writerow(
+                    [csv_value(value) for value in row[:-1]]
+                    + [csv_value(custom_fields.get(key)) for key in keys]
+                )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(queryset, columns: list[ExportColumn], chunk_size: int):
+    """Yield the NDJSON export of the queryset (one JSON object per line), one chunk of rows per string."""
+    names = [column.name for column in columns]
+    if issubclass(queryset.model, CustomFieldCacheModel):
+        names.append(CUSTOM_FIELDS)
+    for chunk in iter_rows(queryset, columns, chunk_size):
+        yield "".join(
+            json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + "\n" for row in chunk
+        )
+
+
+def export_response(queryset, columns: list[ExportColumn], file_format: str, filename: str, chunk_size: int):
+    """
+    Return a StreamingHttpResponse with the CSV ("csv") or NDJSON ("ndjson") export of the queryset.
+
+    Args:
+        queryset: The rows to export, in the order to export them
+        columns: The exported columns, names with the lookups of their values
+        file_format: csv or ndjson
+        filename: Name of the downloaded file, without extension
+        chunk_size: Number of rows fetched from the database and encoded at a time
+    """
+    if file_format == NDJSONRenderer.format:
+        content, content_type = iter_ndjson(queryset, columns, chunk_size), NDJSONRenderer.media_type
+    else:
+        content, content_type = iter_csv(queryset, columns, chunk_size), CSVRenderer.media_type
+    response = StreamingHttpResponse(content, content_type=f"{content_type}; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
@@ -0,0 +1,189 @@
+"""
+Filter backends for the Kompello API.
+"""
+
+from uuid import UUID
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import BooleanField, Case, F, FloatField, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from kompello.core.custom_field_registry import get_definition_sets
+from kompello.core.membership import get_company_ids
+from kompello.core.models.company_models import Company
+from kompello.core.models.custom_field_models import CustomFieldDefinition, CustomFieldInstance
+
+FieldDataType = CustomFieldDefinition.FieldDataType
+
+
+class CustomFieldFilter(BaseFilterBackend):
+    """
+    Filters and orders a list by custom field values and by the view's ordering_fields:
+
+        ?cf.max_hours__gte=40&cf.skill_level=Senior&ordering=-cf.max_hours,name
+
+    Filters become a subquery on the typed value columns of CustomFieldInstance
+    (object_id IN (SELECT ... WHERE custom_field_id IN (...) AND value_number >= 40)),
+    which is served by the (custom_field, typed value, object_id) indexes.
+    Ordering by a custom field annotates every row with its typed value; rows without a
+    value sort before all others (after them with a descending ordering).
+    """
+
+    prefix = "cf."
+    ordering_param = "ordering"
+    # Supported lookups per data type, exact is used when no lookup is given
+    lookups = {
+        FieldDataType.TEXT: {"exact", "gt", "gte", "lt", "lte", "icontains"},
+        FieldDataType.NUMBER: {"exact", "gt", "gte", "lt", "lte"},
+        FieldDataType.BOOLEAN: {"exact"},
+    }
+    # Sort value for rows without a value, combined with a has-value column so that the
+    # ordering stays total (keyset pagination can't seek over NULLs)
+    missing_values = {
+        FieldDataType.TEXT: Value("", output_field=TextField()),
+        FieldDataType.NUMBER: Value(0.0, output_field=FloatField()),
+        FieldDataType.BOOLEAN: Value(False, output_field=BooleanField()),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        filters = []
+        for param, values in request.query_params.lists():
+            if param.startswith(self.prefix):
+                key, _, lookup = param[len(self.prefix):].partition("__")
+                filters.extend((param, key, lookup or "exact", value) for value in values)
+
+        ordering = self.get_ordering(request, view)
+        keys = {key for _, key, _, _ in filters} | {
+            field.lstrip("-")[len(self.prefix):] for field in ordering if field.lstrip("-").startswith(self.prefix)
+        }
+        if not filters and not ordering:
+            return queryset
+
+        definitions = self.get_definitions(request, queryset.model, keys) if keys else {}
+
+        for param, key, lookup, value in filters:
+            queryset = queryset.filter(pk__in=self.filter_instances(param, definitions, key, lookup, value))
+
+        if ordering:
+            order_by = []
+            for index, field in enumerate(ordering):
+                name = field.lstrip("-")
+                direction = "-" if field.startswith("-") else ""
+                if not name.startswith(self.prefix):
+                    order_by.append(field)
+                    continue
+                has_value, sort_value = f"cf_has_{index}", f"cf_value_{index}"
+                queryset = queryset.annotate(**self.sort_annotations(definitions, name[len(self.prefix):], has_value, sort_value))
+                order_by.extend([f"{direction}{has_value}", f"{direction}{sort_value}"])
+            queryset = queryset.order_by(*order_by)
+        return queryset
+
+    def get_ordering(self, request, view) -> list[str]:
+        """Return the requested ordering fields, validated against the view's ordering_fields."""
+        param = request.query_params.get(self.ordering_param)
+        if not param:
+            return []
+
+        ordering = [field.strip() for field in param.split(",") if field.strip()]
+        allowed = getattr(view, "ordering_fields", [])
+        invalid = [
+            field for field in ordering
+            if not field.lstrip("-").startswith(self.prefix) and field.lstrip("-") not in allowed
+        ]
+        if invalid:
+            raise ValidationError({self.ordering_param: [f"Unsupported ordering field(s): {', '.join(invalid)}."]})
+        return ordering
+
+    def get_definitions(self, request, model, keys) -> dict[str, list[CustomFieldDefinition]]:
+        """
+        Return the definitions of the requested keys for all companies whose rows the user can see,
+        read from the cached definition sets (kompello.core.custom_field_registry).
+        """
+        # Lists that are filtered by ?company=<uuid> only need that company's definitions
+        company_uuid = request.query_params.get("company")
+        if company_uuid:
+            try:
+                company_uuid = UUID(company_uuid)
+            except ValueError:
+                raise ValidationError({"company": ["Must be a valid UUID."]})
+
+        if request.user.is_staff:
+            companies = Company.objects.filter(uuid=company_uuid) if company_uuid else Company.objects.all()
+            company_ids = companies.values_list("id", flat=True)
+        else:
+            company_ids = get_company_ids(request.user)
+
+        definitions = {key: [] for key in keys}
+        content_type_id = ContentType.objects.get_for_model(model).id
+        for definition_set in get_definition_sets(company_ids, content_type_id).values():
+            for key in keys:
+                definition = definition_set.definitions.get(key)
+                if definition is not None and (not company_uuid or definition.company.uuid == company_uuid):
+                    definitions[key].append(definition)
+
+        unknown = sorted(key for key, found in definitions.items() if not found)
+        if unknown:
+            raise ValidationError({"custom_fields": [f"Unknown custom field(s): {', '.join(unknown)}."]})
+        return definitions
+
+    def filter_instances(self, param, definitions, key, lookup, value):
+        """Return the object IDs of all instances of the key whose value matches the lookup."""
+        condition = Q()
+        for data_type, ids in self.group_by_data_type(definitions[key]).items():
+            if lookup not in self.lookups.get(data_type, ()):
+                continue
+            try:
+                parsed = self.parse_value(data_type, value)
+            except ValueError:
+                continue
+            column = CustomFieldInstance.TYPED_VALUE_FIELDS[data_type]
+            condition |= Q(custom_field_id__in=ids, **{f"{column}__{lookup}": parsed})
+
+        if not condition:
+            raise ValidationError({param: [f"Invalid value or lookup for custom field '{key}'."]})
+        return CustomFieldInstance.objects.filter(condition).values("object_id")
+
+    def sort_annotations(self, definitions, key, has_value, sort_value) -> dict:
+        """Return the annotations that sort rows by the key's typed value."""
+        data_types = self.group_by_data_type(definitions[key])
+        if len(data_types) > 1:
+            raise ValidationError({
+                self.ordering_param: [f"Custom field '{key}' has different data types, filter by company to sort by it."]
+            })
+        (data_type, ids), = data_types.items()
+
+        column = CustomFieldInstance.TYPED_VALUE_FIELDS[data_type]
+        raw_value = f"{sort_value}_raw"
+        return {
+            raw_value: Subquery(
+                CustomFieldInstance.objects.filter(custom_field_id__in=ids, object_id=OuterRef("pk")).values(column)[:1]
+            ),
+            has_value: Case(
+                When(**{f"{raw_value}__isnull": False}, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            sort_value: Coalesce(F(raw_value), self.missing_values[data_type]),
+        }
+
+    @staticmethod
+    def group_by_data_type(definitions) -> dict[int, list[int]]:
+        grouped = {}
+        for definition in definitions:
+            grouped.setdefault(definition.data_type, []).append(definition.id)
+        return grouped
+
+    @staticmethod
+    def parse_value(data_type, value):
+        """Convert a query parameter value to the Python type of the data type's column."""
+        if data_type == FieldDataType.NUMBER:
+            return float(value)
+        if data_type == FieldDataType.BOOLEAN:
+            if value.lower() in ("true", "1"):
+                return True
+            if value.lower() in ("false", "0"):
+                return False
+            raise ValueError(value)
+        return value
@@ -0,0 +1,57 @@
+"""
+Audit history of single objects and activity feeds of companies, read from the log entries of
+kompello.core.audit.
+
+Both are read newest first with HistoryPagination, a keyset pagination over (timestamp, ID),
+so that every page is one index range scan however long the history is:
+
+- the history of an object scans auditlog_logentry_history_idx on
+  (content_type, object_pk, timestamp, id) of auditlog's LogEntry table
+- the feed of a company scans the CompanyLogEntry rows written along with the log entries,
+  on (company, timestamp, log_entry) or (company, actor, timestamp, log_entry) if filtered by actor
+
+Custom field values are recorded on the object they belong to, so they show up in its history.
+"""
+
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.utils.encoding import smart_str
+
+from kompello.core.models.audit_models import CompanyLogEntry
+
+
+def _filter(queryset, actor=None, since=None, until=None):
+    if actor is not None:
+        queryset = queryset.filter(actor=actor)
+    if since is not None:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until is not None:
+        queryset = queryset.filter(timestamp__lt=until)
+    return queryset
+
+
+def object_history(instance, actor=None, since=None, until=None):
+    """
+    Return the log entries of an object, newest first.
+
+    Args:
+        instance: The object
+        actor: Only entries of changes made by this user
+        since: Only entries from this time on
+        until: Only entries before this time
+    """
+    queryset = LogEntry.objects.filter(
+        content_type_id=ContentType.objects.get_for_model(instance).id,
+        # Not auditlog's get_for_object(), which looks integer keys up by object_id
+        object_pk=smart_str(instance.pk),
+    )
+    return _filter(queryset, actor, since, until).select_related("actor").order_by("-timestamp", "-pk")
+
+
+def company_activity(company_id, actor=None, since=None, until=None):
+    """
+    Return the activity feed of a company: the CompanyLogEntry rows (with their log entry) of
+    all objects of the company, newest first. Filtered like object_history().
+    """
+    queryset = CompanyLogEntry.objects.filter(company_id=company_id)
+    return _filter(queryset, actor, since, until).select_related("log_entry__actor").order_by("-timestamp", "-pk")
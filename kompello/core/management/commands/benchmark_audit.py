@@ -0,0 +1,125 @@
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from uuid import uuid4
+
+from auditlog.cid import correlation_id
+from auditlog.context import disable_auditlog
+from auditlog.models import LogEntry
+from auditlog.registry import auditlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from kompello.core.audit import batch_log_entries, register_history_models, registry
+from kompello.core.models import Company, Currency, Item, KompelloUser, Unit
+
+MODES = ["off", "auditlog", "batched"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare write-heavy workloads without audit log, with auditlog's own receivers and with the "
+        "batched writer of kompello.core.audit: item create and update requests, and item creates, updates "
+        "and deletes made in one transaction. The changes are committed, because log entries are only "
+        "written on commit; all benchmark data and log entries are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, help="Number of items created and updated per round", default=100)
+        parser.add_argument("--rounds", type=int, help="Rounds per mode, the fastest one counts", default=3)
+
+    def handle(self, *args, **options):
+        cid = f"benchmark-{uuid4().hex}"
+        user = KompelloUser.objects.create_superuser(f"{cid}@kompello.local", f"{cid}@kompello.local", None)
+        company = Company.objects.create(name="Benchmark Company")
+        currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0], HTTP_X_CORRELATION_ID=cid)
+        client.force_login(user)
+        token = correlation_id.set(cid)
+        try:
+            self.stdout.write(f"{'mode':>9} {'request ms':>11} {'overhead':>9} {'save ms':>8} {'overhead':>9} {'entries':>8}")
+            results = {mode: [float("inf"), float("inf"), 0] for mode in MODES}
+            # Rounds alternate between the modes, so that all of them run on tables of the same size
+            for _ in range(options["rounds"]):
+                for mode in MODES:
+                    entries = LogEntry.objects.filter(cid=cid).count()
+                    with self._mode(mode):
+                        requests = self._requests(client, company, currency, unit, options["items"])
+                        saves = self._saves(company, currency, unit, options["items"])
+                    with disable_auditlog():
+                        Item.objects.filter(company=company).delete()
+                    result = results[mode]
+                    result[0], result[1] = min(result[0], requests), min(result[1], saves)
+                    result[2] = LogEntry.objects.filter(cid=cid).count() - entries
+            off = results["off"]
+            for mode, (requests, saves, entries) in results.items():
+                self.stdout.write(
+                    f"{mode:>9} {requests:>11.3f} {self._overhead(requests, off[0]):>9} "
+                    f"{saves:>8.3f} {self._overhead(saves, off[1]):>9} {entries:>8}"
+                )
+        finally:
+            correlation_id.reset(token)
+            with disable_auditlog():
+                Item.objects.filter(company=company).delete()
+                company.delete()
+                user.delete()
+            LogEntry.objects.filter(cid=cid).delete()
+
+    @staticmethod
+    @contextmanager
+    def _mode(mode):
+        if mode == "off":
+            with disable_auditlog():
+                yield
+            return
+        if mode == "batched":
+            yield
+            return
+        # Swap the batched receivers for auditlog's own ones
+        models = registry.get_models()
+        for model in models:
+            fields = registry.get_model_fields(model)
+            registry.unregister(model)
+            auditlog.register(model, exclude_fields=fields["exclude_fields"], mask_fields=fields["mask_fields"])
+        try:
+            yield
+        finally:
+            for model in models:
+                auditlog.unregister(model)
+            register_history_models()
+
+    @staticmethod
+    def _overhead(value, baseline) -> str:
+        return f"{(value / baseline - 1) * 100:+.1f}%"
+
+    @staticmethod
+    def _requests(client, company, currency, unit, items) -> float:
+        """Milliseconds per create or update request of an item (items can't be deleted through the API)."""
+        data = {"company": str(company.uuid), "currency": str(currency.uuid), "unit": str(unit.uuid), "price_per_unit": "10.00"}
+        start = time.perf_counter()
+        for index in range(items):
+            uuid = client.post("/api/items/", data | {"name": f"Item {index}"}, content_type="application/json").json()["uuid"]
+            client.patch(f"/api/items/{uuid}/", {"price_per_unit": "12.50"}, content_type="application/json")
+            client.patch(f"/api/items/{uuid}/", {"description": "Updated"}, content_type="application/json")
+        return (time.perf_counter() - start) * 1000 / (items * 3)
+
+    @staticmethod
+    def _saves(company, currency, unit, items) -> float:
+        """Milliseconds per create, update or delete of an item, all made in one transaction."""
+        start = time.perf_counter()
+        with batch_log_entries(), transaction.atomic():
+            created = [
+                Item.objects.create(
+                    company=company, currency=currency, unit=unit, name=f"Item {index}", price_per_unit=Decimal("10.00")
+                )
+                for index in range(items)
+            ]
+            for item in created:
+                item.price_per_unit = Decimal("12.50")
+                item.save()
+            for item in created:
+                item.delete()
+        return (time.perf_counter() - start) * 1000 / (items * 3)
@@ -0,0 +1,99 @@
+import tempfile
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.commands.createcachetable import Command as CreateCacheTableCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.module_loading import import_string
+
+TABLE_NAME = "kompello_cache_benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the cache backends of CACHE_BACKEND on the access patterns of the project: "
+        "membership lookups, version token get_many, cached response reads and writes. "
+        "The database backend works on a table created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backends",
+            type=str,
+            help="Comma separated list of backends to measure",
+            default=",".join(settings.CACHE_BACKENDS),
+        )
+        parser.add_argument("--operations", type=int, help="Number of operations per access pattern", default=2000)
+        parser.add_argument("--response-size", type=int, help="Bytes of a cached response", default=20000)
+        parser.add_argument(
+            "--redis-location",
+            type=str,
+            help="URL of the Redis (compatible) server for the redis backend",
+            default="redis://localhost:6379/15",
+        )
+
+    def handle(self, *args, **options):
+        backends = [backend.strip() for backend in options["backends"].split(",") if backend.strip()]
+        unknown = [backend for backend in backends if backend not in settings.CACHE_BACKENDS]
+        if unknown:
+            raise CommandError(f"Unknown backend(s): {', '.join(unknown)}")
+
+        self.stdout.write(
+            f"{'backend':>9} {'membership':>11} {'versions':>9} {'response':>9} {'store':>9}   (microseconds per operation)"
+        )
+        with tempfile.TemporaryDirectory() as directory, transaction.atomic():
+            create_command = CreateCacheTableCommand(stdout=self.stdout)
+            create_command.verbosity = 0
+            create_command.create_table(DEFAULT_DB_ALIAS, TABLE_NAME, dry_run=False)
+            locations = {
+                "locmem": f"benchmark-{uuid4().hex}",
+                "file": directory,
+                "database": TABLE_NAME,
+                "redis": options["redis_location"],
+            }
+            for backend in backends:
+                params = {"KEY_PREFIX": f"benchmark:{uuid4().hex}", "OPTIONS": {}}
+                if backend != "redis":
+                    params["OPTIONS"] = {"MAX_ENTRIES": options["operations"] * 2}
+                cache = import_string(settings.CACHE_BACKENDS[backend])(locations[backend], params)
+                try:
+                    results = self._measure(cache, options["operations"], options["response_size"])
+                except Exception as e:
+                    # redis-py missing or no server running
+                    self.stdout.write(f"{backend:>9} skipped: {e}")
+                    continue
+                finally:
+                    cache.close()
+                self.stdout.write(
+                    f"{backend:>9} {results[0]:>11.1f} {results[1]:>9.1f} {results[2]:>9.1f} {results[3]:>9.1f}"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _measure(cache, operations: int, response_size: int) -> list[float]:
+        """Microseconds per operation of each access pattern."""
+        cache.set("membership", [1, 2, 3], 300)
+        version_keys = [f"version:{company_id}" for company_id in range(3)]
+        cache.set_many({key: uuid4().hex for key in version_keys}, 300)
+        response = (b"x" * response_size, {"Content-Type": "application/json", "ETag": '"etag"'})
+        cache.set("response", response, 300)
+
+        patterns = [
+            # get_company_ids() on every request
+            lambda index: cache.get("membership"),
+            # Version tokens of the custom field registry and the response cache
+            lambda index: cache.get_many(version_keys),
+            # A hit of the response cache
+            lambda index: cache.get("response"),
+            # A miss of the response cache stores the rendered response
+            lambda index: cache.set(f"response:{index}", response, 300),
+        ]
+        results = []
+        for pattern in patterns:
+            start = time.perf_counter()
+            for index in range(operations):
+                pattern(index)
+            results.append((time.perf_counter() - start) * 1e6 / operations)
+        return results
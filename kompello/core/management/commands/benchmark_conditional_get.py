@@ -0,0 +1,64 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from kompello.core.models import Company, Currency, Item, KompelloUser, Unit
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare full and conditional (If-None-Match) repeat loads of the unit, currency and item "
+        "lists and details: CPU time per request and bytes sent. All benchmark data is created "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, help="Number of items", default=1000)
+        parser.add_argument("--requests", type=int, help="Number of requests per path", default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options["rows"], options["requests"])
+            transaction.set_rollback(True)
+
+    def _run(self, rows, requests):
+        user = KompelloUser.objects.create_superuser("benchmark@kompello.local", "benchmark@kompello.local", None)
+        company = Company.objects.create(name="Benchmark Company")
+        currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        items = Item.objects.bulk_create(
+            Item(company=company, currency=currency, unit=unit, name=f"Item {index}", price_per_unit=Decimal("10.00"))
+            for index in range(rows)
+        )
+
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        client.force_login(user)
+        paths = [
+            f"/api/units/?company={company.uuid}",
+            f"/api/currencies/?company={company.uuid}",
+            f"/api/items/?company={company.uuid}&page_size=100",
+            f"/api/items/{items[0].uuid}/",
+        ]
+
+        self.stdout.write(f"{'path':>12} {'full ms':>8} {'304 ms':>8} {'full bytes':>11} {'304 bytes':>10}")
+        for path in paths:
+            etag = client.get(path)["ETag"]
+            full = self._measure(client, path, requests)
+            conditional = self._measure(client, path, requests, HTTP_IF_NONE_MATCH=etag)
+            name = path.split("?")[0].removeprefix("/api/").rstrip("/")
+            name = name if "/" not in name else name.split("/")[0] + "/<uuid>"
+            self.stdout.write(
+                f"{name:>12} {full[0]:>8.2f} {conditional[0]:>8.2f} {full[1]:>11} {conditional[1]:>10}"
+            )
+
+    @staticmethod
+    def _measure(client, path, requests, **headers) -> tuple[float, int]:
+        """CPU milliseconds per request and body bytes of the last response."""
+        start = time.process_time()
+        for _ in range(requests):
+            response = client.get(path, **headers)
+        return (time.process_time() - start) * 1000 / requests, len(response.content)
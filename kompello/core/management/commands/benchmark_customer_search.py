@@ -0,0 +1,99 @@
+import random
+import time
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kompello.core.models import Address, Company, Customer
+from kompello.core.search import rebuild_index, search_customers
+
+FIRSTNAMES = ["Anna", "Ben", "Clara", "David", "Eva", "Felix", "Greta", "Hannes", "Ida", "Jonas", "Klara", "Lukas"]
+LASTNAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz", "Hoffmann"]
+CITIES = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf", "Leipzig", "Dortmund"]
+STREETS = ["Hauptstraße", "Schulstraße", "Gartenstraße", "Bahnhofstraße", "Dorfstraße", "Bergstraße", "Lindenstraße"]
+WORDS = ["prefers", "email", "contact", "invoice", "monthly", "project", "consulting", "urgent", "retainer", "meeting"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the customer full-text search on generated customers. "
+        "All benchmark data is created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--customers",
+            type=int,
+            help="Number of customers to generate",
+            default=500000,
+        )
+        parser.add_argument(
+            "--companies",
+            type=int,
+            help="Number of companies the customers are spread over",
+            default=10,
+        )
+        parser.add_argument(
+            "--queries",
+            type=str,
+            help="Comma separated list of queries to time",
+            default="anna,schmidt,anna müller,berlin haupt,jonas@example,consulting urgent,xyz",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            help="Number of times each query is timed",
+            default=20,
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options)
+            transaction.set_rollback(True)
+
+    def _run(self, options):
+        rng = random.Random(42)
+        companies = [Company.objects.create(name=f"Benchmark Company {index}") for index in range(options["companies"])]
+
+        start = time.perf_counter()
+        batch_size = 10000
+        for offset in range(0, options["customers"], batch_size):
+            count = min(batch_size, options["customers"] - offset)
+            addresses = Address.objects.bulk_create(
+                Address(
+                    street=f"{rng.choice(STREETS)} {rng.randint(1, 200)}",
+                    city=rng.choice(CITIES),
+                    postal_code=f"{rng.randint(10000, 99999)}",
+                    country="Germany",
+                )
+                for _ in range(count)
+            )
+            customers = []
+            for index, address in enumerate(addresses, start=offset):
+                firstname, lastname = rng.choice(FIRSTNAMES), rng.choice(LASTNAMES)
+                customers.append(Customer(
+                    company=companies[index % len(companies)],
+                    firstname=firstname,
+                    lastname=lastname,
+                    email=f"{firstname}.{lastname}.{index}@example.com".lower(),
+                    notes=" ".join(rng.sample(WORDS, 3)),
+                    address=address,
+                ))
+            Customer.objects.bulk_create(customers)
+        self.stdout.write(f"Created {options['customers']} customers in {time.perf_counter() - start:.1f}s")
+
+        # bulk_create doesn't send signals, index everything at once
+        start = time.perf_counter()
+        rebuild_index()
+        self.stdout.write(f"Indexed them in {time.perf_counter() - start:.1f}s")
+
+        company_ids = {companies[0].id}
+        self.stdout.write(f"{'query':>20} {'hits':>5} {'median ms':>10} {'max ms':>8}")
+        for query in options["queries"].split(","):
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                hits = search_customers(query, company_ids)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{query:>20} {len(hits):>5} {median(timings):>10.3f} {max(timings):>8.3f}")
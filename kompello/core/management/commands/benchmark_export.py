@@ -0,0 +1,115 @@
+import gc
+import resource
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from kompello.core.models import Company, Currency, Customer, CustomFieldDefinition, Item, KompelloUser, Unit
+
+BATCH_SIZE = 10000
+
+
+def current_rss() -> int:
+    """
+    Anonymous resident memory of this process in bytes, which leaves out the pages of the database
+    file that SQLite maps into memory (mmap_size). The peak RSS so far where /proc isn't available.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the customer and item exports (CSV and NDJSON) of a large company and report the "
+        "anonymous resident memory of the process while streaming. All benchmark data is created "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, help="Number of customers and of items", default=1000000)
+        parser.add_argument("--custom-fields", type=int, help="Number of custom fields per item", default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options["rows"], options["custom_fields"])
+            transaction.set_rollback(True)
+
+    def _run(self, rows, custom_field_count):
+        user = KompelloUser.objects.create_superuser("benchmark@kompello.local", "benchmark@kompello.local", None)
+        company = Company.objects.create(name="Benchmark Company")
+        self._populate(company, rows, custom_field_count)
+
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        client.force_login(user)
+
+        self.stdout.write(f"{'export':>18} {'rows':>9} {'MB':>8} {'seconds':>8} {'anon MB':>8} {'peak MB':>8}")
+        for name in ["customers", "items"]:
+            for file_format in ["csv", "ndjson"]:
+                gc.collect()
+                rss = peak = current_rss()
+                size = lines = 0
+                start = time.perf_counter()
+                response = client.get(f"/api/{name}/export/", {"company": company.uuid, "format": file_format})
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+                    peak = max(peak, current_rss())
+                self.stdout.write(
+                    f"{name + ' ' + file_format:>18} {lines:>9} {size / 2**20:>8.1f} "
+                    f"{time.perf_counter() - start:>8.1f} {rss / 2**20:>8.1f} {peak / 2**20:>8.1f}"
+                )
+
+    @staticmethod
+    def _populate(company, rows, custom_field_count):
+        currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        keys = [f"field_{index}" for index in range(custom_field_count)]
+        CustomFieldDefinition.objects.bulk_create(
+            CustomFieldDefinition(
+                key=key,
+                name=key,
+                data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+                model_type=ContentType.objects.get_for_model(Item),
+                company=company,
+            )
+            for key in keys
+        )
+        # Batches keep the memory of the setup out of the measurement
+        for offset in range(0, rows, BATCH_SIZE):
+            indexes = range(offset, min(offset + BATCH_SIZE, rows))
+            Customer.objects.bulk_create(
+                [
+                    Customer(
+                        company=company,
+                        firstname=f"First {index}",
+                        lastname=f"Last {index}",
+                        email=f"customer{index}@example.com",
+                        notes="Customer notes",
+                    )
+                    for index in indexes
+                ]
+            )
+            Item.objects.bulk_create(
+                [
+                    Item(
+                        company=company,
+                        currency=currency,
+                        unit=unit,
+                        name=f"Item {index}",
+                        price_per_unit=Decimal("10.00"),
+                        custom_fields_cache={key: index for key in keys},
+                    )
+                    for index in indexes
+                ]
+            )
@@ -0,0 +1,115 @@
+import datetime
+import random
+import time
+from urllib.parse import parse_qs, urlparse
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from kompello.core.history import company_activity, object_history
+from kompello.core.models import Company, CompanyLogEntry, Item, KompelloUser
+from kompello.core.pagination import HistoryPagination
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the pages of the history of an object and of the activity feed of a company on a large "
+        "audit log: the first page, a deep page reached through the cursors (and the same page read with "
+        "OFFSET for comparison) and the first pages filtered by actor and by time. The log entries are "
+        "generated inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, help="Number of generated log entries", default=200000)
+        parser.add_argument("--companies", type=int, help="Number of companies the entries are spread over", default=20)
+        parser.add_argument("--hot-rows", type=int, help="Number of entries of the object whose history is read", default=20000)
+        parser.add_argument("--pages", type=int, help="Number of pages followed for the deep page", default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            companies, actors, item = self._generate(options)
+            self.stdout.write(f"{options['rows']} log entries, milliseconds per page of {HistoryPagination.page_size}:")
+            since = timezone.now() - datetime.timedelta(days=30)
+            cases = [
+                ("history", lambda **query: object_history(item, **query)),
+                ("activity", lambda **query: company_activity(companies[0].id, **query)),
+            ]
+            self.stdout.write(f"{'':>9} {'first':>8} {'deep':>8} {'offset':>8} {'actor':>8} {'since':>8}")
+            for name, queryset in cases:
+                first = self._page(queryset())[0]
+                deep = self._deep_page(queryset(), options["pages"])
+                offset = self._offset_page(queryset(), options["pages"])
+                actor = self._page(queryset(actor=actors[0]))[0]
+                recent = self._page(queryset(since=since))[0]
+                self.stdout.write(f"{name:>9} {first:>8.2f} {deep:>8.2f} {offset:>8.2f} {actor:>8.2f} {recent:>8.2f}")
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _generate(options):
+        """Log entries of many objects of many companies, one object with hot_rows of them."""
+        companies = Company.objects.bulk_create([Company(name=f"Benchmark {index}") for index in range(options["companies"])])
+        actors = KompelloUser.objects.bulk_create([
+            KompelloUser(username=f"benchmark-history-{index}", email=f"benchmark-history-{index}@kompello.local")
+            for index in range(5)
+        ])
+        item = Item(pk=10**12, name="Benchmark item", company=companies[0])
+        content_type = ContentType.objects.get_for_model(Item)
+        start = timezone.now() - datetime.timedelta(days=365)
+        step = datetime.timedelta(days=365) / options["rows"]
+        hot = set(random.sample(range(options["rows"]), min(options["hot_rows"], options["rows"])))
+
+        batch_size = 5000
+        for offset in range(0, options["rows"], batch_size):
+            entries = []
+            feed = []
+            for index in range(offset, min(offset + batch_size, options["rows"])):
+                company = item.company if index in hot else companies[index % len(companies)]
+                object_pk = item.pk if index in hot else 10**9 + index // 10
+                entry = LogEntry(
+                    content_type=content_type, object_pk=str(object_pk), object_id=object_pk, object_repr=f"Item {object_pk}",
+                    action=LogEntry.Action.UPDATE, changes={"price_per_unit": ["10.00", "12.50"]},
+                    actor=actors[index % len(actors)], timestamp=start + step * index,
+                )
+                entries.append(entry)
+                feed.append((entry, company))
+            LogEntry.objects.bulk_create(entries)
+            CompanyLogEntry.objects.bulk_create([
+                CompanyLogEntry(log_entry=entry, company=company, actor_id=entry.actor_id, timestamp=entry.timestamp)
+                for entry, company in feed
+            ])
+        return companies, actors, item
+
+    @staticmethod
+    def _page(queryset, cursor=None):
+        """Milliseconds to fetch one page, and the cursor of the next one."""
+        factory = APIRequestFactory()
+        request = Request(factory.get("/", {"cursor": cursor} if cursor else {}, HTTP_HOST=settings.ALLOWED_HOSTS[0]))
+        paginator = HistoryPagination()
+        start = time.perf_counter()
+        paginator.paginate_queryset(queryset, request)
+        elapsed = (time.perf_counter() - start) * 1000
+        link = paginator.get_next_link()
+        return elapsed, link and parse_qs(urlparse(link).query)["cursor"][0]
+
+    def _deep_page(self, queryset, pages: int) -> float:
+        """Milliseconds to fetch the page reached by following pages next links."""
+        cursor = None
+        for _ in range(pages):
+            elapsed, cursor = self._page(queryset, cursor)
+            if cursor is None:
+                break
+        return elapsed
+
+    @staticmethod
+    def _offset_page(queryset, pages: int) -> float:
+        """Milliseconds to fetch the same page as _deep_page() with OFFSET."""
+        size = HistoryPagination.page_size
+        start = time.perf_counter()
+        list(queryset[(pages - 1) * size:pages * size])
+        return (time.perf_counter() - start) * 1000
@@ -0,0 +1,120 @@
+import time
+from decimal import Decimal
+from statistics import median
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kompello.core.models import (
+    Company,
+    Currency,
+    CustomFieldDefinition,
+    CustomFieldInstance,
+    Item,
+    KompelloUser,
+    Unit,
+)
+from kompello.core.serializers.item_serializers import ItemListSerializer
+from kompello.core.views.api.item import ItemViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the item list with ?include=custom_fields for growing page sizes and report the "
+        "number of queries per page. All benchmark data is created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes",
+            type=str,
+            help="Comma separated list of page sizes to measure",
+            default="10,50,100,500",
+        )
+        parser.add_argument(
+            "--custom-fields",
+            type=int,
+            help="Number of custom fields per item",
+            default=10,
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            help="Number of list requests to time per page size",
+            default=20,
+        )
+
+    def handle(self, *args, **options):
+        page_sizes = sorted(int(size) for size in options["page_sizes"].split(","))
+
+        with transaction.atomic():
+            self._run(page_sizes, options["custom_fields"], options["requests"])
+            transaction.set_rollback(True)
+
+    def _run(self, page_sizes, custom_field_count, requests):
+        user = KompelloUser.objects.create_superuser("benchmark@kompello.local", "benchmark@kompello.local", None)
+        company = Company.objects.create(name="Benchmark Company")
+        currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        content_type = ContentType.objects.get_for_model(Item)
+        definitions = [
+            CustomFieldDefinition.objects.create(
+                key=f"field_{index}",
+                name=f"Field {index}",
+                data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+                model_type=content_type,
+                company=company,
+            )
+            for index in range(custom_field_count)
+        ]
+
+        item_count = max(page_sizes)
+        items = Item.objects.bulk_create(
+            Item(
+                company=company,
+                currency=currency,
+                unit=unit,
+                name=f"Item {index}",
+                price_per_unit=Decimal("1.00"),
+                custom_fields_cache={definition.key: index for definition in definitions},
+            )
+            for index in range(item_count)
+        )
+        CustomFieldInstance.objects.bulk_create(
+            CustomFieldInstance(custom_field=definition, content_type=content_type, object_id=item.id, value=index)
+            for index, item in enumerate(items)
+            for definition in definitions
+        )
+
+        view = ItemViewSet.as_view({"get": "list"})
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'page size':>10} {'queries':>8} {'median ms':>10} {'prefetch q':>10}")
+        for page_size in page_sizes:
+            timings = []
+            for _ in range(requests):
+                request = factory.get(
+                    "/api/items/", {"include": "custom_fields", "page_size": page_size}, HTTP_HOST=settings.ALLOWED_HOSTS[0]
+                )
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = view(request)
+                    response.render()
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            # The same page serialized from the prefetched generic relation instead of the cached column
+            with CaptureQueriesContext(connection) as prefetch_queries:
+                page = Item.objects.select_related("currency", "unit").defer("custom_fields_cache").prefetch_related(
+                    Prefetch("custom_fields", queryset=CustomFieldInstance.objects.select_related("custom_field"))
+                )[:page_size]
+                ItemListSerializer(page, many=True).data
+
+            self.stdout.write(
+                f"{page_size:>10} {len(queries):>8} {median(timings):>10.3f} {len(prefetch_queries):>10}"
+            )
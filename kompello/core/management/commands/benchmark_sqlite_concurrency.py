@@ -0,0 +1,112 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from kompello.app.config import CONFIG
+from kompello.core.sqlite_profile import apply_pragmas, get_pragmas
+
+# What a connection gets without the profile: Django's defaults on top of SQLite's
+DEFAULT_PROFILE = ({"busy_timeout": 5000, "journal_mode": "DELETE", "synchronous": "FULL"}, "DEFERRED")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of parallel readers and writers on SQLite without and with the "
+        "performance profile of kompello.core.sqlite_profile. Runs on a temporary database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, help="Number of reading threads", default=8)
+        parser.add_argument("--writers", type=int, help="Number of writing threads", default=4)
+        parser.add_argument("--duration", type=float, help="Seconds to run each profile", default=5.0)
+        parser.add_argument("--rows", type=int, help="Number of rows in the benchmark table", default=50000)
+
+    def handle(self, *args, **options):
+        profiles = {
+            "default": DEFAULT_PROFILE,
+            "tuned": (get_pragmas(), CONFIG.get("SQLITE_TRANSACTION_MODE") or "DEFERRED"),
+            "immediate": (get_pragmas(), "IMMEDIATE"),
+        }
+        self.stdout.write(f"{'profile':>10} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+        for name, (pragmas, transaction_mode) in profiles.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "benchmark.sqlite3")
+                self._populate(path, options["rows"], pragmas)
+                reads, writes, locked = self._run(path, pragmas, transaction_mode, options)
+            duration = options["duration"]
+            self.stdout.write(f"{name:>10} {reads / duration:>10.0f} {writes / duration:>10.0f} {locked:>8}")
+
+    def _connect(self, path, pragmas):
+        # Autocommit mode, transactions are started explicitly like Django does
+        connection = sqlite3.connect(path, timeout=0, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection.cursor(), pragmas)
+        return connection
+
+    def _populate(self, path, rows, pragmas):
+        # The journal mode is stored in the database file, set it before the threads connect
+        connection = self._connect(path, pragmas)
+        connection.execute(
+            "CREATE TABLE customer (id INTEGER PRIMARY KEY, company_id INTEGER, name TEXT, notes TEXT, visits INTEGER)"
+        )
+        connection.execute("CREATE INDEX customer_company ON customer (company_id, id)")
+        connection.execute("BEGIN")
+        connection.executemany(
+            "INSERT INTO customer (company_id, name, notes, visits) VALUES (?, ?, ?, 0)",
+            ((index % 100, f"Customer {index}", "x" * 200) for index in range(rows)),
+        )
+        connection.execute("COMMIT")
+        connection.close()
+
+    def _run(self, path, pragmas, transaction_mode, options):
+        counters = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + options["duration"]
+
+        def count(name):
+            with lock:
+                counters[name] += 1
+
+        def reader(seed):
+            rng = random.Random(seed)
+            connection = self._connect(path, pragmas)
+            while time.perf_counter() < stop:
+                try:
+                    connection.execute(
+                        "SELECT id, name, visits FROM customer WHERE company_id = ? ORDER BY id DESC LIMIT 50",
+                        (rng.randrange(100),),
+                    ).fetchall()
+                    count("reads")
+                except sqlite3.OperationalError:
+                    count("locked")
+            connection.close()
+
+        def writer(seed):
+            # Read-modify-write transaction, like a request that loads an object and saves it
+            rng = random.Random(seed)
+            connection = self._connect(path, pragmas)
+            while time.perf_counter() < stop:
+                try:
+                    connection.execute(f"BEGIN {transaction_mode}")
+                    customer_id = rng.randrange(1, options["rows"])
+                    visits, = connection.execute("SELECT visits FROM customer WHERE id = ?", (customer_id,)).fetchone()
+                    connection.execute("UPDATE customer SET visits = ? WHERE id = ?", (visits + 1, customer_id))
+                    connection.execute("COMMIT")
+                    count("writes")
+                except sqlite3.OperationalError:
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                    count("locked")
+            connection.close()
+
+        threads = [threading.Thread(target=reader, args=(index,)) for index in range(options["readers"])]
+        threads += [threading.Thread(target=writer, args=(index,)) for index in range(options["writers"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters["reads"], counters["writes"], counters["locked"]
@@ -0,0 +1,85 @@
+import random
+import time
+from decimal import Decimal
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kompello.core.models import Company, Currency, Item, KompelloUser, Unit
+from kompello.core.views.api.item import ItemViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark item detail lookups by uuid for growing table sizes. "
+        "All benchmark data is created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            help="Comma separated list of item table sizes to measure",
+            default="1000,10000,100000,1000000",
+        )
+        parser.add_argument(
+            "--lookups",
+            type=int,
+            help="Number of retrieve requests to time per table size",
+            default=200,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Batch size used to insert the benchmark items",
+            default=5000,
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+
+        with transaction.atomic():
+            self._run(sizes, options["lookups"], options["batch_size"])
+            transaction.set_rollback(True)
+
+    def _run(self, sizes, lookups, batch_size):
+        user = KompelloUser.objects.create_superuser("benchmark@kompello.local", "benchmark@kompello.local", None)
+        company = Company.objects.create(name="Benchmark Company")
+        currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+
+        view = ItemViewSet.as_view({"get": "retrieve"})
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'rows':>10} {'median ms':>10} {'p95 ms':>10}")
+        created = 0
+        for size in sizes:
+            while created < size:
+                count = min(batch_size, size - created)
+                Item.objects.bulk_create(
+                    Item(
+                        company=company,
+                        currency=currency,
+                        unit=unit,
+                        name=f"Item {created + i}",
+                        price_per_unit=Decimal("1.00"),
+                    )
+                    for i in range(count)
+                )
+                created += count
+
+            uuids = list(Item.objects.filter(company=company).values_list("uuid", flat=True).order_by("?")[:lookups])
+            timings = []
+            for item_uuid in random.choices(uuids, k=lookups):
+                request = factory.get(f"/api/items/{item_uuid}/")
+                force_authenticate(request, user=user)
+                start = time.perf_counter()
+                response = view(request, uuid=item_uuid)
+                response.render()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            self.stdout.write(f"{size:>10} {median(timings):>10.3f} {p95:>10.3f}")
@@ -0,0 +1,54 @@
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from kompello.app.config import CONFIG
+from kompello.core.customer_import import ImportFileError, import_customers, read_csv
+from kompello.core.models.company_models import Company
+from kompello.core.serializers.customer_serializers import CustomerImportRowSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import customers from a UTF-8 CSV file in the columns of the customer export. "
+        "Invalid rows are reported and skipped, rows whose key matches an existing customer are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", type=str, help="Path of the CSV file")
+        parser.add_argument("--company", type=str, required=True, help="UUID of the company to import into")
+        parser.add_argument(
+            "--key",
+            type=str,
+            choices=CustomerImportRowSerializer.key_fields,
+            help="Field identifying a customer across re-runs",
+            default=CONFIG.get("CUSTOMER_IMPORT_KEY", "email"),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of rows to validate and insert per batch (CUSTOMER_IMPORT_BATCH_SIZE by default)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(uuid=options["company"])
+        except (Company.DoesNotExist, ValidationError):
+            raise CommandError(f'Company {options["company"]} not found')
+
+        try:
+            with open(options["file"], "rb") as file:
+                rows = read_csv(file, options["key"])
+                for progress in import_customers(rows, company, options["key"], options["batch_size"]):
+                    for error in progress.errors:
+                        self.stderr.write(f'Row {error["row"]}: {json.dumps(error["errors"])}')
+                    self.stdout.write(
+                        f"{progress.rows} rows: {progress.created} created, "
+                        f"{progress.skipped} skipped, {progress.failed} failed"
+                    )
+        except (OSError, ImportFileError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {progress.created} customers into "{company.name}"'))
@@ -0,0 +1,50 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kompello.core.models.custom_field_models import CustomFieldCacheModel
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized custom_fields_cache column from the stored custom field instances"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            type=str,
+            help="Only rebuild this model (e.g. core.Item)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of rows to rebuild per batch",
+            default=1000,
+        )
+
+    def handle(self, *args, **options):
+        models = [model for model in apps.get_models() if issubclass(model, CustomFieldCacheModel)]
+        if options["model"]:
+            try:
+                models = [apps.get_model(options["model"])]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            if not issubclass(models[0], CustomFieldCacheModel):
+                raise CommandError(f'{options["model"]} does not have a custom_fields_cache column')
+
+        for model in models:
+            total = changed = 0
+            pks = model._base_manager.order_by("pk").values_list("pk", flat=True)
+            last_pk = None
+            while True:
+                batch = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+                batch = list(batch[:options["batch_size"]])
+                if not batch:
+                    break
+                with transaction.atomic():
+                    changed += model.rebuild_custom_fields_cache(batch)
+                total += len(batch)
+                last_pk = batch[-1]
+
+            self.stdout.write(
+                self.style.SUCCESS(f"{model._meta.label}: rebuilt {total} rows, {changed} changed")
+            )
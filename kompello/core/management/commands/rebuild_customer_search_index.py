@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError, transaction
+
+from kompello.core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the customer full-text search index from the customer and address tables"
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                count = rebuild_index()
+        except NotSupportedError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} customers"))
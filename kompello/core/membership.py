@@ -0,0 +1,104 @@
+"""
+Company membership lookups shared by all viewsets and permission classes.
+
+A user's set of company IDs is computed at most once per request (memoized on the user
+object) and shared across workers through Django's cache framework. The cached sets are
+invalidated by the signal handlers in kompello.core.signals whenever memberships change.
+Company uuids are resolved to IDs through the same cache.
+"""
+
+from uuid import UUID
+
+from django.core.cache import cache
+from django.db import transaction
+
+from kompello.app.config import CONFIG
+from kompello.core.models.company_models import Company
+
+CACHE_KEY = "membership:company_ids:{user_id}"
+COMPANY_ID_KEY = "membership:company_id:{company_uuid}"
+CACHE_TIMEOUT = CONFIG.get("MEMBERSHIP_CACHE_TIMEOUT", 300)
+
+# Attribute used to memoize the company ID set on the user object for the current request
+_REQUEST_CACHE_ATTR = "_kompello_company_ids"
+
+
+def get_company_ids(user) -> frozenset[int]:
+    """
+    Return the IDs of all companies the given user is a member of.
+
+    Args:
+        user: The user to look up, usually request.user
+
+    Returns:
+        frozenset: IDs of the user's companies (empty for anonymous users)
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    company_ids = getattr(user, _REQUEST_CACHE_ATTR, None)
+    if company_ids is not None:
+        return company_ids
+
+    key = CACHE_KEY.format(user_id=user.id)
+    cached = cache.get(key)
+    if cached is None:
+        cached = list(Company.objects.filter(members__id=user.id).values_list("id", flat=True))
+        cache.set(key, cached, CACHE_TIMEOUT)
+
+    company_ids = frozenset(cached)
+    setattr(user, _REQUEST_CACHE_ATTR, company_ids)
+    return company_ids
+
+
+def is_company_member(user, company) -> bool:
+    """
+    Check whether the user is a member of the given company.
+
+    Args:
+        user: The user to check, usually request.user
+        company: A Company instance or a company ID
+    """
+    company_id = company.id if isinstance(company, Company) else company
+    return company_id in get_company_ids(user)
+
+
+def get_company_id(company_uuid) -> int | None:
+    """
+    Return the ID of the company with the given uuid, or None if there is no such company
+    (or the value is not a uuid).
+
+    The ID of a company never changes, so it is cached until the company is deleted (see
+    invalidate_company_id()) or the entry expires.
+    """
+    try:
+        company_uuid = UUID(str(company_uuid))
+    except ValueError:
+        return None
+
+    key = COMPANY_ID_KEY.format(company_uuid=company_uuid)
+    company_id = cache.get(key)
+    if company_id is None:
+        company_id = Company.objects.filter(uuid=company_uuid).values_list("id", flat=True).first()
+        if company_id is not None:
+            cache.set(key, company_id, CACHE_TIMEOUT)
+    return company_id
+
+
+def invalidate_company_id(company_uuid) -> None:
+    """Drop the cached ID of a deleted company."""
+    cache.delete(COMPANY_ID_KEY.format(company_uuid=company_uuid))
+
+
+def invalidate_company_ids(user_ids) -> None:
+    """
+    Drop the cached company ID sets of the given users, now and once the current transaction
+    commits: a request reading the memberships before the commit would cache the old set again.
+    """
+    keys = [CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+
+    def apply():
+        cache.delete_many(keys)
+
+    apply()
+    transaction.on_commit(apply)
@@ -0,0 +1,22 @@
+"""
+Middleware of the core app.
+"""
+
+from auditlog.middleware import AuditlogMiddleware as BaseAuditlogMiddleware
+from rest_framework.permissions import SAFE_METHODS
+
+from kompello.core.audit import batch_log_entries
+
+
+class AuditlogMiddleware(BaseAuditlogMiddleware):
+    """
+    auditlog's middleware, which also collects the log entries of write requests and writes them
+    together once the request is handled (see kompello.core.audit). Read requests open no batch,
+    so the objects they load don't keep their loaded values for the diff.
+    """
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            return super().__call__(request)
+        with batch_log_entries(self._get_actor(request), self._get_remote_addr(request)):
+            return super().__call__(request)
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:27
+
+import uuid
+
+from django.db import migrations, models
+from django.db.models import Count
+
+UUID_MODELS = [
+    "address",
+    "company",
+    "currency",
+    "customer",
+    "customfielddefinition",
+    "customfieldinstance",
+    "item",
+    "kompellouser",
+    "unit",
+]
+
+
+def deduplicate_uuids(apps, schema_editor):
+    """
+    Give every row that shares its uuid with an older row a fresh uuid, so the
+    unique index below can be built on databases that already contain data.
+    """
+    for model_name in UUID_MODELS:
+        model = apps.get_model("core", model_name)
+        duplicates = (
+            model.objects.values("uuid")
+            .annotate(row_count=Count("id"))
+            .filter(row_count__gt=1)
+            .values_list("uuid", flat=True)
+        )
+        for duplicate in duplicates:
+            for row in model.objects.filter(uuid=duplicate).order_by("id")[1:]:
+                row.uuid = uuid.uuid4()
+                row.save(update_fields=["uuid"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_customfielddefinition_is_archived_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_uuids, migrations.RunPython.noop),
+    ] + [
+        migrations.AlterField(
+            model_name=model_name,
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        )
+        for model_name in UUID_MODELS
+    ]
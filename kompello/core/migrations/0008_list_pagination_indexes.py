@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_basemodel_uuid_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["created_on", "uuid"], name="core_custom_created_a81f12_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["name", "uuid"], name="core_item_name_b1f008_idx"),
+        ),
+    ]
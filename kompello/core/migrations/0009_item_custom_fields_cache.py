@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:27
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+def fill_custom_fields_cache(apps, schema_editor):
+    """Copy the existing custom field values of every item into the new column."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    CustomFieldInstance = apps.get_model("core", "CustomFieldInstance")
+    Item = apps.get_model("core", "Item")
+
+    content_type = ContentType.objects.filter(app_label="core", model="item").first()
+    if content_type is None:
+        return
+
+    values = {}
+    instances = CustomFieldInstance.objects.filter(content_type=content_type).values_list(
+        "object_id", "custom_field__key", "value"
+    )
+    for object_id, key, value in instances.iterator():
+        values.setdefault(object_id, {})[key] = value
+
+    Item.objects.bulk_update(
+        [Item(pk=pk, custom_fields_cache=cache) for pk, cache in values.items()],
+        ["custom_fields_cache"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_list_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="custom_fields_cache",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+        migrations.RunPython(fill_custom_fields_cache, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:36
+
+from django.db import migrations, models
+
+TEXT, NUMBER, BOOLEAN = 1, 2, 3
+
+
+def fill_typed_values(apps, schema_editor):
+    """Copy existing values into the typed column matching their definition's data type."""
+    CustomFieldInstance = apps.get_model("core", "CustomFieldInstance")
+
+    batch = []
+    for instance in CustomFieldInstance.objects.select_related("custom_field").iterator(chunk_size=1000):
+        value = instance.value
+        data_type = instance.custom_field.data_type
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        instance.value_text = value if data_type == TEXT and isinstance(value, str) else None
+        instance.value_number = value if data_type == NUMBER and is_number else None
+        instance.value_boolean = value if data_type == BOOLEAN and isinstance(value, bool) else None
+        batch.append(instance)
+        if len(batch) >= 1000:
+            CustomFieldInstance.objects.bulk_update(batch, ["value_text", "value_number", "value_boolean"])
+            batch = []
+    CustomFieldInstance.objects.bulk_update(batch, ["value_text", "value_number", "value_boolean"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("core", "0009_item_custom_fields_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customfieldinstance",
+            name="value_boolean",
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="customfieldinstance",
+            name="value_number",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="customfieldinstance",
+            name="value_text",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_typed_values, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="customfieldinstance",
+            index=models.Index(fields=["custom_field", "value_text", "object_id"], name="core_cfi_value_text_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customfieldinstance",
+            index=models.Index(fields=["custom_field", "value_number", "object_id"], name="core_cfi_value_number_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customfieldinstance",
+            index=models.Index(fields=["custom_field", "value_boolean", "object_id"], name="core_cfi_value_boolean_idx"),
+        ),
+    ]
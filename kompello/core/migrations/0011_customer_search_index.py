@@ -0,0 +1,67 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_customer_fts USING fts5(
+        firstname, lastname, email, city, street, notes, company,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # Default ranking for ORDER BY rank, weights per column (name matches first, the company token is never ranked)
+    "INSERT INTO core_customer_fts (core_customer_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 5.0, 2.0, 2.0, 1.0, 0.0)')",
+    """
+    INSERT INTO core_customer_fts (rowid, firstname, lastname, email, city, street, notes, company)
+    SELECT c.id, c.firstname, c.lastname, c.email, COALESCE(a.city, ''), COALESCE(a.street, ''), c.notes, 'c' || c.company_id
+    FROM core_customer c LEFT JOIN core_address a ON a.id = c.address_id
+    """,
+]
+SQLITE_BACKWARD = ["DROP TABLE core_customer_fts"]
+
+POSTGRES_FORWARD = [
+    # Trusted extension since PostgreSQL 13, the database owner can create it
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE TABLE core_customer_search (
+        customer_id bigint PRIMARY KEY,
+        company_id bigint NOT NULL,
+        content text NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX core_customer_search_document_idx ON core_customer_search USING GIN (document)",
+    "CREATE INDEX core_customer_search_company_idx ON core_customer_search (company_id)",
+    """
+    INSERT INTO core_customer_search (customer_id, company_id, content, document)
+    SELECT c.id, c.company_id,
+           concat_ws(' ', c.firstname, c.lastname, c.email, a.street, a.city, c.notes),
+           setweight(to_tsvector('simple', unaccent(c.firstname || ' ' || c.lastname)), 'A')
+           || setweight(to_tsvector('simple', unaccent(c.email || ' ' || translate(c.email, '@.', '  '))), 'B')
+           || setweight(to_tsvector('simple', unaccent(concat_ws(' ', a.city, a.street))), 'C')
+           || setweight(to_tsvector('simple', unaccent(c.notes)), 'D')
+    FROM core_customer c LEFT JOIN core_address a ON a.id = c.address_id
+    """,
+]
+POSTGRES_BACKWARD = ["DROP TABLE core_customer_search"]
+
+
+def run(statements):
+    """Run the statements for the current database, other databases get no search index."""
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_customfieldinstance_typed_values"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.5 on 2026-10-17 22:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auditlog", "0015_alter_logentry_changes"),
+        ("core", "0011_customer_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompanyLogEntry",
+            fields=[
+                (
+                    "log_entry",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="auditlog.logentry",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("object_uuid", models.UUIDField(blank=True, null=True)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.company",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["company", "timestamp", "log_entry"], name="core_company_log_feed_idx"),
+                    models.Index(
+                        fields=["company", "actor", "timestamp", "log_entry"], name="core_company_log_actor_idx"
+                    ),
+                ],
+            },
+        ),
+        # The history of an object (kompello.core.history), newest first with the ID as tie-breaker.
+        # LogEntry belongs to auditlog, so the index can't be declared on the model.
+        migrations.RunSQL(
+            'CREATE INDEX auditlog_logentry_history_idx ON auditlog_logentry (content_type_id, object_pk, "timestamp", id)',
+            "DROP INDEX auditlog_logentry_history_idx",
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_company_log_entry"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="customer",
+            name="core_custom_created_a81f12_idx",
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["company", "created_on", "uuid"], name="core_custom_company_c7ad45_idx"),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from .audit_models import *  # noqa: F403
 from .auth_models import *  # noqa: F403
 from .billing_models import *  # noqa: F403
 from .company_models import *  # noqa: F403
@@ -0,0 +1,29 @@
+from auditlog.models import LogEntry
+from django.db import models
+
+from kompello.core.models.auth_models import KompelloUser
+from kompello.core.models.company_models import Company
+
+
+class CompanyLogEntry(models.Model):
+    """
+    A log entry of an object that belongs to a company, in the activity feed of the company.
+
+    auditlog's LogEntry has no company, so the feed scans this table instead, which
+    kompello.core.audit writes along with the log entries. It is an index rather than an API
+    resource and doesn't inherit BaseModel: every column is another few hundred megabytes at
+    ten million rows.
+    """
+    log_entry = models.OneToOneField(LogEntry, on_delete=models.CASCADE, primary_key=True, related_name="+")
+    # Both indexes below start with the company
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="+", db_index=False)
+    actor = models.ForeignKey(KompelloUser, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    timestamp = models.DateTimeField()
+    object_uuid = models.UUIDField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serve the keyset pagination of the feed (newest first, log entry ID as tie-breaker) with and without actor filter
+            models.Index(fields=["company", "timestamp", "log_entry"], name="core_company_log_feed_idx"),
+            models.Index(fields=["company", "actor", "timestamp", "log_entry"], name="core_company_log_actor_idx"),
+        ]
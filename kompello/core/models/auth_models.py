@@ -12,3 +12,7 @@ class KompelloUser(BaseModel, HistoryModel, AbstractUser):
     email = models.EmailField(unique=True)
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
+
+    # last_login changes with every login
+    history_exclude_fields = ("modified_on", "last_login")
+    history_mask_fields = ("password",)
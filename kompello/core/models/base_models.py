@@ -1,12 +1,18 @@
 import uuid as uuid
+from contextvars import ContextVar
 
 from auditlog.models import AuditlogHistoryField
 from django.db import models
 
+# Whether objects loaded now keep the values they were loaded with, set inside the blocks of
+# kompello.core.audit.batch_log_entries(); objects loaded elsewhere are diffed against the stored row
+keep_loaded_values = ContextVar("kompello_keep_loaded_values", default=False)
+
 
 class BaseModel(models.Model):
     """Base model for all models in the application."""
-    uuid = models.UUIDField(default=uuid.uuid4, editable=False)
+    # uuid is the public lookup key for every API resource, so it has to be unique and indexed
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     modified_on = models.DateTimeField(auto_now=True)
     created_on = models.DateTimeField(auto_now_add=True)
 
@@ -15,8 +21,31 @@ class BaseModel(models.Model):
 
 
 class HistoryModel(models.Model):
-    """Model that includes audit logging for tracking changes."""
+    """
+    Model that includes audit logging for tracking changes.
+    Every subclass is registered with auditlog by kompello.core.audit.
+    """
     history = AuditlogHistoryField()
 
+    # Fields left out of the recorded changes and fields whose values are recorded masked
+    history_exclude_fields = ("modified_on",)
+    history_mask_fields = ()
+
+    # (field names, values) the object was loaded with inside an audit batch; updates are diffed
+    # against them instead of reading the row again (see kompello.core.audit)
+    _loaded_values = None
+
     class Meta:
         abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if keep_loaded_values.get():
+            instance._loaded_values = (field_names, values)
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        # The refreshed values may differ from the loaded ones, the next update reads the row again
+        self._loaded_values = None
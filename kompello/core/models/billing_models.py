@@ -10,7 +10,7 @@ from django.contrib.contenttypes.fields import GenericRelation
 
 from kompello.core.models.base_models import BaseModel, HistoryModel
 from kompello.core.models.company_models import Company
-from kompello.core.models.custom_field_models import CustomFieldInstance
+from kompello.core.models.custom_field_models import CustomFieldCacheModel, CustomFieldInstance
 
 
 class Unit(BaseModel, HistoryModel):
@@ -86,11 +86,12 @@ class Currency(BaseModel, HistoryModel):
         return f"{self.long_name} ({self.short_name})"
 
 
-class Item(BaseModel, HistoryModel):
+class Item(BaseModel, HistoryModel, CustomFieldCacheModel):
     """
     Item model for defining billable items.
     Items are templates that can be used to create bill line items.
-    Each item belongs to a single company and supports custom fields.
+    Each item belongs to a single company and supports custom fields, which are also
+    cached on the row (see CustomFieldCacheModel).
     
     Price Range Support:
     - price_per_unit: Base/minimum price (required)
@@ -154,12 +155,19 @@ class Item(BaseModel, HistoryModel):
         object_id_field="object_id",
         related_query_name="item"
     )
+
+    # The custom field values are recorded by their own instances
+    history_exclude_fields = ("modified_on", "custom_fields_cache")
     
     class Meta:
         db_table = "core_item"
         ordering = ["name"]
         verbose_name = "Item"
         verbose_name_plural = "Items"
+        indexes = [
+            # Serves the keyset pagination of the item list (ordering + uuid tie-breaker)
+            models.Index(fields=["name", "uuid"]),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(price_max__isnull=True) | models.Q(price_max__gte=models.F("price_per_unit")),
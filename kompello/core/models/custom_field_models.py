@@ -4,6 +4,7 @@ from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
 from kompello.core.models.base_models import BaseModel, HistoryModel
 from django.db import models
+from django.utils import timezone
 
 from kompello.core.models.company_models import Company
 
@@ -57,7 +58,10 @@ class CustomFieldDefinition(BaseModel, HistoryModel):
 
 
 class CustomFieldInstance(BaseModel, HistoryModel):
-    """Model to store instances of custom fields for specific entities."""
+    """
+    Model to store instances of custom fields for specific entities.
+    Changes of the value are recorded on the entity if the definition has track_history (see kompello.core.audit).
+    """
 
     # custom_field is a foreign key to the CustomFieldDefinition
     custom_field = models.ForeignKey(CustomFieldDefinition, on_delete=models.PROTECT, related_name='instances')
@@ -70,16 +74,114 @@ class CustomFieldInstance(BaseModel, HistoryModel):
     # value stores the actual value of the custom field instance
     value = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
 
+    # typed copies of value for filtering and sorting in SQL, only the one matching
+    # the definition's data_type is set (see fill_typed_values)
+    value_text = models.TextField(null=True, blank=True, editable=False)
+    value_number = models.FloatField(null=True, blank=True, editable=False)
+    value_boolean = models.BooleanField(null=True, blank=True, editable=False)
+
+    # maps each data type to the typed column holding its values
+    TYPED_VALUE_FIELDS = {
+        CustomFieldDefinition.FieldDataType.TEXT: "value_text",
+        CustomFieldDefinition.FieldDataType.NUMBER: "value_number",
+        CustomFieldDefinition.FieldDataType.BOOLEAN: "value_boolean",
+    }
+
+    def fill_typed_values(self):
+        """
+        Copy value into the typed column of the definition's data type and clear the others.
+        Has to be called by every write path that bypasses save() (e.g. bulk_create).
+        """
+        FieldDataType = CustomFieldDefinition.FieldDataType
+        data_type = self.custom_field.data_type
+        value = self.value
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+
+        self.value_text = value if data_type == FieldDataType.TEXT and isinstance(value, str) else None
+        self.value_number = value if data_type == FieldDataType.NUMBER and is_number else None
+        self.value_boolean = value if data_type == FieldDataType.BOOLEAN and isinstance(value, bool) else None
+
     def save(self, *args, **kwargs):
         # Prevent creating new instances for archived custom field definitions
         if self.pk is None and self.custom_field_id and self.custom_field.is_archived:
             raise ValidationError(
                 f"Cannot create instances for archived custom field: {self.custom_field.key}"
             )
+        if self.custom_field_id:
+            self.fill_typed_values()
         super().save(*args, **kwargs)
 
     class Meta:
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            # Serve filtering and sorting by custom field values (?cf.<key>=...)
+            models.Index(fields=["custom_field", "value_text", "object_id"], name="core_cfi_value_text_idx"),
+            models.Index(fields=["custom_field", "value_number", "object_id"], name="core_cfi_value_number_idx"),
+            models.Index(fields=["custom_field", "value_boolean", "object_id"], name="core_cfi_value_boolean_idx"),
         ]
-        unique_together = ('custom_field', 'object_id')  # Ensure unique custom field per entity
\ No newline at end of file
+        unique_together = ('custom_field', 'object_id')  # Ensure unique custom field per entity
+
+
+class CustomFieldCacheModel(models.Model):
+    """
+    Abstract model for models with a `custom_fields` GenericRelation that keep a denormalized
+    copy of their custom field values ({key: value}) on the row itself, so that reads don't
+    have to walk the generic relation. CustomFieldInstance stays the system of record; the
+    copy is rewritten by CustomFieldMixin and the signal handlers whenever instances change,
+    and can be rebuilt with the rebuild_custom_fields_cache management command. Rewriting the
+    copy also sets modified_on (if the model has one), since the values are part of the object's
+    representation and Last-Modified is taken from modified_on.
+    """
+    custom_fields_cache = models.JSONField(default=dict, blank=True, editable=False, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _has_modified_on(cls) -> bool:
+        return any(field.name == "modified_on" for field in cls._meta.concrete_fields)
+
+    def refresh_custom_fields_cache(self):
+        """Recompute custom_fields_cache of this object from its custom field instances and save it."""
+        self.custom_fields_cache = dict(
+            CustomFieldInstance.objects.filter(
+                content_type=ContentType.objects.get_for_model(self),
+                object_id=self.pk,
+            ).values_list("custom_field__key", "value")
+        )
+        values = {"custom_fields_cache": self.custom_fields_cache}
+        if self._has_modified_on():
+            self.modified_on = values["modified_on"] = timezone.now()
+        type(self)._base_manager.filter(pk=self.pk).update(**values)
+
+    @classmethod
+    def rebuild_custom_fields_cache(cls, object_ids) -> int:
+        """
+        Recompute custom_fields_cache of the given objects from their custom field instances.
+
+        Args:
+            object_ids: Primary keys of the objects to rebuild
+
+        Returns:
+            int: Number of rows whose cached values changed
+        """
+        object_ids = list(object_ids)
+        content_type = ContentType.objects.get_for_model(cls)
+        values = {object_id: {} for object_id in object_ids}
+        instances = CustomFieldInstance.objects.filter(
+            content_type=content_type,
+            object_id__in=object_ids,
+        ).values_list("object_id", "custom_field__key", "value")
+        for object_id, key, value in instances:
+            values[object_id][key] = value
+
+        current = cls._base_manager.filter(pk__in=object_ids).values_list("pk", "custom_fields_cache")
+        changed = [cls(pk=pk, custom_fields_cache=values[pk]) for pk, cached in current if cached != values[pk]]
+        fields = ["custom_fields_cache"]
+        if cls._has_modified_on():
+            fields.append("modified_on")
+            now = timezone.now()
+            for instance in changed:
+                instance.modified_on = now
+        cls._base_manager.bulk_update(changed, fields)
+        return len(changed)
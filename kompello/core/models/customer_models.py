@@ -129,6 +129,8 @@ class Customer(BaseModel, HistoryModel):
         indexes = [
             models.Index(fields=["company", "uuid"]),
             models.Index(fields=["email"]),
+            # Serves the keyset pagination of a company's customer list (ordering + uuid tie-breaker)
+            models.Index(fields=["company", "created_on", "uuid"]),
         ]
     
     def get_full_name(self) -> str:
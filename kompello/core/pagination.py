@@ -0,0 +1,167 @@
+"""
+Pagination classes for the Kompello API.
+"""
+
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from operator import attrgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from kompello.app.config import CONFIG
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder without its truncation of times to milliseconds: a cursor has to carry
+    the exact value, or rows within the same millisecond as the boundary row are skipped.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (seek) pagination for all list endpoints.
+
+    The page boundary is expressed as a filter on the ordering columns
+    (e.g. ``name > 'x' OR (name = 'x' AND uuid > 'y')``) instead of an OFFSET,
+    so fetching a page costs the same regardless of how deep into the table it is
+    and no COUNT(*) is ever issued.
+
+    The ordering is taken from the queryset (an explicit ``order_by``) or the
+    model's ``Meta.ordering``, and ``uuid`` is appended as a tie-breaker so the
+    ordering is total and no row is skipped or repeated between pages.
+    Cursors are opaque to clients; they carry the ordering values of the last
+    (or first, for ``previous``) row of the current page.
+    """
+
+    page_size = CONFIG.get("API_PAGE_SIZE", 50)
+    max_page_size = CONFIG.get("API_MAX_PAGE_SIZE", 500)
+    page_size_query_param = "page_size"
+    default_ordering = ("created_on",)
+    tie_breaker = "uuid"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.reverse, position = self.decode_cursor(request)
+
+        order_by = self._reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(order_by, position))
+
+        # Fetch one extra row to find out whether there is another page in this direction
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        # The ordering comes from the view's queryset or the model, never from the request
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering or self.default_ordering)
+        for field in ordering:
+            if not isinstance(field, str) or "__" in field or field.lstrip("-") == "?":
+                raise ImproperlyConfigured(
+                    f"{type(self).__name__} only supports ordering by concrete fields of the model, got {field!r}."
+                )
+        if self.tie_breaker not in [field.lstrip("-") for field in ordering]:
+            # Follow the direction of the last column so a single (col, uuid) index can serve the scan
+            direction = "-" if ordering[-1].startswith("-") else ""
+            ordering.append(f"{direction}{self.tie_breaker}")
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._build_link(reverse=False, instance=self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._build_link(reverse=True, instance=self.page[0])
+
+    def decode_cursor(self, request):
+        """Return the direction and the ordering values encoded in the cursor query parameter."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            reverse = bool(cursor["r"])
+            position = cursor["p"]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, reverse, position):
+        cursor = json.dumps({"r": int(reverse), "p": position}, cls=CursorEncoder, separators=(",", ":"))
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _build_link(self, reverse, instance):
+        position = [attrgetter(field.lstrip("-"))(instance) for field in self.ordering]
+        return self.encode_cursor(reverse, position)
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Build the row-value comparison ``(a, b, c) > (x, y, z)`` for the given ordering
+        as a chain of OR'ed prefixes, respecting the direction of every column.
+        The redundant ``a >= x`` in front lets the database seek to the cursor in the index
+        instead of scanning (and discarding) all rows of the previous pages.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal_prefix & Q(**{f"{name}__{lookup}": value})
+            equal_prefix &= Q(**{name: value})
+        first = ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+
+class HistoryPagination(KeysetPagination):
+    """
+    Keyset pagination of audit log entries (kompello.core.history), newest first.
+    Log entries have no uuid, their primary key breaks the ties between entries of the same time.
+    """
+
+    default_ordering = ("-timestamp",)
+    tie_breaker = "pk"
@@ -1,6 +1,8 @@
 from rest_framework.permissions import BasePermission
 from rest_framework.request import Request
 
+from kompello.core.membership import is_company_member
+
 
 class NoOne(BasePermission):
     """
@@ -21,4 +23,4 @@ class IsMemberOfCompany(BasePermission):
     """
     
     def has_object_permission(self, request: Request, view, obj):
-        return obj.company.members.filter(id=request.user.id).exists()
\ No newline at end of file
+        return is_company_member(request.user, obj.company_id)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Cache of rendered API responses for reference data (units, currencies, custom field metadata).
+
+Reference data changes a few times a year but is fetched on almost every screen. Responses of
+the viewsets using ResponseCacheMixin are stored as rendered JSON bytes (with their headers,
+ETag included) in the "responses" cache and served without querying or serializing anything.
+
+A cached response belongs to the companies whose objects it may show. Like the custom field
+registry, every company has a version token in the shared cache and the cache key contains the
+tokens of all companies of the response, along with the URL and the media type. The signal
+handlers in kompello.core.signals drop the token whenever a unit, currency, custom field
+definition or company changes, which makes every cached response of the company unreachable in
+all workers at once. The token is dropped right away and again once the transaction commits, so
+that no response rendered from the data in between outlives the write.
+"""
+
+import hashlib
+import json
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.connection import ConnectionProxy
+
+from kompello.app.config import CONFIG
+from kompello.core.conditional import not_modified
+
+VERSION_KEY = "responses:version:{company_id}"
+RESPONSE_KEY = "responses:{digest}"
+CACHE_TIMEOUT = CONFIG.get("RESPONSE_CACHE_TIMEOUT", 3600)
+# Responses are large and numerous, their own cache alias keeps them from evicting the small entries of "default"
+cache = ConnectionProxy(caches, "responses")
+
+# Headers of a stored response that depend on the request rather than the content
+_UNCACHED_HEADERS = {"set-cookie", "content-length"}
+
+
+def _new_versions(company_ids, versions: dict) -> dict:
+    """Hand out a version token to every company that has none, before its data is read."""
+    keys = [VERSION_KEY.format(company_id=company_id) for company_id in company_ids]
+    return {key: uuid4().hex for key in keys if key not in versions}
+
+
+def _response_key(request, company_ids, versions: dict) -> str:
+    payload = json.dumps([
+        [versions[VERSION_KEY.format(company_id=company_id)] for company_id in company_ids],
+        request.build_absolute_uri(),
+        getattr(request, "accepted_media_type", ""),
+    ])
+    return RESPONSE_KEY.format(digest=hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest())
+
+
+def get_response_key(request, company_ids) -> str:
+    """
+    Return the cache key of the response to a request that shows data of the given companies.
+
+    Args:
+        request: The API request; its URL and accepted media type are part of the key
+        company_ids: IDs of all companies the response may contain data of (none for global data)
+    """
+    company_ids = sorted(company_ids)
+    versions = cache.get_many([VERSION_KEY.format(company_id=company_id) for company_id in company_ids])
+    new_versions = _new_versions(company_ids, versions)
+    if new_versions:
+        cache.set_many(new_versions, CACHE_TIMEOUT)
+    return _response_key(request, company_ids, versions | new_versions)
+
+
+def _build_response(request, entry):
+    content, headers = entry
+    etag = headers.get("ETag")
+    if etag:
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+    response = HttpResponse(content)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def get_cached_response(request, key: str):
+    """Return the cached response for the key (or 304 if the client has it), None on a miss."""
+    entry = cache.get(key)
+    return None if entry is None else _build_response(request, entry)
+
+
+def _entry(response):
+    """Content and headers of a rendered response."""
+    headers = {name: value for name, value in response.items() if name.lower() not in _UNCACHED_HEADERS}
+    return response.content, headers
+
+
+def store_response(key: str, response) -> None:
+    """Store a rendered response under the key returned by get_response_key()."""
+    cache.set(key, _entry(response), CACHE_TIMEOUT)
+
+
+def invalidate_responses(company_ids) -> None:
+    """Make all cached responses of the given companies unreachable, now and once the current transaction commits."""
+    keys = [VERSION_KEY.format(company_id=company_id) for company_id in set(company_ids)]
+
+    def apply():
+        cache.delete_many(keys)
+
+    apply()
+    transaction.on_commit(apply)
@@ -0,0 +1,219 @@
+"""
+Full-text search over customers.
+
+Customers are indexed by name, email, notes and the street and city of their address in a
+database-native full-text index:
+
+- SQLite: the FTS5 virtual table core_customer_fts (rowid = customer ID)
+- PostgreSQL: the table core_customer_search with a weighted, unaccented tsvector column and a GIN index
+
+Both are created by migration 0011 and kept up to date by the signal handlers in
+kompello.core.signals, which call index_customers() whenever a customer or an address is saved
+or deleted. Writes that bypass signals (QuerySet.update(), raw SQL) are picked up by the
+rebuild_customer_search_index management command.
+"""
+
+import html
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.db import NotSupportedError, connection
+
+SQLITE_TABLE = "core_customer_fts"
+POSTGRES_TABLE = "core_customer_search"
+
+# Query terms beyond this are ignored, every term narrows the result and adds index lookups
+MAX_TERMS = 8
+# Number of IDs indexed per statement, well below SQLite's host parameter limit
+BATCH_SIZE = 500
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_ELLIPSIS = "…"
+# The database marks the matches with control characters, which are replaced by the <mark>
+# tags once the customer's text around them is HTML-escaped
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    customer_id: int
+    score: float
+    snippet: str
+
+
+def _vendor() -> str:
+    if connection.vendor not in ("sqlite", "postgresql"):
+        raise NotSupportedError(f"Customer search is not supported on {connection.vendor}.")
+    return connection.vendor
+
+
+def parse_terms(query: str) -> list[str]:
+    """Split a user query into plain lowercase terms without accents, all search syntax is dropped."""
+    decomposed = unicodedata.normalize("NFKD", query.lower())
+    query = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", query)[:MAX_TERMS]
+
+
+def index_customers(customer_ids) -> None:
+    """
+    (Re)index the given customers. IDs of customers that no longer exist are removed from the index.
+    """
+    if connection.vendor not in ("sqlite", "postgresql"):
+        return
+
+    customer_ids = list(customer_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(customer_ids), BATCH_SIZE):
+            batch = customer_ids[start:start + BATCH_SIZE]
+            if connection.vendor == "sqlite":
+                _index_sqlite(cursor, batch)
+            else:
+                _index_postgres(cursor, batch)
+
+
+def rebuild_index() -> int:
+    """Rebuild the whole index from the customer table and return the number of indexed customers."""
+    _vendor()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+            cursor.execute(_SQLITE_INSERT.format(where="1 = 1"))
+            # Merge the b-tree segments written by the bulk insert into one
+            cursor.execute(f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('optimize')")
+            cursor.execute(f"SELECT count(*) FROM {SQLITE_TABLE}")
+        else:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+            cursor.execute(_POSTGRES_INSERT.format(where="TRUE"))
+            cursor.execute(f"SELECT count(*) FROM {POSTGRES_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def search_customers(query: str, company_ids=None, limit: int = 20) -> list[SearchHit]:
+    """
+    Search customers and return the best matches first.
+
+    Every term of the query must match the start of a word in one of the indexed fields
+    ("jo do" finds "John Doe"). Name matches rank above email, address and notes matches.
+
+    Args:
+        query: The user's search input
+        company_ids: Only return customers of these companies (None for all companies)
+        limit: Maximum number of hits
+
+    Returns:
+        list: SearchHit per customer with a relevance score (higher is better) and a snippet
+              of the best matching field as HTML, the matched terms wrapped in <mark></mark>
+    """
+    vendor = _vendor()
+    terms = parse_terms(query)
+    if not terms or (company_ids is not None and not company_ids):
+        return []
+
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            rows = _search_sqlite(cursor, terms, company_ids, limit)
+        else:
+            rows = _search_postgres(cursor, terms, company_ids, limit)
+    return [SearchHit(customer_id, float(score), _snippet_markup(snippet or "")) for customer_id, score, snippet in rows]
+
+
+def _snippet_markup(snippet: str) -> str:
+    """HTML of a snippet: the text escaped, the matches marked with <mark></mark>."""
+    return html.escape(snippet).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+# SQLite (FTS5)
+
+# The company is stored as an indexed token ("c12") so that the full-text index narrows the
+# matches to the requested companies before they are ranked, filtering an UNINDEXED column
+# would rank the matches of all companies first. Migration 0011 configures the default
+# ranking (bm25 weighted per column) used by ORDER BY rank.
+_SQLITE_INSERT = f"""
+    INSERT INTO {SQLITE_TABLE} (rowid, firstname, lastname, email, city, street, notes, company)
+    SELECT c.id, c.firstname, c.lastname, c.email, COALESCE(a.city, ''), COALESCE(a.street, ''), c.notes, 'c' || c.company_id
+    FROM core_customer c LEFT JOIN core_address a ON a.id = c.address_id
+    WHERE {{where}}
+"""
+
+_SQLITE_SEARCH_COLUMNS = "{firstname lastname email city street notes}"
+
+
+def _index_sqlite(cursor, customer_ids):
+    placeholders = ", ".join(["%s"] * len(customer_ids))
+    cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({placeholders})", customer_ids)
+    cursor.execute(_SQLITE_INSERT.format(where=f"c.id IN ({placeholders})"), customer_ids)
+
+
+def _search_sqlite(cursor, terms, company_ids, limit):
+    # Quoted prefix terms ("jo"*) are implicitly ANDed and can't be parsed as FTS5 operators
+    phrases = " ".join(f'"{term}"*' for term in terms)
+    match = f"{_SQLITE_SEARCH_COLUMNS} : ({phrases})"
+    if company_ids is not None:
+        companies = " OR ".join(f"c{company_id}" for company_id in sorted(company_ids))
+        match = f"company : ({companies}) AND {match}"
+
+    # rank is lower for better matches
+    cursor.execute(
+        f"""
+        SELECT rowid, -rank, snippet({SQLITE_TABLE}, -1, %s, %s, %s, 12)
+        FROM {SQLITE_TABLE}
+        WHERE {SQLITE_TABLE} MATCH %s
+        ORDER BY rank, rowid
+        LIMIT %s
+        """,
+        [_MATCH_START, _MATCH_END, SNIPPET_ELLIPSIS, match, limit],
+    )
+    return cursor.fetchall()
+
+
+# PostgreSQL (tsvector + GIN)
+
+_POSTGRES_INSERT = f"""
+    INSERT INTO {POSTGRES_TABLE} (customer_id, company_id, content, document)
+    SELECT c.id, c.company_id,
+           concat_ws(' ', c.firstname, c.lastname, c.email, a.street, a.city, c.notes),
+           setweight(to_tsvector('simple', unaccent(c.firstname || ' ' || c.lastname)), 'A')
+           || setweight(to_tsvector('simple', unaccent(c.email || ' ' || translate(c.email, '@.', '  '))), 'B')
+           || setweight(to_tsvector('simple', unaccent(concat_ws(' ', a.city, a.street))), 'C')
+           || setweight(to_tsvector('simple', unaccent(c.notes)), 'D')
+    FROM core_customer c LEFT JOIN core_address a ON a.id = c.address_id
+    WHERE {{where}}
+"""
+
+
+def _index_postgres(cursor, customer_ids):
+    cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE customer_id = ANY(%s)", [customer_ids])
+    cursor.execute(_POSTGRES_INSERT.format(where="c.id = ANY(%s)"), [customer_ids])
+
+
+def _search_postgres(cursor, terms, company_ids, limit):
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    headline_options = (
+        f'StartSel="{_MATCH_START}", StopSel="{_MATCH_END}", FragmentDelimiter={SNIPPET_ELLIPSIS}, MaxWords=12, MinWords=4'
+    )
+    params = [headline_options, tsquery]
+    company_filter = ""
+    if company_ids is not None:
+        company_filter = "AND s.company_id = ANY(%s)"
+        params.append(list(company_ids))
+    params.append(limit)
+
+    # ts_headline() re-parses the content, so it only runs for the rows on the requested page
+    cursor.execute(
+        f"""
+        SELECT hit.customer_id, hit.score, ts_headline('simple', hit.content, hit.q, %s)
+        FROM (
+            SELECT s.customer_id, s.content, q, ts_rank(s.document, q) AS score
+            FROM {POSTGRES_TABLE} s, to_tsquery('simple', unaccent(%s)) q
+            WHERE s.document @@ q {company_filter}
+            ORDER BY score DESC, s.customer_id
+            LIMIT %s
+        ) hit
+        ORDER BY hit.score DESC, hit.customer_id
+        """,
+        params,
+    )
+    return cursor.fetchall()
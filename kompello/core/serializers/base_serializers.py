@@ -1,4 +1,40 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
 class UuidListSerializer(serializers.Serializer):
     uuids = serializers.ListField(child=serializers.UUIDField())
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """Query parameters of the autocomplete endpoints."""
+    company = serializers.UUIDField(help_text="Company to autocomplete in")
+    q = serializers.CharField(help_text="Start of the name, case and accents are ignored")
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=50)
+
+
+class AutocompleteSuggestionSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField(read_only=True)
+    label = serializers.CharField(read_only=True)
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField that resolves values from objects preloaded into the serializer context
+    instead of issuing one query per value. Used by bulk endpoints, which load all referenced
+    objects with a single IN query up front.
+
+    The context is expected to contain ``preloaded[Model][str(slug)] -> instance``.
+    If nothing was preloaded for the model, the field behaves like a regular SlugRelatedField.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {}).get(self.get_queryset().model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            slug = str(self.get_queryset().model._meta.get_field(self.slug_field).to_python(data))
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("invalid")
+        if slug not in preloaded:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=str(data))
+        return preloaded[slug]
@@ -1,10 +1,17 @@
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
 
-from kompello.core.models.custom_field_models import CustomFieldDefinition, CustomFieldInstance
+from kompello.core.audit import log_custom_field_changes
+from kompello.core.custom_field_registry import get_definition_set
+from kompello.core.models.custom_field_models import (
+    CustomFieldCacheModel,
+    CustomFieldDefinition,
+    CustomFieldInstance,
+)
 from kompello.core.models.company_models import Company
 
 
@@ -95,6 +102,11 @@ class CustomFieldInstanceSerializer(serializers.Serializer):
         fields = ['key', 'name', 'data_type', 'value']
 
 
+def _has_custom_fields_cache(instance):
+    """Whether the instance carries a loaded custom_fields_cache (the column may be deferred by .only())."""
+    return isinstance(instance, CustomFieldCacheModel) and 'custom_fields_cache' not in instance.get_deferred_fields()
+
+
 @extend_schema_field(OpenApiTypes.OBJECT)
 class CustomFieldValueSerializer(serializers.Serializer):
     """
@@ -109,12 +121,31 @@ class CustomFieldValueSerializer(serializers.Serializer):
             raise serializers.ValidationError("Custom fields must be a dictionary of key-value pairs.")
         return data
 
+    def get_attribute(self, instance):
+        """
+        Return the object's custom field values in the cheapest available form: the denormalized
+        copy of models that have one, the prefetch cache of the generic relation if it was
+        prefetched (together with custom_field), or else a single query joining the definitions.
+        """
+        if _has_custom_fields_cache(instance):
+            return instance.custom_fields_cache
+
+        manager = getattr(instance, self.source_attrs[0], None)
+        if manager is None:
+            return {}
+        if manager.prefetch_cache_name in getattr(instance, '_prefetched_objects_cache', {}):
+            return manager.all()
+        return manager.select_related('custom_field')
+    
     def to_representation(self, instance):
         """Convert custom field instances to a simple key-value dictionary."""
         if not instance:
             return {}
-        # Handle both querysets/lists and GenericRelatedObjectManager
-        if hasattr(instance, 'all'):
+        if isinstance(instance, dict):
+            return dict(instance)
+        # Handle both querysets/lists and GenericRelatedObjectManager (a queryset is iterated
+        # as is, cloning it with .all() would drop an already prefetched result cache)
+        if isinstance(instance, models.Manager):
             instance = instance.all()
         return {cf.custom_field.key: cf.value for cf in instance}
 
@@ -144,19 +175,6 @@ class CustomFieldMixin:
             fields['custom_fields'] = CustomFieldValueSerializer(required=False, allow_null=True)
         return fields
     
-    def to_representation(self, instance):
-        """Include custom fields in the serialized output."""
-        data = super().to_representation(instance)
-        
-        # Get all custom field instances for this object
-        if hasattr(instance, 'custom_fields'):
-            custom_field_instances = instance.custom_fields.select_related('custom_field').all()
-            data['custom_fields'] = {cf.custom_field.key: cf.value for cf in custom_field_instances}
-        else:
-            data['custom_fields'] = {}
-        
-        return data
-    
     def create(self, validated_data):
         """Create instance with custom fields."""
         custom_fields_data = validated_data.pop('custom_fields', {})
@@ -181,6 +199,12 @@ class CustomFieldMixin:
         """
         Save custom field instances for the given object.
         
+        Uses a fixed number of queries regardless of the number of keys: one for the
+        definitions (skipped when they are cached), one for the existing instances,
+        one bulk insert and one bulk update, plus two to refresh custom_fields_cache
+        on models that have one. Values that did not change are not written.
+        Changed values of definitions with track_history are recorded in the audit log.
+        
         Args:
             instance: The model instance to attach custom fields to
             custom_fields_data: Dictionary mapping field keys to values
@@ -197,75 +221,119 @@ class CustomFieldMixin:
                 "custom_fields": "Model does not have a company field. Custom fields require company association."
             })
         
-        company = instance.company
+        # Custom field definitions for this model type and company, usually served from the registry cache
+        definition_set = get_definition_set(instance.company_id, content_type.id)
         
-        # Get all custom field definitions for this model type and company
-        field_definitions_qs = CustomFieldDefinition.objects.filter(
-            model_type=content_type,
-            company=company
-        )
-        field_definitions = {cfd.key: cfd for cfd in field_definitions_qs}
-        
-        # Process each custom field in the data
+        # Validate everything up front so an invalid key never leaves a partial write behind
+        definitions = {}
+        values = {}
         for field_key, value in custom_fields_data.items():
-            # Validate that the field definition exists
-            if field_key not in field_definitions:
-                raise serializers.ValidationError({
-                    "custom_fields": f"Custom field '{field_key}' does not exist for this model type and company."
-                })
-            
-            field_definition = field_definitions[field_key]
-            
-            # Check if field is archived
-            if field_definition.is_archived:
-                raise serializers.ValidationError({
-                    "custom_fields": f"Cannot set value for archived custom field '{field_key}'."
-                })
-            
-            # Validate value type based on data_type
-            self._validate_custom_field_value(field_definition, field_key, value)
-            
-            # Create or update the custom field instance
-            try:
-                CustomFieldInstance.objects.update_or_create(
-                    custom_field=field_definition,
+            definition = self._check_custom_field(definition_set, field_key, value)
+            definitions[definition.id] = definition
+            values[definition.id] = value
+        
+        # Load all existing instances for this object with one query
+        existing = {
+            cfi.custom_field_id: cfi
+            for cfi in CustomFieldInstance.objects.filter(
+                content_type=content_type,
+                object_id=instance.id,
+                custom_field_id__in=values,
+            )
+        }
+        
+        to_create = []
+        to_update = []
+        changes = []
+        now = timezone.now()
+        for field_id, value in values.items():
+            cfi = existing.get(field_id)
+            if cfi is None:
+                cfi = CustomFieldInstance(
+                    custom_field=definitions[field_id],
                     content_type=content_type,
                     object_id=instance.id,
-                    defaults={'value': value}
+                    value=value,
                 )
-            except DjangoValidationError as e:
-                raise serializers.ValidationError({
-                    "custom_fields": f"Error saving custom field '{field_key}': {str(e)}"
-                })
+                cfi.fill_typed_values()
+                to_create.append(cfi)
+                changes.append((definitions[field_id], None, value))
+            elif not self._same_custom_field_value(cfi.value, value):
+                # bulk_update does not apply auto_now, so keep modified_on current by hand
+                changes.append((definitions[field_id], cfi.value, value))
+                cfi.custom_field = definitions[field_id]
+                cfi.value = value
+                cfi.modified_on = now
+                cfi.fill_typed_values()
+                to_update.append(cfi)
+        
+        if not to_create and not to_update:
+            return
+        
+        # Archived definitions were rejected by _check_custom_field, which replaces the
+        # per-row check in CustomFieldInstance.save() that bulk_create skips
+        with transaction.atomic():
+            if to_create:
+                CustomFieldInstance.objects.bulk_create(to_create)
+            if to_update:
+                CustomFieldInstance.objects.bulk_update(
+                    to_update, ["value", "value_text", "value_number", "value_boolean", "modified_on"]
+                )
+            if isinstance(instance, CustomFieldCacheModel):
+                instance.refresh_custom_fields_cache()
+            # bulk_create and bulk_update send no signals
+            log_custom_field_changes(instance, changes)
     
-    def _validate_custom_field_value(self, field_definition, field_key, value):
+    @staticmethod
+    def _same_custom_field_value(current, new):
+        """Compare JSON values strictly, so e.g. 1 -> True or 1 -> 1.0 still counts as a change."""
+        return type(current) is type(new) and current == new
+    
+    def _check_custom_field(self, definition_set, field_key, value):
+        """
+        Validate a single custom field value against the available definitions.
+        
+        Args:
+            definition_set: The DefinitionSet of the object's company and model type
+            field_key: The field key to check
+            value: The value to validate
+        
+        Returns:
+            CustomFieldDefinition: The definition the value belongs to
+        """
+        # Validate that the field definition exists
+        if field_key not in definition_set.definitions:
+            raise serializers.ValidationError({
+                "custom_fields": f"Custom field '{field_key}' does not exist for this model type and company."
+            })
+        
+        # Check if field is archived
+        if field_key in definition_set.archived:
+            raise serializers.ValidationError({
+                "custom_fields": f"Cannot set value for archived custom field '{field_key}'."
+            })
+        
+        # Validate value type based on data_type
+        self._validate_custom_field_value(definition_set, field_key, value)
+        return definition_set.definitions[field_key]
+    
+    def _validate_custom_field_value(self, definition_set, field_key, value):
         """
         Validate that the value matches the expected data type.
         
         Args:
-            field_definition: The CustomFieldDefinition instance
+            definition_set: The DefinitionSet holding the field's accepted value types
             field_key: The field key (for error messages)
             value: The value to validate
         """
         if value is None:
             return  # Allow null values
         
-        data_type = field_definition.data_type
-        
-        if data_type == CustomFieldDefinition.FieldDataType.TEXT:
-            if not isinstance(value, str):
-                raise serializers.ValidationError({
-                    "custom_fields": f"Custom field '{field_key}' expects a text value, got {type(value).__name__}."
-                })
-        
-        elif data_type == CustomFieldDefinition.FieldDataType.NUMBER:
-            if not isinstance(value, (int, float)):
-                raise serializers.ValidationError({
-                    "custom_fields": f"Custom field '{field_key}' expects a number value, got {type(value).__name__}."
-                })
+        if field_key not in definition_set.value_types:
+            return
         
-        elif data_type == CustomFieldDefinition.FieldDataType.BOOLEAN:
-            if not isinstance(value, bool):
-                raise serializers.ValidationError({
-                    "custom_fields": f"Custom field '{field_key}' expects a boolean value, got {type(value).__name__}."
-                })
+        type_name, accepted_types = definition_set.value_types[field_key]
+        if not isinstance(value, accepted_types):
+            raise serializers.ValidationError({
+                "custom_fields": f"Custom field '{field_key}' expects a {type_name} value, got {type(value).__name__}."
+            })
@@ -4,6 +4,7 @@ Serializers for Customer and Address models.
 
 from rest_framework import serializers
 
+from kompello.app.config import CONFIG
 from kompello.core.models.customer_models import Address, Customer
 from kompello.core.models import Company
 
@@ -126,3 +127,59 @@ class CustomerListSerializer(serializers.ModelSerializer):
         if obj.address:
             return f"{obj.address.city}, {obj.address.country}"
         return None
+
+
+class CustomerSearchResultSerializer(CustomerListSerializer):
+    """Customer search hit, a list entry with its relevance and the best matching text."""
+    
+    score = serializers.FloatField(read_only=True, help_text="Relevance of the hit, higher is better")
+    snippet = serializers.CharField(
+        read_only=True,
+        help_text="Best matching field as escaped HTML, the matched terms wrapped in <mark></mark>",
+    )
+    
+    class Meta(CustomerListSerializer.Meta):
+        fields = CustomerListSerializer.Meta.fields + ["score", "snippet"]
+        read_only_fields = fields
+
+
+class CustomerSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the customer search."""
+    
+    q = serializers.CharField(help_text="Search terms, each term matches the start of a word")
+    company = serializers.UUIDField(required=False, help_text="Only search customers of this company")
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+
+class CustomerImportRowSerializer(CustomerSerializer):
+    """
+    One row of a customer import, validated with the rules of CustomerSerializer.
+    The company is the same for all rows and given by the import itself.
+    """
+    
+    # Fields that can identify a customer across re-runs of an import
+    key_fields = ["email", "mobile_phone", "landline_phone"]
+    
+    class Meta(CustomerSerializer.Meta):
+        fields = [
+            field for field in CustomerSerializer.Meta.fields
+            if field not in ("uuid", "company", "created_on", "modified_on")
+        ]
+
+
+class CustomerImportSerializer(serializers.Serializer):
+    """Form data of a customer import."""
+    
+    file = serializers.FileField(
+        help_text="UTF-8 CSV file with a header row, in the columns of the customer export"
+    )
+    company = serializers.UUIDField(help_text="Company the customers are imported into")
+    key = serializers.ChoiceField(
+        choices=CustomerImportRowSerializer.key_fields,
+        required=False,
+        default=CONFIG.get("CUSTOMER_IMPORT_KEY", "email"),
+        help_text=(
+            "Field identifying a customer. Rows whose value matches a customer of the company "
+            "(or an earlier row) are skipped, which makes re-running an import safe."
+        ),
+    )
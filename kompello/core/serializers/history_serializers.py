@@ -0,0 +1,56 @@
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from rest_framework import serializers
+
+from kompello.core.models.auth_models import KompelloUser
+
+ACTIONS = {
+    LogEntry.Action.CREATE: "create",
+    LogEntry.Action.UPDATE: "update",
+    LogEntry.Action.DELETE: "delete",
+    LogEntry.Action.ACCESS: "access",
+}
+
+
+class HistoryQuerySerializer(serializers.Serializer):
+    """Query parameters of the history and activity endpoints."""
+    actor = serializers.SlugRelatedField(
+        slug_field="uuid",
+        queryset=KompelloUser.objects.all(),
+        required=False,
+        help_text="Only changes made by this user",
+    )
+    since = serializers.DateTimeField(required=False, help_text="Only changes from this time on")
+    until = serializers.DateTimeField(required=False, help_text="Only changes before this time")
+
+
+class HistoryActorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = KompelloUser
+        fields = ["uuid", "email", "first_name", "last_name"]
+        read_only_fields = fields
+
+
+class LogEntrySerializer(serializers.ModelSerializer):
+    """
+    One recorded change. changes maps each changed field (or custom_fields.<key>) to its old and
+    new value as text, "None" standing for no value.
+
+    object_uuid is set on the entries by the views, LogEntry doesn't store it.
+    """
+    action = serializers.SerializerMethodField()
+    actor = HistoryActorSerializer(read_only=True)
+    model = serializers.SerializerMethodField()
+    object_uuid = serializers.UUIDField(read_only=True, allow_null=True, default=None)
+
+    class Meta:
+        model = LogEntry
+        fields = ["id", "timestamp", "action", "actor", "model", "object_uuid", "object_repr", "changes"]
+        read_only_fields = fields
+
+    def get_action(self, obj) -> str:
+        return ACTIONS.get(obj.action, str(obj.action))
+
+    def get_model(self, obj) -> str:
+        # ContentType.objects caches every content type after its first lookup
+        return ContentType.objects.get_for_id(obj.content_type_id).model
@@ -2,11 +2,27 @@
 Serializers for Item model.
 """
 
+from decimal import Decimal
+
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+from django.utils import timezone
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_serializer, OpenApiExample
 
+from kompello.core.audit import log_changes
+from kompello.core.autocomplete import invalidate_autocomplete
+from kompello.core.custom_field_registry import get_definition_sets
 from kompello.core.models.billing_models import Item, Currency, Unit
 from kompello.core.models import Company
+from kompello.core.models.custom_field_models import CustomFieldInstance
+from kompello.core.response_cache import invalidate_responses
+from kompello.core.serializers.base_serializers import PreloadedSlugRelatedField
 from kompello.core.serializers.currency_serializers import CurrencySerializer
 from kompello.core.serializers.unit_serializers import UnitSerializer
 from kompello.core.serializers.custom_field_serializers import CustomFieldMixin, CustomFieldValueSerializer
@@ -127,10 +143,14 @@ class ItemSerializer(CustomFieldMixin, serializers.ModelSerializer):
 
 
 class ItemListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for listing items."""
+    """Lightweight serializer for listing items. Custom fields are only included with ?include=custom_fields."""
     
     currency_symbol = serializers.CharField(source='currency.symbol', read_only=True)
     unit_short_name = serializers.CharField(source='unit.short_name', read_only=True)
+    custom_fields = CustomFieldValueSerializer(
+        read_only=True,
+        help_text='Custom field values as key-value pairs. Only included with ?include=custom_fields.'
+    )
     
     class Meta:
         model = Item
@@ -142,6 +162,250 @@ class ItemListSerializer(serializers.ModelSerializer):
             "price_max",
             "currency_symbol",
             "unit_short_name",
+            "custom_fields",
             "created_on",
         ]
         read_only_fields = ["uuid", "company", "created_on", "currency_symbol", "unit_short_name"]
+        optional_fields = ["custom_fields"]
+
+
+class ItemBulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer for creating many items at once.
+    Items and their custom field instances are inserted with bulk_create inside one transaction.
+    """
+    batch_size = 1000
+
+    @staticmethod
+    def preload(rows) -> dict:
+        """
+        Load every company, currency, unit and custom field definition referenced by the given
+        raw rows with one IN query per model (definitions usually come from the registry cache).
+        The result is meant to be merged into the
+        serializer context so that validation of the rows doesn't touch the database.
+        """
+        rows = [row for row in rows if isinstance(row, dict)]
+
+        def uuids(key):
+            values = set()
+            for row in rows:
+                try:
+                    values.add(Item._meta.get_field("uuid").to_python(row.get(key)))
+                except DjangoValidationError:
+                    continue
+            values.discard(None)
+            return values
+
+        companies = {str(c.uuid): c for c in Company.objects.filter(uuid__in=uuids("company"))}
+        currencies = {str(c.uuid): c for c in Currency.objects.filter(uuid__in=uuids("currency"))}
+        units = {str(u.uuid): u for u in Unit.objects.filter(uuid__in=uuids("unit"))}
+
+        definition_sets = get_definition_sets(
+            [company.id for company in companies.values()],
+            ContentType.objects.get_for_model(Item).id,
+        )
+
+        return {
+            "preloaded": {Company: companies, Currency: currencies, Unit: units},
+            "custom_field_definitions": definition_sets,
+        }
+
+    def create(self, validated_data):
+        content_type = ContentType.objects.get_for_model(Item)
+        custom_fields = [row.pop("custom_fields", None) or {} for row in validated_data]
+        definition_sets = self.context["custom_field_definitions"]
+
+        with transaction.atomic():
+            items = Item.objects.bulk_create(
+                [Item(**row, custom_fields_cache=values) for row, values in zip(validated_data, custom_fields)],
+                batch_size=self.batch_size,
+            )
+            instances = []
+            for item, values in zip(items, custom_fields):
+                for key, value in values.items():
+                    instance = CustomFieldInstance(
+                        custom_field=definition_sets[item.company_id].definitions[key],
+                        content_type=content_type,
+                        object_id=item.id,
+                        value=value,
+                    )
+                    instance.fill_typed_values()
+                    instances.append(instance)
+            CustomFieldInstance.objects.bulk_create(instances, batch_size=self.batch_size)
+            # bulk_create sends no signals
+            invalidate_autocomplete({item.company_id for item in items})
+        return items
+
+
+class ItemBulkSerializer(ItemSerializer):
+    """
+    Serializer for one row of a bulk item creation.
+    Applies the same validation as ItemSerializer, but resolves related objects and custom field
+    definitions from the preloaded context (see ItemBulkListSerializer.preload).
+
+    Expects "company_ids" in the context: the IDs of the companies the user may add items to,
+    or None for admin users.
+    """
+
+    company = PreloadedSlugRelatedField(
+        slug_field='uuid',
+        queryset=Company.objects.all(),
+        required=True
+    )
+    currency = PreloadedSlugRelatedField(
+        slug_field='uuid',
+        queryset=Currency.objects.all(),
+        required=True
+    )
+    unit = PreloadedSlugRelatedField(
+        slug_field='uuid',
+        queryset=Unit.objects.all(),
+        required=True
+    )
+
+    class Meta(ItemSerializer.Meta):
+        list_serializer_class = ItemBulkListSerializer
+
+    def validate(self, data):
+        data = super().validate(data)
+        company = data['company']
+
+        company_ids = self.context.get("company_ids")
+        if company_ids is not None and company.id not in company_ids:
+            raise serializers.ValidationError({
+                "company": "You do not have permission to add items to this company."
+            })
+
+        definition_set = self.context["custom_field_definitions"][company.id]
+        for field_key, value in (data.get('custom_fields') or {}).items():
+            self._check_custom_field(definition_set, field_key, value)
+
+        return data
+
+
+class ItemPriceUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for a set-based price update of many items.
+
+    The filter fields select the items (company or uuids is required), the operation fields
+    describe the new price:
+    - price: set price_per_unit to an absolute value
+    - percentage: change price_per_unit and price_max by a percentage (e.g. 5 or -10)
+    - round_to: round prices to a multiple of this increment (e.g. 0.05 or 1.00),
+      applied after price/percentage
+    """
+
+    company = serializers.UUIDField(
+        required=False, help_text="Only update items of this company. Required unless uuids is given."
+    )
+    currency = serializers.UUIDField(required=False, help_text="Only update items with this currency.")
+    unit = serializers.UUIDField(required=False, help_text="Only update items with this unit.")
+    uuids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False,
+        help_text="Only update the items with these UUIDs."
+    )
+
+    price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal("0"), required=False,
+        help_text="New absolute price per unit. price_max is raised to this value where it would be lower."
+    )
+    percentage = serializers.DecimalField(
+        max_digits=7, decimal_places=2, min_value=Decimal("-100"), required=False,
+        help_text="Relative price change in percent, applied to price_per_unit and price_max."
+    )
+    round_to = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal("0.01"), required=False,
+        help_text="Round prices to a multiple of this increment."
+    )
+
+    def validate(self, data):
+        if "price" in data and "percentage" in data:
+            raise serializers.ValidationError("Provide either price or percentage, not both.")
+        if not any(key in data for key in ("price", "percentage", "round_to")):
+            raise serializers.ValidationError("Provide at least one of price, percentage or round_to.")
+        # Never update every item the user can see by accident
+        if "company" not in data and "uuids" not in data:
+            raise serializers.ValidationError({"company": "Provide the company (or the uuids) of the items to update."})
+        return data
+
+    def filter_queryset(self, queryset):
+        """Apply the filter fields to the given item queryset."""
+        data = self.validated_data
+        if "company" in data:
+            queryset = queryset.filter(company__uuid=data["company"])
+        if "currency" in data:
+            queryset = queryset.filter(currency__uuid=data["currency"])
+        if "unit" in data:
+            queryset = queryset.filter(unit__uuid=data["unit"])
+        if "uuids" in data:
+            queryset = queryset.filter(uuid__in=data["uuids"])
+        return queryset
+
+    def get_price_expressions(self) -> dict:
+        """
+        Build the F() expressions for the UPDATE statement.
+        Both prices are transformed with the same monotonic function (scaling by a non-negative
+        factor, rounding) so price_max >= price_per_unit keeps holding for every row.
+        """
+        data = self.validated_data
+        output_field = Item._meta.get_field("price_per_unit")
+        price_per_unit = F("price_per_unit")
+        price_max = F("price_max")
+
+        if "price" in data:
+            price_per_unit = Value(data["price"], output_field=output_field)
+        elif "percentage" in data:
+            factor = Value(1 + data["percentage"] / 100, output_field=DecimalField())
+            price_per_unit = Round(price_per_unit * factor, 2, output_field=output_field)
+            price_max = Round(price_max * factor, 2, output_field=output_field)
+
+        if "round_to" in data:
+            step = Value(data["round_to"], output_field=DecimalField())
+            price_per_unit = Round(price_per_unit / step, output_field=output_field) * step
+            price_max = Round(price_max / step, output_field=output_field) * step
+
+        if "price" in data:
+            # An absolute price may exceed the current maximum; raise the maximum along with it
+            price_max = Case(
+                When(price_max__lt=price_per_unit, then=price_per_unit),
+                default=price_max,
+                output_field=output_field,
+            )
+
+        return {"price_per_unit": price_per_unit, "price_max": price_max, "modified_on": timezone.now()}
+
+    def update_prices(self, queryset) -> int:
+        """
+        Run the price update as a single UPDATE statement and return the number of affected rows.
+
+        UPDATE sends no signals, so the changed prices are recorded in the audit log here (from one
+        query for the prices before and one for the items after the update) and the cached
+        responses of the items' companies are dropped. modified_on is set by the UPDATE itself,
+        which changes the ETag and Last-Modified of every updated item.
+        """
+        queryset = self.filter_queryset(queryset)
+        with transaction.atomic(using=queryset.db):
+            before = {
+                pk: (price_per_unit, price_max)
+                for pk, price_per_unit, price_max in queryset.values_list("pk", "price_per_unit", "price_max")
+            }
+            updated = queryset.update(**self.get_price_expressions())
+
+            company_ids = set()
+            for item in queryset.select_related("currency", "unit"):
+                if item.pk not in before:
+                    continue
+                company_ids.add(item.company_id)
+                changes = {
+                    name: [smart_str(old), smart_str(new)]
+                    for name, old, new in zip(("price_per_unit", "price_max"), before[item.pk], (item.price_per_unit, item.price_max))
+                    if old != new
+                }
+                if changes:
+                    log_changes(item, LogEntry.Action.UPDATE, changes, queryset.db)
+            invalidate_responses(company_ids)
+        return updated
+
+
+class ItemPriceUpdateResultSerializer(serializers.Serializer):
+    updated = serializers.IntegerField(help_text="Number of updated items.")
@@ -0,0 +1,168 @@
+"""
+Signal handlers of the core app, connected in CoreConfig.ready().
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from kompello.core.autocomplete import CUSTOMERS, ITEMS, invalidate_autocomplete, update_autocomplete
+from kompello.core.custom_field_registry import invalidate_definition_sets
+from kompello.core.membership import invalidate_company_id, invalidate_company_ids
+from kompello.core.response_cache import invalidate_responses
+from kompello.core.search import index_customers
+from kompello.core.sqlite_profile import apply_pragmas, get_pragmas
+from kompello.core.models.auth_models import KompelloUser
+from kompello.core.models.billing_models import Currency, Item, Unit
+from kompello.core.models.company_models import Company
+from kompello.core.models.custom_field_models import (
+    CustomFieldCacheModel,
+    CustomFieldDefinition,
+    CustomFieldInstance,
+)
+from kompello.core.models.customer_models import Address, Customer
+
+
+@receiver(m2m_changed, sender=Company.members.through)
+def company_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the cached company sets of all users whose membership changed."""
+    if action == "pre_clear":
+        # pk_set is not provided for clear(), so remember who is affected before the rows are gone
+        if reverse:
+            instance._cleared_member_ids = [instance.id]
+        else:
+            instance._cleared_member_ids = list(instance.members.values_list("id", flat=True))
+    elif action == "post_clear":
+        invalidate_company_ids(getattr(instance, "_cleared_member_ids", []))
+    elif action in ("post_add", "post_remove"):
+        # reverse=True means the change was made from the user side (user.companies.add(...))
+        invalidate_company_ids([instance.id] if reverse else pk_set)
+
+
+@receiver(pre_delete, sender=Company)
+def company_deleted(sender, instance, **kwargs):
+    """Deleting a company removes its memberships without sending m2m_changed."""
+    invalidate_company_ids(instance.members.values_list("id", flat=True))
+    invalidate_company_id(instance.uuid)
+
+
+@receiver(post_save, sender=KompelloUser)
+def user_saved(sender, instance, created, **kwargs):
+    """A new user must never inherit a cached company set (e.g. from a reused ID)."""
+    if created:
+        invalidate_company_ids([instance.id])
+
+
+@receiver(post_delete, sender=KompelloUser)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_company_ids([instance.id])
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, created, **kwargs):
+    """A new company must never inherit cached custom field definitions or autocomplete indexes (e.g. from a reused ID)."""
+    if created:
+        invalidate_definition_sets([instance.id])
+        invalidate_autocomplete([instance.id])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def reference_data_changed(sender, instance, **kwargs):
+    """Cached responses show the units and currencies of their companies, along with the company."""
+    invalidate_responses([instance.id if sender is Company else instance.company_id])
+
+
+@receiver(pre_save, sender=CustomFieldDefinition)
+def custom_field_definition_changing(sender, instance, **kwargs):
+    """Remember the stored company and key of a definition before it is overwritten."""
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list("company_id", "key").first()
+        if previous is not None:
+            # A definition moved to another company also has to disappear from the old company's sets
+            invalidate_definition_sets([previous[0]])
+            invalidate_responses([previous[0]])
+            instance._previous_key = previous[1]
+
+
+@receiver(post_save, sender=CustomFieldDefinition)
+@receiver(post_delete, sender=CustomFieldDefinition)
+def custom_field_definition_changed(sender, instance, **kwargs):
+    invalidate_definition_sets([instance.company_id])
+    invalidate_responses([instance.company_id])
+
+    # Renaming a key changes the cached values of every object that has a value for it
+    if getattr(instance, "_previous_key", instance.key) != instance.key:
+        model = ContentType.objects.get_for_id(instance.model_type_id).model_class()
+        if model is not None and issubclass(model, CustomFieldCacheModel):
+            model.rebuild_custom_fields_cache(instance.instances.values_list("object_id", flat=True))
+    instance._previous_key = instance.key
+
+
+@receiver(post_save, sender=CustomFieldInstance)
+@receiver(post_delete, sender=CustomFieldInstance)
+def custom_field_instance_changed(sender, instance, **kwargs):
+    """
+    Keep the denormalized custom_fields_cache in sync with single-row writes.
+    CustomFieldMixin writes in bulk (no signals) and refreshes the cache itself.
+    """
+    model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+    if model is not None and issubclass(model, CustomFieldCacheModel):
+        model.rebuild_custom_fields_cache([instance.object_id])
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def customer_changed(sender, instance, **kwargs):
+    """Keep the customer search index in sync with single-row writes."""
+    index_customers([instance.id])
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved_autocomplete(sender, instance, **kwargs):
+    update_autocomplete(CUSTOMERS, instance)
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted_autocomplete(sender, instance, **kwargs):
+    update_autocomplete(CUSTOMERS, instance, deleted=True)
+
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, **kwargs):
+    update_autocomplete(ITEMS, instance)
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    update_autocomplete(ITEMS, instance, deleted=True)
+
+
+@receiver(post_save, sender=Address)
+def address_saved(sender, instance, created, **kwargs):
+    """Street and city are indexed with every customer living at the address."""
+    if not created:
+        index_customers(instance.customers.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Address)
+def address_deleting(sender, instance, **kwargs):
+    """Customers keep existing without the address (SET_NULL), which doesn't send save signals."""
+    instance._customer_ids = list(instance.customers.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Address)
+def address_deleted(sender, instance, **kwargs):
+    index_customers(getattr(instance, "_customer_ids", []))
+
+
+@receiver(connection_created)
+def database_connected(sender, connection, **kwargs):
+    """Apply the SQLite performance profile to every new SQLite connection."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, get_pragmas())
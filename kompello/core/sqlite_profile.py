@@ -0,0 +1,59 @@
+"""
+Performance profile for SQLite databases.
+
+SQLite's defaults (rollback journal, synchronous=FULL, no memory mapping) make readers and
+writers block each other, so concurrent requests fail with "database is locked". Every new
+connection therefore gets the pragmas below, applied by the connection_created handler in
+kompello.core.signals:
+
+- journal_mode=WAL: readers never block the writer and the writer never blocks readers. The mode
+  is stored in the database file, so it persists after the first connection, and SQLite keeps
+  db.sqlite3-wal and db.sqlite3-shm next to the file while it is open (both are git-ignored).
+  {"journal_mode": null} stops setting it, {"journal_mode": "DELETE"} switches a file back
+- synchronous=NORMAL: fsync only at checkpoints, which is safe with WAL (a power loss can
+  lose the last commits, but never corrupts the database)
+- mmap_size / cache_size: read pages through memory mapping and keep more of them cached
+- busy_timeout: wait for a concurrent writer instead of failing right away
+- temp_store=MEMORY: sorts and temporary indexes don't touch the disk
+
+SQLITE_PRAGMAS in config.json overrides single pragmas (null skips one). Writers wait for each
+other in busy_timeout only when their transactions start as writes. SQLITE_TRANSACTION_MODE =
+"IMMEDIATE" does that for every transaction.atomic() block (see settings), at the price of
+taking the write lock in read-only blocks too, so it is opt-in and Django's DEFERRED is the default.
+"""
+
+import re
+
+from kompello.app.config import CONFIG
+
+# Applied in this order: busy_timeout comes first, so that switching the journal mode waits for
+# other connections instead of failing while they hold a lock
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative values are KiB instead of pages
+    "cache_size": -32 * 1024,
+    "temp_store": "MEMORY",
+}
+
+_NAME = re.compile(r"^[a-z_]+$")
+_VALUE = re.compile(r"^(-?\d+|[A-Za-z_]+)$")
+
+
+def get_pragmas() -> dict[str, str | int]:
+    """Return the configured pragmas, DEFAULT_PRAGMAS overridden by SQLITE_PRAGMAS."""
+    pragmas = {**DEFAULT_PRAGMAS, **CONFIG.get("SQLITE_PRAGMAS", {})}
+    for name, value in pragmas.items():
+        if not _NAME.match(name) or (value is not None and not _VALUE.match(str(value))):
+            raise ValueError(f"Invalid SQLite pragma in SQLITE_PRAGMAS: {name} = {value!r}")
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def apply_pragmas(cursor, pragmas) -> None:
+    """Run PRAGMA name = value for every pragma on a DB-API cursor of a new connection."""
+    if "busy_timeout" in pragmas:
+        pragmas = {"busy_timeout": pragmas["busy_timeout"], **pragmas}
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,260 @@
+"""
+Tests for the batched audit log of HistoryModel subclasses.
+"""
+
+from decimal import Decimal
+
+from auditlog.context import disable_auditlog, set_actor
+from auditlog.models import LogEntry
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.audit import batch_log_entries, registry, value_registry
+from kompello.core.custom_field_registry import get_definition_set
+from kompello.core.models import Currency, Item, Unit
+from kompello.core.models.custom_field_models import CustomFieldDefinition, CustomFieldInstance
+from kompello.core.models.base_models import HistoryModel
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class AuditTest(BaseTestCase):
+    """
+    Test that changes of HistoryModel subclasses are recorded once committed, written in one
+    INSERT per batch and attributed to the actor and remote address of the request.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.company = self.create_company(1)[0]
+        self.company.members.add(self.users[0])
+        self.currency = Currency.objects.create(company=self.company, symbol="€", short_name="EUR", long_name="Euro")
+        self.unit = Unit.objects.create(company=self.company, short_name="h", long_name="hours")
+
+    def entries(self, instance):
+        return list(LogEntry.objects.get_for_object(instance).order_by("id"))
+
+    def test_all_history_models_registered(self):
+        history_models = [model for model in apps.get_models() if issubclass(model, HistoryModel)]
+        self.assertIn(Item, history_models)
+        self.assertEqual(value_registry.get_models(), [CustomFieldInstance])
+        self.assertEqual(
+            sorted(registry.get_models() + value_registry.get_models(), key=str), sorted(history_models, key=str)
+        )
+
+    def test_create_update_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            unit = Unit.objects.create(company=self.company, short_name="d", long_name="days")
+        with self.captureOnCommitCallbacks(execute=True):
+            unit = Unit.objects.get(pk=unit.pk)
+            unit.long_name = "working days"
+            unit.save()
+            # Saves without changes are not recorded
+            unit.save()
+        unit_pk = unit.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            unit.delete()
+
+        created, updated, deleted = LogEntry.objects.filter(object_pk=str(unit_pk), content_type__model="unit").order_by("id")
+        self.assertEqual(created.action, LogEntry.Action.CREATE)
+        self.assertEqual(created.changes["short_name"], ["None", "d"])
+        self.assertNotIn("modified_on", created.changes)
+        self.assertEqual(updated.action, LogEntry.Action.UPDATE)
+        self.assertEqual(updated.changes, {"long_name": ["days", "working days"]})
+        self.assertEqual(updated.object_repr, "working days (d)")
+        self.assertEqual(deleted.action, LogEntry.Action.DELETE)
+        self.assertEqual(deleted.changes["long_name"], ["working days", "None"])
+
+    def test_update_diffs_loaded_values(self):
+        with batch_log_entries():
+            unit = Unit.objects.get(pk=self.unit.pk)
+            unit.long_name = "hour"
+            with self.captureOnCommitCallbacks(execute=True):
+                # Only the UPDATE, the stored row is not read again
+                with self.assertNumQueries(1):
+                    unit.save()
+            unit.short_name = "hr"
+            with self.captureOnCommitCallbacks(execute=True):
+                unit.save(update_fields=["short_name"])
+        self.assertEqual(
+            [entry.changes for entry in self.entries(unit)], [{"long_name": ["hours", "hour"]}, {"short_name": ["h", "hr"]}]
+        )
+
+        # Objects loaded outside a batch don't keep their values, the stored row is read before the update
+        unit = Unit.objects.get(pk=self.unit.pk)
+        self.assertIsNone(unit._loaded_values)
+        unit.long_name = "hours"
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(2):
+                unit.save()
+        self.assertEqual(self.entries(unit)[-1].changes, {"long_name": ["hour", "hours"]})
+
+        # Objects that were not loaded are diffed against the stored row
+        with self.captureOnCommitCallbacks(execute=True):
+            Unit(
+                pk=unit.pk, uuid=unit.uuid, created_on=unit.created_on, company=self.company, short_name="hr", long_name="hour"
+            ).save()
+        self.assertEqual(self.entries(unit)[-1].changes, {"long_name": ["hours", "hour"]})
+
+    def test_rollback_and_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.unit.long_name = "hour"
+                self.unit.save()
+                transaction.set_rollback(True)
+            with disable_auditlog():
+                self.currency.long_name = "Euros"
+                self.currency.save()
+        self.assertEqual(self.entries(self.unit), [])
+        self.assertEqual(self.entries(self.currency), [])
+
+    def test_one_insert_per_batch(self):
+        user = self.users[0]
+        with CaptureQueriesContext(connection) as queries, batch_log_entries(user, "10.0.0.1"):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    items = [
+                        Item.objects.create(
+                            company=self.company, currency=self.currency, unit=self.unit, name=f"Item {index}",
+                            price_per_unit=Decimal("10.00"),
+                        )
+                        for index in range(5)
+                    ]
+                    for item in items:
+                        item.price_per_unit = Decimal("12.50")
+                        item.save()
+        inserts = [query["sql"] for query in queries.captured_queries if query["sql"].startswith('INSERT INTO "auditlog_logentry"')]
+        self.assertEqual(len(inserts), 1)
+
+        entries = self.entries(items[0])
+        self.assertEqual([entry.action for entry in entries], [LogEntry.Action.CREATE, LogEntry.Action.UPDATE])
+        self.assertEqual(entries[1].changes, {"price_per_unit": ["10.00", "12.50"]})
+        self.assertEqual({(entry.actor, entry.remote_addr) for entry in entries}, {(user, "10.0.0.1")})
+
+    def test_entries_outside_batches(self):
+        with set_actor(self.users[0]), self.captureOnCommitCallbacks(execute=True):
+            self.unit.long_name = "hour"
+            self.unit.save()
+        self.assertEqual(self.entries(self.unit)[0].actor, self.users[0])
+
+    def test_user_fields(self):
+        user = self.users[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(self.login(user.email, USER_PASSWORD))
+            user.refresh_from_db()
+            user.set_password("another password")
+            user.save()
+        changes = self.entries(user)[-1].changes
+        self.assertEqual(list(changes), ["password"])
+        self.assertTrue(changes["password"][1].startswith("*"))
+
+    def test_requests(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        url = reverse("core:units-detail", kwargs={"uuid": self.unit.uuid})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"long_name": "hour"}, format="json", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, 200)
+        entry = self.entries(self.unit)[-1]
+        self.assertEqual(entry.changes, {"long_name": ["hours", "hour"]})
+        self.assertEqual(entry.actor, self.users[0])
+        self.assertEqual(entry.remote_addr, "10.0.0.2")
+
+
+class AuditCustomFieldTest(BaseTestCase):
+    """
+    Test that custom field values are recorded on the object they belong to if their definition
+    has track_history, and that values of untracked definitions cost no audit queries.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.company = self.create_company(1)[0]
+        self.company.members.add(self.users[0])
+        currency = Currency.objects.create(company=self.company, symbol="€", short_name="EUR", long_name="Euro")
+        unit = Unit.objects.create(company=self.company, short_name="h", long_name="hours")
+        self.item = Item.objects.create(
+            company=self.company, currency=currency, unit=unit, name="Consulting", price_per_unit=Decimal("10.00")
+        )
+        self.content_type = ContentType.objects.get_for_model(Item)
+        self.tracked = CustomFieldDefinition.objects.create(
+            key="skill_level", name="Skill Level", data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=self.content_type, company=self.company, track_history=True,
+        )
+        self.untracked = CustomFieldDefinition.objects.create(
+            key="synced_hours", name="Synced Hours", data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=self.content_type, company=self.company, track_history=False,
+        )
+
+    def entries(self):
+        return list(LogEntry.objects.get_for_object(self.item).filter(action=LogEntry.Action.UPDATE).order_by("id"))
+
+    def value(self, definition, value):
+        return CustomFieldInstance.objects.create(
+            custom_field=definition, content_type=self.content_type, object_id=self.item.id, value=value
+        )
+
+    def test_requests(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        url = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        for values in [{"skill_level": "Junior", "synced_hours": 1}, {"skill_level": "Senior", "synced_hours": 2}]:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(url, {"custom_fields": values}, format="json")
+            self.assertEqual(response.status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"custom_fields": {"synced_hours": 3}}, format="json")
+
+        self.assertEqual(
+            [entry.changes for entry in self.entries()],
+            [{"custom_fields.skill_level": ["None", '"Junior"']}, {"custom_fields.skill_level": ['"Junior"', '"Senior"']}],
+        )
+
+    def test_saves(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tracked = self.value(self.tracked, "Junior")
+        with self.captureOnCommitCallbacks(execute=True):
+            tracked.value = "Senior"
+            tracked.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            tracked.delete()
+
+        changes = [entry.changes for entry in self.entries()]
+        self.assertEqual(changes, [
+            {"custom_fields.skill_level": ["None", '"Junior"']},
+            {"custom_fields.skill_level": ['"Junior"', '"Senior"']},
+            {"custom_fields.skill_level": ['"Senior"', "None"]},
+        ])
+        self.assertEqual(self.entries()[0].object_repr, str(self.item))
+
+    def test_untracked_values(self):
+        get_definition_set(self.company.id, self.content_type.id)
+        untracked = self.value(self.untracked, 1)
+
+        def changes(value):
+            instance = CustomFieldInstance.objects.get(pk=untracked.pk)
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                instance.value = value
+                instance.save()
+                # Not loaded with the object: the stored value is not read either
+                CustomFieldInstance(
+                    pk=untracked.pk, uuid=untracked.uuid, created_on=untracked.created_on, custom_field=self.untracked,
+                    content_type=self.content_type, object_id=self.item.id, value=value + 1,
+                ).save()
+                instance.delete()
+            return [query["sql"] for query in queries.captured_queries]
+
+        with disable_auditlog():
+            unaudited = changes(2)
+        untracked.save()
+        self.assertEqual(len(changes(2)), len(unaudited))
+        self.assertEqual(self.entries(), [])
+
+    def test_track_history_changed(self):
+        untracked = self.value(self.untracked, 1)
+        self.untracked.track_history = True
+        self.untracked.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            untracked.value = 2
+            untracked.save()
+        self.assertEqual([entry.changes for entry in self.entries()], [{"custom_fields.synced_hours": ["1", "2"]}])
@@ -0,0 +1,145 @@
+"""
+Tests for the item and customer autocomplete endpoints and their in-process prefix indexes.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core import autocomplete
+from kompello.core.models import Company, Currency, Customer, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class AutocompleteTest(BaseTestCase):
+    """
+    Test GET /api/items/autocomplete/ and GET /api/customers/autocomplete/.
+    """
+
+    def setUp(self):
+        self.admin_users = self.create_admin_user(1)
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        self.currency = Currency.objects.create(
+            company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro"
+        )
+        self.consulting = self._item("Consulting")
+        self.concept = self._item("Concept Work")
+        self._item("Development")
+
+        self.anna = Customer.objects.create(company=self.companies[0], firstname="Anna", lastname="Müller")
+        Customer.objects.create(company=self.companies[0], firstname="Ben", lastname="Mayer", is_active=False)
+        Customer.objects.create(company=self.companies[1], firstname="Anna", lastname="Other")
+
+        self.items_url = reverse("core:items-autocomplete")
+        self.customers_url = reverse("core:customers-autocomplete")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def _item(self, name, company=None):
+        return Item.objects.create(
+            company=company or self.companies[0],
+            name=name,
+            currency=self.currency,
+            unit=self.unit,
+            price_per_unit=Decimal("10.00"),
+        )
+
+    def _labels(self, url, q, **params):
+        response = self.client.get(url, {"company": str(self.companies[0].uuid), "q": q, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [suggestion["label"] for suggestion in response.data]
+
+    def test_item_prefixes(self):
+        self.assertEqual(self._labels(self.items_url, "con"), ["Concept Work", "Consulting"])
+        self.assertEqual(self._labels(self.items_url, "CONS"), ["Consulting"])
+        self.assertEqual(self._labels(self.items_url, "c", limit=1), ["Concept Work"])
+        self.assertEqual(self._labels(self.items_url, "work"), [])
+
+        response = self.client.get(self.items_url, {"company": str(self.companies[0].uuid), "q": "cons"})
+        self.assertEqual(response.data, [{"uuid": str(self.consulting.uuid), "label": "Consulting"}])
+
+    def test_customer_prefixes(self):
+        self.assertEqual(self._labels(self.customers_url, "an"), ["Anna Müller"])
+        # Last name first and without accents
+        self.assertEqual(self._labels(self.customers_url, "muller a"), ["Anna Müller"])
+        # Inactive customers are not suggested
+        self.assertEqual(self._labels(self.customers_url, "ben"), [])
+
+    def test_lookups_skip_the_database(self):
+        self._labels(self.items_url, "con")
+        with CaptureQueriesContext(connection) as queries:
+            self._labels(self.items_url, "cons")
+        self.assertFalse([query for query in queries if '"core_item"' in query["sql"]])
+
+    def test_writes_update_the_index(self):
+        self.assertEqual(self._labels(self.items_url, "con"), ["Concept Work", "Consulting"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.consulting.name = "Advisory"
+            self.consulting.save()
+            self._item("Configuration")
+            self.concept.delete()
+        with mock.patch.object(autocomplete, "PrefixIndex", side_effect=AssertionError("index was rebuilt")):
+            self.assertEqual(self._labels(self.items_url, "con"), ["Configuration"])
+            self.assertEqual(self._labels(self.items_url, "adv"), ["Advisory"])
+
+        self.assertEqual(self._labels(self.customers_url, "an"), ["Anna Müller"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.anna.is_active = False
+            self.anna.save()
+        self.assertEqual(self._labels(self.customers_url, "an"), [])
+
+    def test_other_workers_rebuild(self):
+        self.assertEqual(self._labels(self.items_url, "con"), ["Concept Work", "Consulting"])
+        # Another worker changed an item: this worker's index is outdated by the new version token
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.dict(autocomplete._indexes, clear=True):
+                self._item("Contracting")
+        self.assertEqual(self._labels(self.items_url, "con"), ["Concept Work", "Consulting", "Contracting"])
+
+    def test_bulk_create_invalidates(self):
+        self.assertEqual(self._labels(self.items_url, "con"), ["Concept Work", "Consulting"])
+        row = {
+            "company": str(self.companies[0].uuid),
+            "name": "Controlling",
+            "currency": str(self.currency.uuid),
+            "unit": str(self.unit.uuid),
+            "price_per_unit": "10.00",
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("core:items-bulk"), [row], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._labels(self.items_url, "contr"), ["Controlling"])
+
+    def test_lru_bound(self):
+        with mock.patch.object(autocomplete, "MAX_COMPANIES", 1):
+            self._labels(self.items_url, "con")
+            self.logout()
+            self.assertTrue(self.login(self.admin_users[0].email, USER_PASSWORD))
+            response = self.client.get(self.items_url, {"company": str(self.companies[1].uuid), "q": "a"})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(self.companies[0].id, autocomplete._indexes)
+            self.assertIn(self.companies[1].id, autocomplete._indexes)
+
+    def test_company_access(self):
+        response = self.client.get(self.customers_url, {"company": str(self.companies[1].uuid), "q": "an"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(self.customers_url, {"company": "00000000-0000-0000-0000-000000000000", "q": "an"})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.customers_url, {"company": str(self.companies[0].uuid)})
+        self.assertEqual(response.status_code, 400)
+
+        # A deleted company is not found, even though its ID was looked up before
+        company = Company.objects.create(name="Deleted")
+        company.members.add(self.users[0])
+        response = self.client.get(self.customers_url, {"company": str(company.uuid), "q": "an"})
+        self.assertEqual(response.status_code, 200)
+        company.delete()
+        response = self.client.get(self.customers_url, {"company": str(company.uuid), "q": "an"})
+        self.assertEqual(response.status_code, 404)
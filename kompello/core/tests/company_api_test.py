@@ -24,7 +24,7 @@ class CompanyApiViewsetTest(BaseTestCase):
             {"path": reverse("core:companies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, companies_expected)
+        self.assertEqual(response.data["results"], companies_expected)
 
     def test_retrieve_company(self):
         # Test retrieving a company:
@@ -205,7 +205,7 @@ class CompanyApiPermissions(BaseTestCase):
             {"path": reverse("core:companies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), len(self.companies))
+        self.assertEqual(len(response.data["results"]), len(self.companies))
 
         # Regular user should not be able to list companies and receive empty response as they are not a member
         response = self.authenticated_request(
@@ -214,7 +214,7 @@ class CompanyApiPermissions(BaseTestCase):
             {"path": reverse("core:companies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data["results"]), 0)
 
         self.companies[0].members.add(self.users[0])  # Add user to the first company
 
@@ -225,8 +225,8 @@ class CompanyApiPermissions(BaseTestCase):
             {"path": reverse("core:companies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['uuid'], str(self.companies[0].uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]['uuid'], str(self.companies[0].uuid))
 
         # Non logged in user should not be able to list companies
         response = self.authenticated_request(
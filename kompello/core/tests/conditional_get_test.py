@@ -0,0 +1,214 @@
+"""
+Tests for conditional GET requests (ETag, Last-Modified and 304 Not Modified).
+"""
+
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from kompello.core.models import Company, Currency, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.serializers.item_serializers import ItemSerializer
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ConditionalGetTest(BaseTestCase):
+    """
+    Test that list and retrieve responses carry validators and that requests with current
+    validators are answered with 304.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(2)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+        self.companies[1].members.add(self.users[0])
+
+        company = self.companies[0]
+        self.currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        self.unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        self.item = Item.objects.create(
+            company=company, currency=self.currency, unit=self.unit, name="Consulting", price_per_unit=Decimal("90.00")
+        )
+        self.detail_url = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        self.list_url = reverse("core:items-list")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def assertNotModified(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304, url)
+        self.assertEqual(response.content, b"")
+        return response
+
+    def test_retrieve(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(self.client.get(self.detail_url)["ETag"], etag)
+
+        response = self.assertNotModified(self.detail_url, if_none_match=etag)
+        self.assertEqual(response["ETag"], etag)
+        self.assertNotModified(self.detail_url, if_modified_since=response["Last-Modified"])
+        self.assertNotModified(self.detail_url, if_none_match=f'"outdated", {etag}')
+
+        # Another representation of the same object
+        response = self.client.get(self.detail_url + "?fields=uuid,name", headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # Changes of the object and of related objects shown in its representation
+        self.item.name = "Consulting (senior)"
+        self.item.save()
+        response = self.client.get(self.detail_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Consulting (senior)")
+        etag = response["ETag"]
+
+        self.currency.symbol = "EUR"
+        self.currency.save()
+        response = self.client.get(self.detail_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+        self.assertNotModified(self.list_url, if_none_match=etag)
+
+        # Filters change the list
+        url = f"{self.list_url}?company={self.companies[1].uuid}"
+        self.assertEqual(self.client.get(url, headers={"if_none_match": etag}).status_code, 200)
+
+        # So do new, changed and deleted rows
+        item = Item.objects.create(
+            company=self.companies[0], currency=self.currency, unit=self.unit, name="Support", price_per_unit=Decimal("50.00")
+        )
+        response = self.client.get(self.list_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        etag = response["ETag"]
+
+        self.unit.long_name = "hour"
+        self.unit.save()
+        response = self.client.get(self.list_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        item.delete()
+        response = self.client.get(self.list_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        # Users of other companies get other lists
+        self.companies[0].members.remove(self.users[0])
+        self.assertEqual(self.client.get(self.list_url, headers={"if_none_match": response["ETag"]}).status_code, 200)
+
+    def test_retrieve_custom_fields_last_modified(self):
+        """Rewriting the cached custom field values moves Last-Modified, so If-Modified-Since sees the change."""
+        definition = CustomFieldDefinition.objects.create(
+            key="lvl", name="Level", data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=ContentType.objects.get_for_model(Item), company=self.companies[0],
+        )
+        instance = CustomFieldInstance.objects.create(
+            custom_field=definition, content_type=definition.model_type, object_id=self.item.id, value=1
+        )
+
+        def last_modified():
+            # If-Modified-Since has a resolution of seconds, so the item and the related objects of its
+            # representation are moved into the past
+            past = timezone.now() - datetime.timedelta(minutes=5)
+            for model in [Item, Currency, Unit, Company]:
+                model.objects.update(modified_on=past)
+            response = self.client.get(self.detail_url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotModified(self.detail_url, if_modified_since=response["Last-Modified"])
+            return response["Last-Modified"]
+
+        # A definition change rebuilds the cache of many rows
+        since = last_modified()
+        definition.key = "level"
+        definition.save()
+        response = self.client.get(self.detail_url, headers={"if_modified_since": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["custom_fields"], {"level": 1})
+
+        # A value change rebuilds the cache of its row
+        since = last_modified()
+        instance.value = 2
+        instance.save()
+        response = self.client.get(self.detail_url, headers={"if_modified_since": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["custom_fields"], {"level": 2})
+
+        since = last_modified()
+        CustomFieldInstance.objects.filter(pk=instance.pk).update(value=3)
+        self.item.refresh_custom_fields_cache()
+        self.assertEqual(self.client.get(self.detail_url, headers={"if_modified_since": since}).status_code, 200)
+
+    def test_list_custom_fields(self):
+        """Custom field values are part of the version of every row."""
+        definition = CustomFieldDefinition.objects.create(
+            key="lvl", name="Level", data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=ContentType.objects.get_for_model(Item), company=self.companies[0],
+        )
+        CustomFieldInstance.objects.create(
+            custom_field=definition, content_type=definition.model_type, object_id=self.item.id, value=1
+        )
+        url = f"{self.list_url}?include=custom_fields"
+        response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["custom_fields"], {"lvl": 1})
+        etag = response["ETag"]
+
+        definition.key = "level"
+        definition.save()
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["custom_fields"], {"level": 1})
+        etag = response["ETag"]
+
+        response = self.client.patch(self.detail_url, {"custom_fields": {"level": 2}}, format="json")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["custom_fields"], {"level": 2})
+
+    def test_list_version_without_aggregates(self):
+        """The version of a list is built from its page, no other query is run for it."""
+        etag = self.client.get(self.list_url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertNotModified(self.list_url, if_none_match=etag)
+            self.client.get(self.list_url)
+        self.assertEqual([query["sql"] for query in queries if "COUNT(" in query["sql"] or "MAX(" in query["sql"]], [])
+
+    def test_not_modified_skips_serialization(self):
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+        list_etag = self.client.get(self.list_url)["ETag"]
+        with mock.patch.object(ItemSerializer, "to_representation") as to_representation:
+            self.assertNotModified(self.detail_url, if_none_match=detail_etag)
+            self.assertNotModified(self.list_url, if_none_match=list_etag)
+        to_representation.assert_not_called()
+
+    def test_company_views(self):
+        url = reverse("core:companies-detail", kwargs={"uuid": self.companies[0].uuid})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(url, if_none_match=response["ETag"])
+        response = self.client.get(reverse("core:companies-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(reverse("core:companies-list"), if_none_match=response["ETag"])
+
+    def test_writes_have_no_validators(self):
+        response = self.client.patch(self.detail_url, {"name": "Support"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
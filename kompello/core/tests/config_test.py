@@ -0,0 +1,47 @@
+"""
+Tests for the config.json settings and their environment overrides.
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from kompello.app.config import CONFIG
+
+
+class SystemConfigTest(SimpleTestCase):
+    """
+    Test that KOMPELLO_<KEY> environment variables take precedence over config.json.
+    """
+
+    def test_environment_overrides(self):
+        self.assertEqual(CONFIG.get("API_PAGE_SIZE"), 50)
+        self.assertEqual(CONFIG.get("DATABASE_HOST", "localhost"), "localhost")
+
+        environment = {
+            "KOMPELLO_API_PAGE_SIZE": "20",
+            "KOMPELLO_DATABASE_HOST": "db.internal",
+            "KOMPELLO_DATABASE_POOL": "true",
+        }
+        with mock.patch.dict("os.environ", environment):
+            self.assertEqual(CONFIG.get("API_PAGE_SIZE"), 20)
+            self.assertEqual(CONFIG.get("DATABASE_HOST", "localhost"), "db.internal")
+            self.assertIs(CONFIG.get("DATABASE_POOL", False), True)
+
+
+class CacheSettingsTest(SimpleTestCase):
+    """
+    Test the cache aliases built from the CACHE_* settings.
+    """
+
+    def test_aliases(self):
+        for alias in ["default", "responses", "sessions"]:
+            self.assertEqual(settings.CACHES[alias]["KEY_PREFIX"], f"kompello:{alias}")
+            self.assertIn("MAX_ENTRIES", settings.CACHES[alias]["OPTIONS"])
+
+        # Every alias is a cache of its own
+        caches["default"].set("config_test", "default")
+        self.assertIsNone(caches["responses"].get("config_test"))
+        caches["default"].delete("config_test")
@@ -57,8 +57,8 @@ class CurrencyApiViewsetTest(BaseTestCase):
             {"path": reverse("core:currencies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
-        uuids = [item["uuid"] for item in response.data]
+        self.assertEqual(len(response.data["results"]), 2)
+        uuids = [item["uuid"] for item in response.data["results"]]
         self.assertIn(str(currency1.uuid), uuids)
         self.assertIn(str(currency2.uuid), uuids)
         self.assertNotIn(str(currency3.uuid), uuids)
@@ -70,8 +70,8 @@ class CurrencyApiViewsetTest(BaseTestCase):
             {"path": reverse("core:currencies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(currency3.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(currency3.uuid))
 
     def test_list_currencies_filter_by_company(self):
         """Test filtering currencies by company UUID."""
@@ -85,8 +85,8 @@ class CurrencyApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:currencies-list')}?company={self.companies[0].uuid}"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(currency1.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(currency1.uuid))
 
     def test_list_currencies_admin_sees_all(self):
         """Test that admin users see all currencies."""
@@ -99,7 +99,7 @@ class CurrencyApiViewsetTest(BaseTestCase):
             {"path": reverse("core:currencies-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_retrieve_currency(self):
         """Test retrieving a specific currency."""
@@ -0,0 +1,134 @@
+"""
+Tests for the cached custom field definition registry.
+"""
+
+from decimal import Decimal
+from http import HTTPMethod
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.urls import reverse
+
+from kompello.core import custom_field_registry
+from kompello.core.custom_field_registry import (
+    get_definition_set,
+    get_definition_sets,
+    get_registry_stats,
+    reset_registry_stats,
+)
+from kompello.core.models import Currency, Item, Unit
+from kompello.core.models.custom_field_models import CustomFieldDefinition
+from kompello.core.tests.helper import BaseTestCase
+
+
+class CustomFieldRegistryTest(BaseTestCase):
+    """
+    Test caching and invalidation of compiled custom field definition sets.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+        self.content_type = ContentType.objects.get_for_model(Item)
+
+        self.max_hours = self._create_definition(self.companies[0], "max_hours", CustomFieldDefinition.FieldDataType.NUMBER)
+        self.legacy = self._create_definition(self.companies[0], "legacy", is_archived=True)
+        self._create_definition(self.companies[1], "region")
+        reset_registry_stats()
+
+    def _create_definition(self, company, key, data_type=CustomFieldDefinition.FieldDataType.TEXT, **kwargs):
+        return CustomFieldDefinition.objects.create(
+            key=key,
+            name=key.title(),
+            data_type=data_type,
+            model_type=self.content_type,
+            company=company,
+            **kwargs,
+        )
+
+    def test_compiled_set(self):
+        definition_set = get_definition_set(self.companies[0].id, self.content_type.id)
+        self.assertEqual(set(definition_set.definitions), {"max_hours", "legacy"})
+        self.assertEqual(definition_set.archived, {"legacy"})
+        self.assertEqual(definition_set.value_types["max_hours"], ("number", (int, float)))
+
+    def test_hits_and_misses(self):
+        with self.assertNumQueries(1):
+            get_definition_set(self.companies[0].id, self.content_type.id)
+        with self.assertNumQueries(0):
+            get_definition_set(self.companies[0].id, self.content_type.id)
+        self.assertEqual(get_registry_stats(), {"hits": 1, "shared_hits": 0, "misses": 1})
+
+        # Another worker starts with an empty in-process layer and is served from the shared cache
+        custom_field_registry._local_sets.clear()
+        with self.assertNumQueries(0):
+            definition_set = get_definition_set(self.companies[0].id, self.content_type.id)
+        self.assertIn("max_hours", definition_set.definitions)
+        self.assertEqual(get_registry_stats(), {"hits": 1, "shared_hits": 1, "misses": 1})
+
+    def test_batched_misses_use_one_query(self):
+        with self.assertNumQueries(1):
+            definition_sets = get_definition_sets([company.id for company in self.companies], self.content_type.id)
+        self.assertEqual(set(definition_sets[self.companies[1].id].definitions), {"region"})
+
+    def test_definition_changes_invalidate(self):
+        get_definition_set(self.companies[0].id, self.content_type.id)
+
+        self.legacy.is_archived = False
+        self.legacy.save()
+        self.assertEqual(get_definition_set(self.companies[0].id, self.content_type.id).archived, frozenset())
+
+        self._create_definition(self.companies[0], "rate", CustomFieldDefinition.FieldDataType.NUMBER)
+        self.assertIn("rate", get_definition_set(self.companies[0].id, self.content_type.id).definitions)
+
+        self.legacy.delete()
+        self.assertNotIn("legacy", get_definition_set(self.companies[0].id, self.content_type.id).definitions)
+
+    def test_moving_definition_invalidates_old_company(self):
+        get_definition_sets([company.id for company in self.companies], self.content_type.id)
+
+        self.max_hours.company = self.companies[1]
+        self.max_hours.save()
+        self.assertNotIn("max_hours", get_definition_set(self.companies[0].id, self.content_type.id).definitions)
+        self.assertIn("max_hours", get_definition_set(self.companies[1].id, self.content_type.id).definitions)
+
+    def test_invalidate_on_commit(self):
+        """A set loaded by a concurrent request before the commit is dropped once the change commits."""
+        company_id = self.companies[0].id
+        stale = get_definition_set(company_id, self.content_type.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.legacy.delete()
+            # Loaded by another request, which still sees the uncommitted definition
+            cache.set(custom_field_registry.VERSION_KEY.format(company_id=company_id), stale.version)
+            custom_field_registry._local_sets[(company_id, self.content_type.id)] = stale
+
+        self.assertNotIn("legacy", get_definition_set(company_id, self.content_type.id).definitions)
+
+    def test_item_write_does_not_query_definitions(self):
+        unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        currency = Currency.objects.create(company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro")
+        item = Item.objects.create(
+            company=self.companies[0],
+            name="Consulting",
+            currency=currency,
+            unit=unit,
+            price_per_unit=Decimal("100.00"),
+        )
+        path = reverse("core:items-detail", kwargs={"uuid": item.uuid})
+
+        for value in (1, 2):
+            response = self.authenticated_request(
+                HTTPMethod.PATCH,
+                self.users[0],
+                {"path": path, "data": {"custom_fields": {"max_hours": value}}, "format": "json"},
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_registry_stats()["misses"], 1)
+
+        response = self.authenticated_request(
+            HTTPMethod.PATCH,
+            self.users[0],
+            {"path": path, "data": {"custom_fields": {"legacy": "x"}}, "format": "json"},
+        )
+        self.assertEqual(response.status_code, 400)
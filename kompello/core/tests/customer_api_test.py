@@ -93,8 +93,8 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": reverse("core:customers-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
-        uuids = [item["uuid"] for item in response.data]
+        self.assertEqual(len(response.data["results"]), 2)
+        uuids = [item["uuid"] for item in response.data["results"]]
         self.assertIn(str(customer1.uuid), uuids)
         self.assertIn(str(customer2.uuid), uuids)
         self.assertNotIn(str(customer3.uuid), uuids)
@@ -106,8 +106,8 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": reverse("core:customers-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(customer3.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(customer3.uuid))
 
     def test_list_customers_filter_by_company(self):
         """Test filtering customers by company UUID."""
@@ -121,8 +121,8 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:customers-list')}?company={self.companies[0].uuid}"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(customer1.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(customer1.uuid))
 
     def test_list_customers_filter_by_active(self):
         """Test filtering customers by is_active status."""
@@ -141,8 +141,8 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:customers-list')}?is_active=true"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(active_customer.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(active_customer.uuid))
         
         # Filter for inactive customers
         response = self.authenticated_request(
@@ -151,8 +151,8 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:customers-list')}?is_active=false"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(inactive_customer.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(inactive_customer.uuid))
 
     def test_list_customers_admin_sees_all(self):
         """Test that admin users see all customers."""
@@ -165,7 +165,7 @@ class CustomerApiViewsetTest(BaseTestCase):
             {"path": reverse("core:customers-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_schema_includes_list_filters(self):
         """Schema documents company and is_active filters for customer list."""
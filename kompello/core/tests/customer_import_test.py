@@ -0,0 +1,156 @@
+"""
+Tests for the streaming customer import.
+"""
+
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+
+from kompello.core import customer_import
+from kompello.core.models import Address, Customer
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+CSV = (
+    "firstname,lastname,email,birthdate,is_active,address_street,address_city,address_postal_code,address_country\n"
+    "Anna,Schmidt,anna@example.com,1990-04-01,true,Lindenstraße 12,Düsseldorf,40210,Germany\n"
+    "Ben,Weber,ben@example.com,,false,,,,\n"
+    "Bea,Baddate,bea@example.com,01.04.1990,,,,,\n"
+    "Carl,Meyer,not-an-email,,,,,,\n"
+    "Dora,Noaddress,dora@example.com,,,Only a street,,,\n"
+    "Anna,Duplicate,anna@example.com,,,,,,\n"
+    "Emil,Nomail,,,,,,,\n"
+)
+
+
+class CustomerImportTest(BaseTestCase):
+    """
+    Test POST /api/customers/import/ and the import_customers management command.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(2)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+        self.url = reverse("core:customers-import")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def post(self, content: str, company=None, **data):
+        data.update(
+            file=SimpleUploadedFile("customers.csv", content.encode("utf-8-sig"), content_type="text/csv"),
+            company=str((company or self.companies[0]).uuid),
+        )
+        return self.client.post(self.url, data, format="multipart")
+
+    @staticmethod
+    def lines(response) -> list[dict]:
+        return [json.loads(line) for line in response.content.decode().splitlines()]
+
+    def test_import(self):
+        with mock.patch.object(customer_import, "BATCH_SIZE", 3):
+            response = self.post(CSV)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+            progress = self.lines(response)
+
+        # One line per batch of three rows, with running totals and the errors of the batch
+        self.assertEqual([line["rows"] for line in progress], [3, 6, 7])
+        self.assertEqual(
+            progress[-1] | {"errors": []}, {"rows": 7, "created": 2, "skipped": 1, "failed": 4, "errors": []}
+        )
+        errors = {error["row"]: error["errors"] for line in progress for error in line["errors"]}
+        self.assertEqual(sorted(errors), [3, 4, 5, 7])
+        self.assertIn("birthdate", errors[3])
+        self.assertIn("email", errors[4])
+        self.assertIn("city", errors[5]["address"])
+        self.assertEqual(errors[7], {"email": ["This field is required to import the row."]})
+
+        anna = Customer.objects.get(email="anna@example.com")
+        self.assertEqual(anna.company, self.companies[0])
+        self.assertEqual(anna.address.city, "Düsseldorf")
+        self.assertEqual(str(anna.birthdate), "1990-04-01")
+        ben = Customer.objects.get(email="ben@example.com")
+        self.assertIsNone(ben.address)
+        self.assertFalse(ben.is_active)
+
+        # bulk_create bypasses the signals, the import keeps search and autocomplete up to date itself
+        response = self.client.get(reverse("core:customers-search"), {"q": "düsseldorf"})
+        self.assertEqual([hit["uuid"] for hit in response.json()], [str(anna.uuid)])
+        response = self.client.get(reverse("core:customers-autocomplete"), {"company": self.companies[0].uuid, "q": "an"})
+        self.assertEqual([suggestion["label"] for suggestion in response.json()], ["Anna Schmidt"])
+
+    def test_rerun_is_idempotent(self):
+        self.lines(self.post(CSV))
+        progress = self.lines(self.post(CSV))
+        self.assertEqual(progress[-1]["created"], 0)
+        self.assertEqual(progress[-1]["skipped"], 3)
+        self.assertEqual(Customer.objects.count(), 2)
+        self.assertEqual(Address.objects.count(), 1)
+
+        # Another key identifies the customers differently
+        content = "firstname,lastname,email,mobile_phone\nAnna,Schmidt,anna@example.com,+49 170 1234567\n"
+        self.assertEqual(self.lines(self.post(content, key="mobile_phone"))[-1]["created"], 1)
+        self.assertEqual(self.lines(self.post(content, key="mobile_phone"))[-1]["skipped"], 1)
+
+    def test_errors(self):
+        self.assertEqual(self.post("firstname,lastname\nAnna,Schmidt\n").status_code, 400)
+        self.assertEqual(self.post(CSV, key="uuid").status_code, 400)
+        self.assertEqual(self.post(CSV, company=self.companies[1]).status_code, 403)
+        self.assertEqual(Customer.objects.count(), 0)
+
+        # Latin-1 instead of UTF-8, noticed only once the reader gets to the row
+        content = "firstname,lastname,email\n" + "Anna,Schmidt,anna@example.com\n" * 2000
+        response = self.client.post(
+            self.url,
+            {
+                "file": SimpleUploadedFile("customers.csv", content.encode() + "Jürgen,Schmidt,j@example.com\n".encode("latin-1")),
+                "company": str(self.companies[0].uuid),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("can't be read", self.lines(response)[-1]["detail"])
+        response = self.client.post(
+            self.url,
+            {
+                "file": SimpleUploadedFile("customers.csv", "firstname,lastname,email\nJürgen,Schmidt,j@example.com\n".encode("latin-1")),
+                "company": str(self.companies[0].uuid),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.logout()
+        self.assertEqual(self.post(CSV).status_code, 401)
+
+    def test_database_error(self):
+        content = "firstname,lastname,email\n" + "".join(f"Anna,Schmidt,anna{index}@example.com\n" for index in range(4))
+        with (
+            mock.patch.object(customer_import, "BATCH_SIZE", 2),
+            mock.patch.object(customer_import, "index_customers", side_effect=[None, DatabaseError("disk I/O error")]),
+        ):
+            response = self.post(content)
+        self.assertEqual(response.status_code, 500)
+        progress = self.lines(response)
+        self.assertEqual(progress[0]["created"], 2)
+        self.assertIn("after 2 created customers", progress[-1]["detail"])
+        self.assertIn("disk I/O error", progress[-1]["detail"])
+        # The failed batch is rolled back, the one before it stays imported
+        self.assertEqual(Customer.objects.filter(company=self.companies[0]).count(), 2)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8") as file:
+            file.write(CSV)
+            file.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command(
+                "import_customers", file.name, company=str(self.companies[0].uuid), batch_size=2, stdout=stdout, stderr=stderr
+            )
+            self.assertIn("7 rows: 2 created, 1 skipped, 4 failed", stdout.getvalue())
+            self.assertIn("Row 7: ", stderr.getvalue())
+            self.assertEqual(Customer.objects.filter(company=self.companies[0]).count(), 2)
@@ -0,0 +1,122 @@
+"""
+Tests for the customer full-text search.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from kompello.core.models import Address, Customer
+from kompello.core.search import POSTGRES_TABLE, SQLITE_TABLE
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class CustomerSearchTest(BaseTestCase):
+    """
+    Test GET /api/customers/search/ and the maintenance of the search index.
+    """
+
+    def setUp(self):
+        self.admin_users = self.create_admin_user(1)
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+        self.address = Address.objects.create(
+            street="Lindenstraße 12", city="Düsseldorf", postal_code="40210", country="Germany"
+        )
+        self.anna = self._customer(self.companies[0], "Anna", "Schmidt", "anna@example.com", address=self.address)
+        self.ben = self._customer(self.companies[0], "Ben", "Weber", "ben@weber.de", notes="Referred by Anna")
+        self.other = self._customer(self.companies[1], "Anna", "Other", "anna@other.com")
+
+        self.url = reverse("core:customers-search")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    @staticmethod
+    def _customer(company, firstname, lastname, email, **kwargs):
+        return Customer.objects.create(company=company, firstname=firstname, lastname=lastname, email=email, **kwargs)
+
+    def _search(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def _uuids(self, params):
+        return [hit["uuid"] for hit in self._search(params)]
+
+    def test_search_fields(self):
+        self.assertEqual(self._uuids({"q": "schmidt"}), [str(self.anna.uuid)])
+        self.assertEqual(self._uuids({"q": "weber.de"}), [str(self.ben.uuid)])
+        self.assertEqual(self._uuids({"q": "duesseldorf"}), [])
+        self.assertEqual(self._uuids({"q": "dusseldorf"}), [str(self.anna.uuid)])
+        self.assertEqual(self._uuids({"q": "linden"}), [str(self.anna.uuid)])
+        # Every term has to match the start of a word
+        self.assertEqual(self._uuids({"q": "an sch"}), [str(self.anna.uuid)])
+        self.assertEqual(self._uuids({"q": "nna"}), [])
+
+    def test_ranking_and_snippet(self):
+        hits = self._search({"q": "anna"})
+        # The name match ranks above the match in Ben's notes
+        self.assertEqual([hit["uuid"] for hit in hits], [str(self.anna.uuid), str(self.ben.uuid)])
+        self.assertGreater(hits[0]["score"], hits[1]["score"])
+        self.assertIn("<mark>Anna</mark>", hits[0]["snippet"])
+        self.assertIn("Referred by <mark>Anna</mark>", hits[1]["snippet"])
+        self.assertEqual(hits[0]["address_summary"], "Düsseldorf, Germany")
+
+    def test_snippet_is_escaped(self):
+        self._customer(self.companies[0], "Carl", "Klein", "carl@example.com", notes="hello <img src=x onerror=alert(1)> world")
+        hits = self._search({"q": "hello"})
+        self.assertEqual(len(hits), 1)
+        self.assertIn("<mark>hello</mark> &lt;img src=x onerror=alert(1)&gt; world", hits[0]["snippet"])
+        self.assertNotIn("<img", hits[0]["snippet"])
+
+    def test_company_scope(self):
+        self.assertEqual(self._uuids({"q": "other"}), [])
+        self.assertEqual(self._uuids({"q": "anna", "company": str(self.companies[1].uuid)}), [])
+        self.assertEqual(len(self._uuids({"q": "anna", "company": str(self.companies[0].uuid)})), 2)
+
+        self.logout()
+        self.assertTrue(self.login(self.admin_users[0].email, USER_PASSWORD))
+        self.assertEqual(len(self._uuids({"q": "anna"})), 3)
+        self.assertEqual(self._uuids({"q": "anna", "company": str(self.companies[1].uuid)}), [str(self.other.uuid)])
+
+    def test_index_follows_writes(self):
+        self.anna.lastname = "Fischer"
+        self.anna.save()
+        self.assertEqual(self._uuids({"q": "schmidt"}), [])
+        self.assertEqual(self._uuids({"q": "fischer"}), [str(self.anna.uuid)])
+
+        self.address.city = "Köln"
+        self.address.save()
+        self.assertEqual(self._uuids({"q": "koln"}), [str(self.anna.uuid)])
+
+        self.address.delete()
+        self.assertEqual(self._uuids({"q": "koln"}), [])
+
+        self.anna.delete()
+        self.assertEqual(self._uuids({"q": "fischer"}), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ['"anna', "anna OR ben", "anna*", "company:c1", "NEAR(anna ben)", "-anna"]:
+            self._search({"q": query})
+        self.assertEqual(self._uuids({"q": "c" + str(self.companies[0].id)}), [])
+
+    def test_invalid_requests(self):
+        for params in [{}, {"q": ""}, {"q": "anna", "limit": 0}, {"q": "anna", "company": "nope"}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_rebuild_command(self):
+        Customer.objects.filter(pk=self.ben.pk).update(lastname="Becker")
+        self.assertEqual(self._uuids({"q": "becker"}), [])
+
+        out = StringIO()
+        call_command("rebuild_customer_search_index", stdout=out)
+        self.assertIn("Indexed 3 customers", out.getvalue())
+        self.assertEqual(self._uuids({"q": "becker"}), [str(self.ben.uuid)])
+        table = SQLITE_TABLE if connection.vendor == "sqlite" else POSTGRES_TABLE
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            self.assertEqual(cursor.fetchone()[0], 3)
@@ -0,0 +1,110 @@
+"""
+Tests for the read replica routing.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITransactionTestCase
+
+from kompello.core.db_router import ReplicaRouter, read_from_replicas, record_write, routing_scope
+from kompello.core.models import Customer, KompelloUser
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+REPLICAS = ["replica_1", "replica_2"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTest(SimpleTestCase):
+    """
+    Test the routing decisions of ReplicaRouter.
+    """
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.user = KompelloUser(id=4711)
+        cache.delete_many([f"db_router:written:{self.user.id}"])
+
+    def test_reads_outside_a_scope_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+
+    def test_replica_reads(self):
+        with routing_scope():
+            self.assertTrue(read_from_replicas(AnonymousUser()))
+            self.assertIn(self.router.db_for_read(Customer), REPLICAS)
+            with mock.patch.object(connections[DEFAULT_DB_ALIAS], "in_atomic_block", True):
+                self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+
+            self.assertEqual(self.router.db_for_write(Customer), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+
+    def test_cache_table_reads_use_the_primary(self):
+        with routing_scope():
+            read_from_replicas(AnonymousUser())
+            self.assertEqual(self.router.db_for_read(DatabaseCache("cache_table", {}).cache_model_class), DEFAULT_DB_ALIAS)
+
+    def test_read_your_writes(self):
+        record_write(self.user)
+        with routing_scope():
+            self.assertFalse(read_from_replicas(self.user))
+            self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=0):
+            cache.clear()
+            record_write(self.user)
+            with routing_scope():
+                self.assertTrue(read_from_replicas(self.user))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        with routing_scope():
+            self.assertFalse(read_from_replicas(AnonymousUser()))
+            self.assertEqual(self.router.db_for_read(Customer), DEFAULT_DB_ALIAS)
+
+
+# The primary acts as its own replica, reads in TestCase transactions never leave the primary
+@override_settings(DATABASE_REPLICAS=[DEFAULT_DB_ALIAS], DATABASE_REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingApiTest(APITransactionTestCase):
+    """
+    Test that the viewsets send safe requests to the replicas and keep the reads after a write on the primary.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = BaseTestCase.create_user(1)[0]
+        self.company = BaseTestCase.create_company(1)[0]
+        self.company.members.add(self.user)
+        self.client.login(username=self.user.email, password=USER_PASSWORD)
+
+    def test_read_your_writes(self):
+        with mock.patch("kompello.core.db_router.pick_replica", return_value=DEFAULT_DB_ALIAS) as pick:
+            response = self.client.get(reverse("core:customers-list"))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(pick.called)
+
+            pick.reset_mock()
+            response = self.client.post(
+                reverse("core:customers-list"),
+                {"firstname": "Anna", "lastname": "Schmidt", "email": "anna@example.com", "company": str(self.company.uuid)},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertFalse(pick.called)
+
+            # The retrieve right after the create reads from the primary
+            response = self.client.get(reverse("core:customers-detail", kwargs={"uuid": response.data["uuid"]}))
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(pick.called)
+
+            cache.clear()
+            response = self.client.get(reverse("core:customers-list"))
+            self.assertEqual(len(response.data["results"]), 1)
+            self.assertTrue(pick.called)
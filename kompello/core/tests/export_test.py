@@ -0,0 +1,147 @@
+"""
+Tests for the streaming customer and item exports.
+"""
+
+import csv
+import io
+import json
+import tracemalloc
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from kompello.core.models import Address, Currency, Customer, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+from kompello.core.views.api.base import ExportMixin
+
+
+def read(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+class ExportTest(BaseTestCase):
+    """
+    Test GET /api/customers/export/ and /api/items/export/.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(2)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+        self.companies[1].members.add(self.users[1])
+
+        company = self.companies[0]
+        self.currency = Currency.objects.create(company=company, symbol="€", short_name="EUR", long_name="Euro")
+        self.unit = Unit.objects.create(company=company, short_name="h", long_name="hours")
+        definition = CustomFieldDefinition.objects.create(
+            key="skill_level",
+            name="Skill Level",
+            data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=ContentType.objects.get_for_model(Item),
+            company=company,
+        )
+        self.item = Item.objects.create(
+            company=company,
+            currency=self.currency,
+            unit=self.unit,
+            name="Consulting",
+            price_per_unit=Decimal("90.00"),
+        )
+        CustomFieldInstance.objects.create(
+            custom_field=definition,
+            content_type=ContentType.objects.get_for_model(Item),
+            object_id=self.item.id,
+            value="Senior",
+        )
+        Item.objects.create(company=company, currency=self.currency, unit=self.unit, name="Travel", price_per_unit=Decimal("0.30"))
+
+        address = Address.objects.create(street="Hauptstraße 1", city="Berlin", postal_code="10115", country="Germany")
+        self.customer = Customer.objects.create(
+            company=company, firstname="Anna", lastname="Schmidt", email="a@example.com", address=address, notes='Says "hi",\nwaves'
+        )
+        Customer.objects.create(company=company, firstname="Carl", lastname="Meyer", is_active=False)
+        Customer.objects.create(company=self.companies[1], firstname="Ben", lastname="Weber")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def test_customer_csv(self):
+        response = self.client.get(reverse("core:customers-export") + "?is_active=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="customers.csv"')
+
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["uuid"], str(self.customer.uuid))
+        self.assertEqual(rows[0]["company"], str(self.companies[0].uuid))
+        self.assertEqual(rows[0]["address_street"], "Hauptstraße 1")
+        self.assertEqual(rows[0]["notes"], 'Says "hi",\nwaves')
+        self.assertEqual(rows[0]["birthdate"], "")
+        self.assertEqual(rows[0]["is_active"], "true")
+
+    def test_csv_formulas_are_text(self):
+        Customer.objects.filter(pk=self.customer.pk).update(
+            firstname="=HYPERLINK(\"http://example.com\")", lastname="@SUM(A1)", notes="-1+1", title="\tMr"
+        )
+        response = self.client.get(reverse("core:customers-export") + "?is_active=true")
+        row = next(csv.DictReader(io.StringIO(read(response))))
+        self.assertEqual(row["firstname"], "'=HYPERLINK(\"http://example.com\")")
+        self.assertEqual(row["lastname"], "'@SUM(A1)")
+        self.assertEqual(row["notes"], "'-1+1")
+        self.assertEqual(row["title"], "'\tMr")
+
+        response = self.client.get(reverse("core:customers-export") + "?is_active=true&format=ndjson")
+        self.assertEqual(json.loads(read(response))["firstname"], "=HYPERLINK(\"http://example.com\")")
+
+    def test_item_csv_and_ndjson(self):
+        response = self.client.get(reverse("core:items-export"))
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        self.assertEqual([row["name"] for row in rows], ["Consulting", "Travel"])
+        self.assertEqual(rows[0]["cf.skill_level"], "Senior")
+        self.assertEqual(rows[0]["price_per_unit"], "90.00")
+        self.assertEqual(rows[0]["currency_short_name"], "EUR")
+        self.assertEqual(rows[1]["cf.skill_level"], "")
+
+        response = self.client.get(reverse("core:items-export") + "?format=ndjson&cf.skill_level=Senior")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["uuid"], str(self.item.uuid))
+        self.assertEqual(rows[0]["unit"], str(self.unit.uuid))
+        self.assertEqual(rows[0]["custom_fields"], {"skill_level": "Senior"})
+
+    def test_only_own_companies(self):
+        response = self.client.get(reverse("core:customers-export") + f"?format=ndjson&company={self.companies[1].uuid}")
+        self.assertEqual(read(response), "")
+
+        self.logout()
+        response = self.client.get(reverse("core:customers-export"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.content.decode().splitlines(), ["detail", "Authentication credentials were not provided."])
+
+    def test_memory_does_not_grow_with_rows(self):
+        company = self.companies[0]
+        url = reverse("core:customers-export") + f"?company={company.uuid}"
+
+        def peak(count):
+            Customer.objects.bulk_create(
+                Customer(company=company, firstname=f"First {index}", lastname=f"Last {index}", notes="x" * 200)
+                for index in range(count - Customer.objects.filter(company=company).count())
+            )
+            tracemalloc.start()
+            try:
+                size = sum(len(chunk) for chunk in self.client.get(url).streaming_content)
+                return size, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        with mock.patch.object(ExportMixin, "export_chunk_size", 200):
+            small_size, small_peak = peak(1000)
+            large_size, large_peak = peak(10000)
+
+        # Ten times the rows, the same peak: one chunk of rows and of CSV text at a time
+        self.assertGreater(large_size, 3_000_000)
+        self.assertLess(large_peak, 2_000_000)
+        self.assertLess(large_peak, small_peak * 1.5)
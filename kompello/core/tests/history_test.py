@@ -0,0 +1,158 @@
+"""
+Tests for the history action of the viewsets and the activity feed of companies.
+"""
+
+import datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from kompello.core.history import company_activity, object_history
+from kompello.core.models import CompanyLogEntry, Currency, Item, Unit
+from kompello.core.models.custom_field_models import CustomFieldDefinition
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class HistoryTest(BaseTestCase):
+    """
+    Test reading the recorded changes of an object and of a company, page by page.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(3)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0], self.users[1])
+        self.companies[1].members.add(self.users[2])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.currency = Currency.objects.create(company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro")
+            self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+            self.item = Item.objects.create(
+                company=self.companies[0], currency=self.currency, unit=self.unit, name="Consulting",
+                price_per_unit=Decimal("10.00"),
+            )
+            Unit.objects.create(company=self.companies[1], short_name="d", long_name="days")
+        CustomFieldDefinition.objects.create(
+            key="skill_level", name="Skill Level", data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=ContentType.objects.get_for_model(Item), company=self.companies[0], track_history=True,
+        )
+        self.item_url = reverse("core:items-history", kwargs={"uuid": self.item.uuid})
+        self.activity_url = reverse("core:companies-activity", kwargs={"uuid": self.companies[0].uuid})
+
+    def patch_item(self, user, data):
+        self.logout()
+        self.assertTrue(self.login(user.email, USER_PASSWORD))
+        url = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def walk(self, url):
+        """Follow the next links from url and return all results."""
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            results.extend(response.data["results"])
+            url = response.data["next"]
+        return results
+
+    def test_item_history(self):
+        self.patch_item(self.users[0], {"price_per_unit": "12.50"})
+        self.patch_item(self.users[1], {"custom_fields": {"skill_level": "Senior"}})
+
+        response = self.client.get(self.item_url)
+        self.assertEqual(response.status_code, 200)
+        custom_field, price, created = response.data["results"]
+        self.assertEqual(custom_field["changes"], {"custom_fields.skill_level": ["None", '"Senior"']})
+        self.assertEqual(custom_field["actor"]["uuid"], str(self.users[1].uuid))
+        self.assertEqual(price["action"], "update")
+        self.assertEqual(price["changes"], {"price_per_unit": ["10.00", "12.50"]})
+        self.assertEqual(price["actor"]["email"], self.users[0].email)
+        self.assertEqual(created["action"], "create")
+        self.assertIsNone(created["actor"])
+        self.assertEqual({entry["model"] for entry in response.data["results"]}, {"item"})
+        self.assertEqual({entry["object_uuid"] for entry in response.data["results"]}, {str(self.item.uuid)})
+
+    def test_filters(self):
+        self.patch_item(self.users[0], {"price_per_unit": "12.50"})
+        self.patch_item(self.users[1], {"price_per_unit": "15.00"})
+        last = LogEntry.objects.latest("timestamp", "pk")
+
+        response = self.client.get(self.item_url, {"actor": self.users[0].uuid})
+        self.assertEqual([entry["changes"]["price_per_unit"] for entry in response.data["results"]], [["10.00", "12.50"]])
+        response = self.client.get(self.item_url, {"since": last.timestamp.isoformat()})
+        self.assertEqual([entry["id"] for entry in response.data["results"]], [last.id])
+        response = self.client.get(self.item_url, {"until": last.timestamp.isoformat()})
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(self.item_url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pages(self):
+        """Entries of the same time and within the same millisecond are neither skipped nor repeated."""
+        content_type = ContentType.objects.get_for_model(Item)
+        base = timezone.now().replace(microsecond=0) - datetime.timedelta(days=1)
+        for offset in [0, 0, 0, 100, 200, 300, 300, 1000]:
+            LogEntry.objects.create(
+                content_type=content_type, object_pk=str(self.item.pk), object_repr=str(self.item),
+                action=LogEntry.Action.UPDATE, changes={}, timestamp=base + datetime.timedelta(microseconds=offset),
+            )
+        expected = list(object_history(self.item).values_list("id", flat=True))
+        self.assertEqual(len(expected), 9)
+
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        self.assertEqual([entry["id"] for entry in self.walk(f"{self.item_url}?page_size=2")], expected)
+
+    def test_permissions(self):
+        self.assertEqual(self.client.get(self.item_url).status_code, 401)
+        self.assertTrue(self.login(self.users[2].email, USER_PASSWORD))
+        self.assertEqual(self.client.get(self.item_url).status_code, 403)
+        self.assertEqual(self.client.get(self.activity_url).status_code, 403)
+
+        own_url = reverse("core:users-history", kwargs={"uuid": self.users[2].uuid})
+        self.assertEqual(self.client.get(own_url).status_code, 200)
+        other_url = reverse("core:users-history", kwargs={"uuid": self.users[0].uuid})
+        self.assertEqual(self.client.get(other_url).status_code, 403)
+
+    def test_activity(self):
+        self.patch_item(self.users[0], {"price_per_unit": "12.50"})
+        self.patch_item(self.users[1], {"name": "Consulting (remote)"})
+        url = reverse("core:companies-detail", kwargs={"uuid": self.companies[0].uuid})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"description": "Consultants"}, format="json")
+
+        results = self.walk(f"{self.activity_url}?page_size=2")
+        self.assertEqual(
+            [(entry["model"], entry["action"]) for entry in results],
+            [("company", "update"), ("item", "update"), ("item", "update"), ("item", "create"), ("unit", "create"),
+             ("currency", "create")],
+        )
+        self.assertEqual(results[0]["object_uuid"], str(self.companies[0].uuid))
+        self.assertEqual(results[3]["object_uuid"], str(self.item.uuid))
+
+        response = self.client.get(self.activity_url, {"actor": self.users[0].uuid})
+        self.assertEqual([entry["changes"] for entry in response.data["results"]], [{"price_per_unit": ["10.00", "12.50"]}])
+        self.assertEqual(CompanyLogEntry.objects.filter(company=self.companies[1]).count(), 1)
+
+    @skipUnless(connection.vendor == "sqlite", "Query plan format is SQLite specific")
+    def test_pages_use_indexes(self):
+        since = timezone.now()
+        plans = [
+            object_history(self.item)[:51].explain(),
+            object_history(self.item).filter(timestamp__lt=since)[:51].explain(),
+            company_activity(self.companies[0].id, since=since)[:51].explain(),
+            company_activity(self.companies[0].id, actor=self.users[0])[:51].explain(),
+        ]
+        for plan, index in zip(plans, [
+            "auditlog_logentry_history_idx",
+            "auditlog_logentry_history_idx",
+            "core_company_log_feed_idx",
+            "core_company_log_actor_idx",
+        ]):
+            self.assertIn(index, plan)
+            # Read in index order, no sorting of the matching rows
+            self.assertNotIn("TEMP B-TREE", plan)
@@ -99,8 +99,8 @@ class ItemApiViewsetTest(BaseTestCase):
             {"path": reverse("core:items-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
-        uuids = [item["uuid"] for item in response.data]
+        self.assertEqual(len(response.data["results"]), 2)
+        uuids = [item["uuid"] for item in response.data["results"]]
         self.assertIn(str(item1.uuid), uuids)
         self.assertIn(str(item2.uuid), uuids)
         self.assertNotIn(str(item3.uuid), uuids)
@@ -112,8 +112,8 @@ class ItemApiViewsetTest(BaseTestCase):
             {"path": reverse("core:items-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(item3.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(item3.uuid))
 
     def test_list_items_uses_lightweight_serializer(self):
         """Test that list view uses ItemListSerializer with simplified data."""
@@ -125,10 +125,10 @@ class ItemApiViewsetTest(BaseTestCase):
             {"path": reverse("core:items-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
         
         # Check that lightweight fields are present
-        item_data = response.data[0]
+        item_data = response.data["results"][0]
         self.assertIn("currency_symbol", item_data)
         self.assertIn("unit_short_name", item_data)
         self.assertEqual(item_data["currency_symbol"], "€")
@@ -150,8 +150,8 @@ class ItemApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:items-list')}?company={self.companies[0].uuid}"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(item1.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(item1.uuid))
 
     def test_list_items_admin_sees_all(self):
         """Test that admin users see all items."""
@@ -164,7 +164,7 @@ class ItemApiViewsetTest(BaseTestCase):
             {"path": reverse("core:items-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_retrieve_item(self):
         """Test retrieving a specific item."""
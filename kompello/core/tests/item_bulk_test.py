@@ -0,0 +1,142 @@
+"""
+Tests for the bulk item creation endpoint.
+"""
+
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ItemBulkCreateTest(BaseTestCase):
+    """
+    Test POST /api/items/bulk/.
+    """
+
+    def setUp(self):
+        self.admin_users = self.create_admin_user(1)
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        self.currency = Currency.objects.create(
+            company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro"
+        )
+        self.other_unit = Unit.objects.create(company=self.companies[1], short_name="kg", long_name="kilograms")
+        self.other_currency = Currency.objects.create(
+            company=self.companies[1], symbol="$", short_name="USD", long_name="US Dollar"
+        )
+
+        item_content_type = ContentType.objects.get_for_model(Item)
+        CustomFieldDefinition.objects.create(
+            key="max_hours",
+            name="Maximum Hours",
+            data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=item_content_type,
+            company=self.companies[0],
+        )
+        CustomFieldDefinition.objects.create(
+            key="legacy",
+            name="Legacy",
+            data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=item_content_type,
+            company=self.companies[0],
+            is_archived=True,
+        )
+        self.url = reverse("core:items-bulk")
+
+    def _row(self, index, **kwargs):
+        row = {
+            "company": str(self.companies[0].uuid),
+            "name": f"Item {index}",
+            "currency": str(self.currency.uuid),
+            "unit": str(self.unit.uuid),
+            "price_per_unit": "10.00",
+            "custom_fields": {"max_hours": index},
+        }
+        row.update(kwargs)
+        return row
+
+    def test_bulk_create(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        response = self.client.post(self.url, [self._row(i) for i in range(3)], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item["name"] for item in response.data], ["Item 0", "Item 1", "Item 2"])
+        self.assertEqual(response.data[0]["currency_symbol"], "€")
+
+        self.assertEqual(Item.objects.filter(company=self.companies[0]).count(), 3)
+        item = Item.objects.get(name="Item 2")
+        self.assertEqual(item.price_per_unit, Decimal("10.00"))
+        self.assertEqual(
+            list(CustomFieldInstance.objects.filter(object_id=item.id).values_list("value", flat=True)), [2]
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        # Warm up the custom field definition registry so both requests are served from it
+        self.client.post(self.url, [self._row(0)], format="json")
+
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(self.url, [self._row(i) for i in range(5)], format="json")
+        self.assertEqual(response.status_code, 201)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, [self._row(i) for i in range(100)], format="json")
+        self.assertEqual(response.status_code, 201)
+        # Only the number of INSERT batches may depend on the row count
+        self.assertEqual(
+            [query["sql"][:6] for query in small if not query["sql"].startswith("INSERT")],
+            [query["sql"][:6] for query in large if not query["sql"].startswith("INSERT")],
+        )
+
+    def test_errors_are_reported_per_row(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        rows = [
+            self._row(0),
+            self._row(1, price_max="5.00"),
+            self._row(2, currency=str(self.other_currency.uuid)),
+            self._row(3, custom_fields={"max_hours": "many"}),
+            self._row(4, custom_fields={"legacy": "x"}),
+            self._row(5, unit="not-a-uuid"),
+            self._row(6, company=str(self.companies[1].uuid), currency=str(self.other_currency.uuid),
+                      unit=str(self.other_unit.uuid), custom_fields={}),
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data), len(rows))
+        self.assertEqual(response.data[0], {})
+        self.assertIn("price_max", response.data[1])
+        self.assertIn("currency", response.data[2])
+        self.assertIn("custom_fields", response.data[3])
+        self.assertIn("custom_fields", response.data[4])
+        self.assertIn("unit", response.data[5])
+        self.assertIn("company", response.data[6])
+
+        # Nothing is written if any row is invalid
+        self.assertFalse(Item.objects.exists())
+
+    def test_admin_can_create_for_any_company(self):
+        self.assertTrue(self.login(self.admin_users[0].email, USER_PASSWORD))
+        row = self._row(0, company=str(self.companies[1].uuid), currency=str(self.other_currency.uuid),
+                        unit=str(self.other_unit.uuid), custom_fields={})
+        response = self.client.post(self.url, [row], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Item.objects.filter(company=self.companies[1]).exists())
+
+    def test_requires_list(self):
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        response = self.client.post(self.url, self._row(0), format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        response = self.client.post(self.url, [self._row(0)], format="json")
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,153 @@
+"""
+Tests for filtering and ordering the item list by custom field values.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ItemCustomFieldFilterTest(BaseTestCase):
+    """
+    Test ?cf.<key>= filters and ?ordering=cf.<key> on GET /api/items/.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        self.currency = Currency.objects.create(
+            company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro"
+        )
+        content_type = ContentType.objects.get_for_model(Item)
+        self.definitions = {
+            key: CustomFieldDefinition.objects.create(
+                key=key, name=key, data_type=data_type, model_type=content_type, company=self.companies[0]
+            )
+            for key, data_type in [
+                ("max_hours", CustomFieldDefinition.FieldDataType.NUMBER),
+                ("skill_level", CustomFieldDefinition.FieldDataType.TEXT),
+                ("remote", CustomFieldDefinition.FieldDataType.BOOLEAN),
+            ]
+        }
+
+        self.url = reverse("core:items-list")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+        for name, custom_fields in [
+            ("A", {"max_hours": 10, "skill_level": "Junior", "remote": True}),
+            ("B", {"max_hours": 40.5, "skill_level": "Senior", "remote": False}),
+            ("C", {"max_hours": 80, "skill_level": "Senior Plus"}),
+            ("D", {}),
+        ]:
+            response = self.client.post(self.url, self._item_data(name, custom_fields), format="json")
+            self.assertEqual(response.status_code, 201)
+
+    def _item_data(self, name, custom_fields):
+        return {
+            "company": str(self.companies[0].uuid),
+            "name": name,
+            "currency": str(self.currency.uuid),
+            "unit": str(self.unit.uuid),
+            "price_per_unit": "10.00",
+            "custom_fields": custom_fields,
+        }
+
+    def _names(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [item["name"] for item in response.data["results"]]
+
+    def test_typed_columns_are_filled(self):
+        instance = CustomFieldInstance.objects.get(item__name="B", custom_field=self.definitions["max_hours"])
+        self.assertEqual((instance.value_number, instance.value_text, instance.value_boolean), (40.5, None, None))
+        instance = CustomFieldInstance.objects.get(item__name="B", custom_field=self.definitions["remote"])
+        self.assertEqual((instance.value_number, instance.value_text, instance.value_boolean), (None, None, False))
+
+        # Updates through the API and single-row saves keep the typed column in sync
+        item = Item.objects.get(name="A")
+        response = self.client.patch(
+            reverse("core:items-detail", kwargs={"uuid": item.uuid}),
+            {"custom_fields": {"skill_level": "Lead"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        instance = CustomFieldInstance.objects.get(object_id=item.id, custom_field=self.definitions["skill_level"])
+        self.assertEqual(instance.value_text, "Lead")
+
+        instance.value = "Principal"
+        instance.save()
+        instance.refresh_from_db()
+        self.assertEqual(instance.value_text, "Principal")
+
+    def test_filters(self):
+        self.assertEqual(self._names({"cf.max_hours__gte": "40"}), ["B", "C"])
+        self.assertEqual(self._names({"cf.max_hours__lt": "40.5"}), ["A"])
+        self.assertEqual(self._names({"cf.max_hours": "80"}), ["C"])
+        self.assertEqual(self._names({"cf.skill_level": "Senior"}), ["B"])
+        self.assertEqual(self._names({"cf.skill_level__icontains": "senior"}), ["B", "C"])
+        self.assertEqual(self._names({"cf.remote": "false"}), ["B"])
+        self.assertEqual(self._names({"cf.skill_level__icontains": "senior", "cf.max_hours__gt": "50"}), ["C"])
+
+    def test_filter_runs_in_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._names({"cf.max_hours__gte": "40"})
+        item_queries = [query["sql"] for query in queries if query["sql"].startswith('SELECT "core_item"')]
+        self.assertEqual(len(item_queries), 1)
+        self.assertIn('"core_customfieldinstance"', item_queries[0])
+        self.assertIn('"value_number" >= 40.0', item_queries[0])
+
+    def test_definitions_from_registry(self):
+        self._names({"cf.max_hours__gte": "40"})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._names({"cf.max_hours__gte": "40", "company": str(self.companies[0].uuid)}), ["B", "C"])
+            self.assertEqual(self._names({"ordering": "-cf.skill_level"}), ["C", "B", "A", "D"])
+        self.assertFalse([query for query in queries if '"core_customfielddefinition"' in query["sql"]])
+        # Only the definitions of the filtered company count
+        response = self.client.get(self.url, {"cf.max_hours__gte": "40", "company": str(self.companies[1].uuid)})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ordering(self):
+        self.assertEqual(self._names({"ordering": "cf.max_hours"}), ["D", "A", "B", "C"])
+        self.assertEqual(self._names({"ordering": "-cf.max_hours"}), ["C", "B", "A", "D"])
+        self.assertEqual(self._names({"ordering": "-cf.skill_level"}), ["C", "B", "A", "D"])
+        self.assertEqual(self._names({"ordering": "-cf.remote,name"}), ["A", "B", "C", "D"])
+        self.assertEqual(self._names({"ordering": "-name", "cf.max_hours__gte": "10"}), ["C", "B", "A"])
+
+    def test_ordering_with_keyset_pagination(self):
+        names = []
+        response = self.client.get(self.url, {"ordering": "-cf.max_hours", "page_size": 1})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            names.extend(item["name"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(names, ["C", "B", "A", "D"])
+
+    def test_invalid_requests(self):
+        for params in [
+            {"cf.unknown": "1"},
+            {"cf.max_hours": "many"},
+            {"cf.remote__gte": "true"},
+            {"ordering": "description"},
+            {"ordering": "cf.unknown"},
+        ]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_other_companies_fields_are_unknown(self):
+        CustomFieldDefinition.objects.create(
+            key="region",
+            name="Region",
+            data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=ContentType.objects.get_for_model(Item),
+            company=self.companies[1],
+        )
+        response = self.client.get(self.url, {"cf.region": "EU"})
+        self.assertEqual(response.status_code, 400)
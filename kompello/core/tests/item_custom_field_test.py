@@ -6,10 +6,12 @@ from decimal import Decimal
 from http import HTTPMethod
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
+from rest_framework.exceptions import ValidationError
 
 from kompello.core.models import Company, KompelloUser
 from kompello.core.models.billing_models import Item, Currency, Unit
 from kompello.core.models.custom_field_models import CustomFieldDefinition, CustomFieldInstance
+from kompello.core.serializers.item_serializers import ItemSerializer
 from kompello.core.tests.helper import BaseTestCase
 
 
@@ -440,3 +442,60 @@ class ItemCustomFieldTestCase(BaseTestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("custom_fields", response.data)
 
+
+    def test_save_custom_fields_query_budget(self):
+        """Test that saving custom fields uses a fixed number of queries regardless of the number of keys."""
+        fields = [
+            CustomFieldDefinition.objects.create(
+                key=f"field_{index}",
+                name=f"Field {index}",
+                data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+                model_type=self.item_content_type,
+                company=self.companies[0],
+            )
+            for index in range(20)
+        ]
+        item = Item.objects.create(
+            company=self.companies[0],
+            name="Test Item",
+            currency=self.currency,
+            unit=self.unit,
+            price_per_unit=Decimal("50.00")
+        )
+        serializer = ItemSerializer()
+
+        # Definitions, existing instances, savepoint, INSERT, custom_fields_cache SELECT + UPDATE, release
+        with self.assertNumQueries(7):
+            serializer._save_custom_fields(item, {field.key: 1 for field in fields})
+        self.assertEqual(item.custom_fields.count(), 20)
+        self.assertEqual(item.custom_fields_cache, {field.key: 1 for field in fields})
+
+        # Unchanged values are not written at all, and the definitions now come from the registry cache
+        with self.assertNumQueries(1):
+            serializer._save_custom_fields(item, {field.key: 1 for field in fields})
+
+        # Existing instances, savepoint, INSERT, UPDATE, custom_fields_cache SELECT + UPDATE, release
+        data = {field.key: index for index, field in enumerate(fields)}
+        data["skill_level"] = "Senior"
+        with self.assertNumQueries(7):
+            serializer._save_custom_fields(item, data)
+        values = dict(item.custom_fields.values_list("custom_field__key", "value"))
+        self.assertEqual(values, data)
+        item.refresh_from_db()
+        self.assertEqual(item.custom_fields_cache, data)
+
+    def test_save_custom_fields_validates_before_writing(self):
+        """Test that an invalid value rejects the whole set without writing any of it."""
+        item = Item.objects.create(
+            company=self.companies[0],
+            name="Test Item",
+            currency=self.currency,
+            unit=self.unit,
+            price_per_unit=Decimal("50.00")
+        )
+        self.text_field.is_archived = True
+        self.text_field.save()
+
+        with self.assertRaises(ValidationError):
+            ItemSerializer()._save_custom_fields(item, {"max_hours": 10, "skill_level": "Senior"})
+        self.assertFalse(item.custom_fields.exists())
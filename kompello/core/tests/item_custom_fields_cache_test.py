@@ -0,0 +1,112 @@
+"""
+Tests for the denormalized custom_fields_cache column on Item.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+def custom_field_queries(queries):
+    return [query for query in queries if "core_customfield" in query["sql"]]
+
+
+class ItemCustomFieldsCacheTest(BaseTestCase):
+    """
+    Test that Item.custom_fields_cache mirrors the stored custom field instances.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.companies = self.create_company(1)
+        self.companies[0].members.add(self.users[0])
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        self.currency = Currency.objects.create(
+            company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro"
+        )
+        self.content_type = ContentType.objects.get_for_model(Item)
+        self.max_hours = CustomFieldDefinition.objects.create(
+            key="max_hours",
+            name="Maximum Hours",
+            data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=self.content_type,
+            company=self.companies[0],
+        )
+        self.item = Item.objects.create(
+            company=self.companies[0],
+            name="Consulting",
+            currency=self.currency,
+            unit=self.unit,
+            price_per_unit=Decimal("100.00"),
+        )
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def _cache(self, item):
+        item.refresh_from_db()
+        return item.custom_fields_cache
+
+    def test_api_writes_update_cache_and_reads_skip_relation(self):
+        path = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        response = self.client.patch(path, {"custom_fields": {"max_hours": 40}}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["custom_fields"], {"max_hours": 40})
+        self.assertEqual(self._cache(self.item), {"max_hours": 40})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+            self.assertEqual(response.data["custom_fields"], {"max_hours": 40})
+            response = self.client.get(path, {"fields": "uuid,custom_fields"})
+            self.assertEqual(response.data, {"uuid": str(self.item.uuid), "custom_fields": {"max_hours": 40}})
+        self.assertEqual(custom_field_queries(queries), [])
+
+    def test_single_row_writes_update_cache(self):
+        instance = CustomFieldInstance.objects.create(
+            custom_field=self.max_hours,
+            content_type=self.content_type,
+            object_id=self.item.id,
+            value=8,
+        )
+        self.assertEqual(self._cache(self.item), {"max_hours": 8})
+
+        self.max_hours.key = "hours"
+        self.max_hours.save()
+        self.assertEqual(self._cache(self.item), {"hours": 8})
+
+        instance.delete()
+        self.assertEqual(self._cache(self.item), {})
+
+    def test_bulk_create_fills_cache(self):
+        row = {
+            "company": str(self.companies[0].uuid),
+            "name": "Bulk",
+            "currency": str(self.currency.uuid),
+            "unit": str(self.unit.uuid),
+            "price_per_unit": "10.00",
+            "custom_fields": {"max_hours": 3},
+        }
+        response = self.client.post(reverse("core:items-bulk"), [row], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Item.objects.get(name="Bulk").custom_fields_cache, {"max_hours": 3})
+
+    def test_rebuild_command(self):
+        CustomFieldInstance.objects.create(
+            custom_field=self.max_hours,
+            content_type=self.content_type,
+            object_id=self.item.id,
+            value=8,
+        )
+        Item.objects.update(custom_fields_cache={"stale": True})
+
+        out = StringIO()
+        call_command("rebuild_custom_fields_cache", "--model", "core.Item", stdout=out)
+        self.assertIn("core.Item: rebuilt 1 rows, 1 changed", out.getvalue())
+        self.assertEqual(self._cache(self.item), {"max_hours": 8})
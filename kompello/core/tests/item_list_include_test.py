@@ -0,0 +1,93 @@
+"""
+Tests for ?include=custom_fields on GET /api/items/.
+"""
+
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.serializers.item_serializers import ItemListSerializer
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ItemListIncludeTest(BaseTestCase):
+    """
+    Test that the item list only carries custom fields when asked to, without per-item queries.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.companies = self.create_company(1)
+        self.companies[0].members.add(self.users[0])
+
+        unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        currency = Currency.objects.create(company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro")
+        content_type = ContentType.objects.get_for_model(Item)
+        definition = CustomFieldDefinition.objects.create(
+            key="max_hours",
+            name="Maximum Hours",
+            data_type=CustomFieldDefinition.FieldDataType.NUMBER,
+            model_type=content_type,
+            company=self.companies[0],
+        )
+        for index in range(50):
+            item = Item.objects.create(
+                company=self.companies[0],
+                name=f"Item {index}",
+                currency=currency,
+                unit=unit,
+                price_per_unit=Decimal("10.00"),
+            )
+            CustomFieldInstance.objects.create(
+                custom_field=definition, content_type=content_type, object_id=item.id, value=index
+            )
+
+        self.url = reverse("core:items-list")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def test_custom_fields_are_optional(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("custom_fields", response.data["results"][0])
+
+        response = self.client.get(self.url, {"include": "custom_fields"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({item["custom_fields"]["max_hours"] for item in response.data["results"]}, set(range(50)))
+
+        response = self.client.get(self.url, {"fields": "name,custom_fields"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data["results"][0]), {"name", "custom_fields"})
+
+    def test_include_query_count_is_constant(self):
+        # Warm up the per-process caches (content types, custom field definitions)
+        self.client.get(self.url, {"include": "custom_fields"})
+        counts = []
+        for page_size in [5, 50]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {"include": "custom_fields", "page_size": page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), page_size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_prefetched_relation_is_used(self):
+        counts = []
+        for page_size in [5, 50]:
+            page = Item.objects.select_related("currency", "unit").defer("custom_fields_cache").prefetch_related(
+                Prefetch("custom_fields", queryset=CustomFieldInstance.objects.select_related("custom_field"))
+            )[:page_size]
+            with CaptureQueriesContext(connection) as queries:
+                data = ItemListSerializer(page, many=True).data
+            self.assertEqual(len(data), page_size)
+            self.assertIn("max_hours", data[0]["custom_fields"])
+            counts.append(len(queries))
+        self.assertEqual(counts, [2, 2])
+
+    def test_unknown_include(self):
+        response = self.client.get(self.url, {"include": "history"})
+        self.assertEqual(response.status_code, 400)
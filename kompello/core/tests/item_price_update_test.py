@@ -0,0 +1,180 @@
+"""
+Tests for the set-based item price update endpoint.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, Item, Unit
+from kompello.core.response_cache import VERSION_KEY, cache
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ItemPriceUpdateTest(BaseTestCase):
+    """
+    Test POST /api/items/price_update/.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        self.other_unit = Unit.objects.create(company=self.companies[0], short_name="d", long_name="days")
+        self.currency = Currency.objects.create(
+            company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro"
+        )
+        foreign_unit = Unit.objects.create(company=self.companies[1], short_name="h", long_name="hours")
+        foreign_currency = Currency.objects.create(
+            company=self.companies[1], symbol="€", short_name="EUR", long_name="Euro"
+        )
+
+        self.fixed = self._create_item(self.companies[0], self.currency, self.unit, "Fixed", "10.00")
+        self.ranged = self._create_item(self.companies[0], self.currency, self.unit, "Ranged", "20.00", "30.00")
+        self.daily = self._create_item(self.companies[0], self.currency, self.other_unit, "Daily", "500.00")
+        self.foreign = self._create_item(self.companies[1], foreign_currency, foreign_unit, "Foreign", "10.00")
+        self.url = reverse("core:items-price-update")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    @staticmethod
+    def _create_item(company, currency, unit, name, price, price_max=None):
+        return Item.objects.create(
+            company=company,
+            name=name,
+            currency=currency,
+            unit=unit,
+            price_per_unit=Decimal(price),
+            price_max=Decimal(price_max) if price_max else None,
+        )
+
+    def _prices(self, item):
+        item.refresh_from_db()
+        return item.price_per_unit, item.price_max
+
+    def test_percentage_increase(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {"percentage": "10", "company": str(self.companies[0].uuid)}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"updated": 3})
+        # One UPDATE for all items, the prices before and the items after it are read once for the audit log
+        item_queries = [query["sql"] for query in queries if "core_item" in query["sql"]]
+        self.assertEqual(len(item_queries), 3)
+        self.assertEqual([sql for sql in item_queries if sql.startswith('UPDATE "core_item"')], [item_queries[1]])
+
+        self.assertEqual(self._prices(self.fixed), (Decimal("11.00"), None))
+        self.assertEqual(self._prices(self.ranged), (Decimal("22.00"), Decimal("33.00")))
+        self.assertEqual(self._prices(self.daily), (Decimal("550.00"), None))
+        # Items of other companies are never touched
+        self.assertEqual(self._prices(self.foreign), (Decimal("10.00"), None))
+
+    def test_percentage_with_rounding_and_filter(self):
+        response = self.client.post(
+            self.url,
+            {"percentage": "-3", "round_to": "0.50", "company": str(self.companies[0].uuid), "unit": str(self.unit.uuid)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"updated": 2})
+
+        # 9.70 -> 9.50, 19.40 -> 19.50, 29.10 -> 29.00
+        self.assertEqual(self._prices(self.fixed), (Decimal("9.50"), None))
+        self.assertEqual(self._prices(self.ranged), (Decimal("19.50"), Decimal("29.00")))
+        self.assertEqual(self._prices(self.daily), (Decimal("500.00"), None))
+
+    def test_absolute_price_raises_price_max(self):
+        response = self.client.post(
+            self.url,
+            {"price": "25.00", "uuids": [str(self.fixed.uuid), str(self.ranged.uuid), str(self.foreign.uuid)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"updated": 2})
+
+        self.assertEqual(self._prices(self.fixed), (Decimal("25.00"), None))
+        self.assertEqual(self._prices(self.ranged), (Decimal("25.00"), Decimal("30.00")))
+
+        response = self.client.post(self.url, {"price": "40.00", "uuids": [str(self.ranged.uuid)]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._prices(self.ranged), (Decimal("40.00"), Decimal("40.00")))
+        self.assertEqual(self._prices(self.foreign), (Decimal("10.00"), None))
+
+    def test_modified_on_and_etag(self):
+        detail_url = reverse("core:items-detail", kwargs={"uuid": self.fixed.uuid})
+        response = self.client.get(detail_url)
+        etag = response["ETag"]
+        modified_on = self.fixed.modified_on
+        daily_modified_on = self.daily.modified_on
+
+        response = self.client.post(self.url, {"price": "12.00", "uuids": [str(self.fixed.uuid)]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.fixed.refresh_from_db()
+        self.assertGreater(self.fixed.modified_on, modified_on)
+        self.daily.refresh_from_db()
+        self.assertEqual(self.daily.modified_on, daily_modified_on)
+
+        response = self.client.get(detail_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["price_per_unit"], "12.00")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_invalidates_response_cache(self):
+        keys = [VERSION_KEY.format(company_id=company.id) for company in self.companies]
+        cache.set_many({key: "version" for key in keys})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {"percentage": "10", "company": str(self.companies[0].uuid)}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertEqual(cache.get(keys[1]), "version")
+
+        with mock.patch("kompello.core.serializers.item_serializers.invalidate_responses") as invalidate:
+            self.client.post(self.url, {"price": "10.00", "uuids": [str(self.foreign.uuid)]}, format="json")
+        invalidate.assert_called_once_with(set())
+
+    def test_audit_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {"price": "25.00", "uuids": [str(self.fixed.uuid), str(self.ranged.uuid), str(self.daily.uuid)]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        entries = LogEntry.objects.filter(action=LogEntry.Action.UPDATE)
+        self.assertEqual(entries.get(object_pk=self.fixed.pk).changes_dict, {"price_per_unit": ["10.00", "25.00"]})
+        # price_max is only recorded where it changed
+        self.assertEqual(entries.get(object_pk=self.ranged.pk).changes_dict, {"price_per_unit": ["20.00", "25.00"]})
+        entry = entries.get(object_pk=self.daily.pk)
+        self.assertEqual(entry.changes_dict, {"price_per_unit": ["500.00", "25.00"]})
+        self.assertEqual(entry.actor, self.users[0])
+        self.assertFalse(entries.filter(object_pk=self.foreign.pk).exists())
+
+        # Unchanged prices are not recorded
+        self.client.post(self.url, {"price": "25.00", "uuids": [str(self.fixed.uuid)]}, format="json")
+        self.assertEqual(entries.filter(object_pk=self.fixed.pk).count(), 1)
+
+    def test_invalid_operations(self):
+        response = self.client.post(self.url, {"company": str(self.companies[0].uuid)}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, {"price": "1.00", "percentage": "5"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, {"percentage": "-150"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_required(self):
+        for data in [{"percentage": "10"}, {"percentage": "10", "unit": str(self.unit.uuid)}]:
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("company", response.data)
+        self.assertEqual(self._prices(self.fixed), (Decimal("10.00"), None))
@@ -0,0 +1,133 @@
+"""
+Tests for the cached company membership lookups.
+"""
+
+from decimal import Decimal
+from http import HTTPMethod
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.membership import CACHE_KEY, get_company_id, get_company_ids, is_company_member
+from kompello.core.models import Company, Currency, Item, KompelloUser, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+def membership_queries(queries):
+    return [query for query in queries if "core_company_members" in query["sql"]]
+
+
+class MembershipCacheTest(BaseTestCase):
+    """
+    Test caching and invalidation of a user's company ID set.
+    """
+
+    def setUp(self):
+        self.admin_users = self.create_admin_user(1)
+        self.users = self.create_user(2)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+
+    def test_company_ids_are_cached_across_user_objects(self):
+        self.assertEqual(get_company_ids(self.users[0]), {self.companies[0].id})
+
+        # A fresh user object (as in a new request or another worker) is served from the shared cache
+        user = KompelloUser.objects.get(id=self.users[0].id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_company_ids(user), {self.companies[0].id})
+            self.assertTrue(is_company_member(user, self.companies[0]))
+            self.assertFalse(is_company_member(user, self.companies[1].id))
+
+    def test_company_id_is_cached(self):
+        company = self.companies[1]
+        self.assertEqual(get_company_id(company.uuid), company.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_company_id(str(company.uuid)), company.id)
+            self.assertIsNone(get_company_id("not-a-uuid"))
+
+        # Unknown companies are looked up again, they may be created later
+        self.assertIsNone(get_company_id("9a3f4c55-0e1b-4f0e-8d6c-2b7a1c0d9e11"))
+        created = Company.objects.create(name="Later", uuid="9a3f4c55-0e1b-4f0e-8d6c-2b7a1c0d9e11")
+        self.assertEqual(get_company_id(created.uuid), created.id)
+
+        company.delete()
+        self.assertIsNone(get_company_id(company.uuid))
+
+    def test_add_and_remove_invalidate(self):
+        self.assertEqual(get_company_ids(self.users[0]), {self.companies[0].id})
+
+        self.companies[1].members.add(self.users[0])
+        user = KompelloUser.objects.get(id=self.users[0].id)
+        self.assertEqual(get_company_ids(user), {self.companies[0].id, self.companies[1].id})
+
+        self.companies[0].members.remove(self.users[0])
+        user = KompelloUser.objects.get(id=self.users[0].id)
+        self.assertEqual(get_company_ids(user), {self.companies[1].id})
+
+    def test_reverse_add_and_clear_invalidate(self):
+        self.assertEqual(get_company_ids(self.users[1]), frozenset())
+
+        self.users[1].companies.add(self.companies[1])
+        user = KompelloUser.objects.get(id=self.users[1].id)
+        self.assertEqual(get_company_ids(user), {self.companies[1].id})
+
+        self.companies[1].members.clear()
+        user = KompelloUser.objects.get(id=self.users[1].id)
+        self.assertEqual(get_company_ids(user), frozenset())
+
+    def test_invalidate_on_commit(self):
+        """A set cached by a concurrent request before the commit is dropped once the change commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.companies[1].members.add(self.users[0])
+            # Cached by another request, which can't see the uncommitted membership yet
+            cache.set(CACHE_KEY.format(user_id=self.users[0].id), frozenset([self.companies[0].id]))
+
+        user = KompelloUser.objects.get(id=self.users[0].id)
+        self.assertEqual(get_company_ids(user), {self.companies[0].id, self.companies[1].id})
+
+    def test_members_add_endpoint_invalidates(self):
+        self.assertEqual(get_company_ids(self.users[1]), frozenset())
+
+        response = self.authenticated_request(
+            HTTPMethod.PATCH,
+            self.admin_users[0],
+            {
+                "path": reverse("core:companies-members-add", kwargs={"uuid": self.companies[0].uuid}),
+                "data": {"uuids": [str(self.users[1].uuid)]},
+                "format": "json",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+
+        user = KompelloUser.objects.get(id=self.users[1].id)
+        self.assertEqual(get_company_ids(user), {self.companies[0].id})
+
+    def test_request_makes_at_most_one_membership_query(self):
+        unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        currency = Currency.objects.create(company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro")
+        item = Item.objects.create(
+            company=self.companies[0],
+            name="Consulting",
+            currency=currency,
+            unit=unit,
+            price_per_unit=Decimal("100.00"),
+        )
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:items-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(membership_queries(queries)), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:items-detail", kwargs={"uuid": item.uuid}))
+            self.assertEqual(response.status_code, 200)
+            response = self.client.post(
+                reverse("core:units-list"),
+                {"company": str(self.companies[0].uuid), "short_name": "kg", "long_name": "kilograms"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(membership_queries(queries), [])
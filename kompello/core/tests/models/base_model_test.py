@@ -0,0 +1,32 @@
+from unittest import skipUnless
+
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from kompello.core.models.base_models import BaseModel
+from kompello.core.models.company_models import Company
+
+
+class BaseModelTest(TestCase):
+    """Test cases for fields shared by all models through BaseModel."""
+
+    def test_uuid_is_unique_on_all_models(self):
+        models = [model for model in apps.get_app_config("core").get_models() if issubclass(model, BaseModel)]
+        self.assertTrue(models)
+        for model in models:
+            field = model._meta.get_field("uuid")
+            self.assertTrue(field.unique, f"{model.__name__}.uuid is not unique")
+
+    def test_duplicate_uuid_is_rejected(self):
+        company = Company.objects.create(name="Test Company")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Company.objects.create(name="Other Company", uuid=company.uuid)
+
+    @skipUnless(connection.vendor == "sqlite", "Query plan format is SQLite specific")
+    def test_uuid_lookup_uses_index(self):
+        company = Company.objects.create(name="Test Company")
+
+        plan = Company.objects.filter(uuid=company.uuid).explain()
+        self.assertIn("USING INDEX", plan)
@@ -0,0 +1,113 @@
+"""
+Tests for the keyset pagination used by all list endpoints.
+"""
+
+import datetime
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from kompello.core.models import Currency, Item, Unit
+from kompello.core.pagination import KeysetPagination
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class KeysetPaginationTest(BaseTestCase):
+    """
+    Test paging through list endpoints with cursors.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.company = self.create_company(1)[0]
+        self.company.members.add(self.users[0])
+
+        unit = Unit.objects.create(company=self.company, short_name="h", long_name="hours")
+        currency = Currency.objects.create(company=self.company, symbol="€", short_name="EUR", long_name="Euro")
+        # Duplicate names make sure the uuid tie-breaker keeps the ordering total
+        for name in ["Alpha", "Bravo", "Bravo", "Bravo", "Charlie", "Delta", "Delta", "Echo"]:
+            Item.objects.create(
+                company=self.company,
+                name=name,
+                currency=currency,
+                unit=unit,
+                price_per_unit=Decimal("10.00"),
+            )
+        self.expected = [str(uuid) for uuid in Item.objects.order_by("name", "uuid").values_list("uuid", flat=True)]
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def test_walk_forward_and_backward(self):
+        """Following next and previous links visits every item exactly once in both directions."""
+        pages = []
+        url = reverse("core:items-list") + "?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([item["uuid"] for item in response.data["results"]])
+            url = response.data["next"]
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertEqual([uuid for page in pages for uuid in page], self.expected)
+        self.assertIsNotNone(response.data["previous"])
+
+        backwards = []
+        url = response.data["previous"]
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            backwards.insert(0, [item["uuid"] for item in response.data["results"]])
+            url = response.data["previous"]
+
+        self.assertEqual(backwards, pages[:-1])
+
+    def test_first_page_has_no_previous_link(self):
+        response = self.client.get(reverse("core:items-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNone(response.data["next"])
+        self.assertEqual([item["uuid"] for item in response.data["results"]], self.expected)
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:items-list") + "?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"].upper()])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("core:items-list") + "?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_same_millisecond(self):
+        """Rows whose ordering values differ by microseconds are neither skipped nor repeated."""
+        base = timezone.now().replace(microsecond=0) - datetime.timedelta(days=1)
+        items = list(Item.objects.order_by("name", "uuid"))
+        for item, offset in zip(items, [0, 0, 100, 200, 300, 300, 900, 1000]):
+            item.created_on = base + datetime.timedelta(microseconds=offset)
+        Item.objects.bulk_update(items, ["created_on"])
+        queryset = Item.objects.order_by("created_on")
+        expected = [item.uuid for item in queryset.order_by("created_on", "uuid")]
+
+        results = []
+        params = {"page_size": 2}
+        # Bounded, a cursor that doesn't advance would return the same page forever
+        while params and len(results) <= len(expected):
+            paginator = KeysetPagination()
+            request = Request(APIRequestFactory().get(reverse("core:items-list"), params))
+            results.extend(item.uuid for item in paginator.paginate_queryset(queryset, request))
+            next_link = paginator.get_next_link()
+            params = next_link and {key: values[0] for key, values in parse_qs(urlparse(next_link).query).items()}
+        self.assertEqual(results, expected)
+
+    def test_unsupported_ordering(self):
+        """Orderings the cursor can't express are a misconfiguration of the view, not a client error."""
+        request = Request(APIRequestFactory().get(reverse("core:items-list")))
+        for ordering in ["company__name", "?"]:
+            with self.assertRaises(ImproperlyConfigured):
+                KeysetPagination().paginate_queryset(Item.objects.order_by(ordering), request)
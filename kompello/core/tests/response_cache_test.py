@@ -0,0 +1,115 @@
+"""
+Tests for the cache of rendered reference data responses.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from kompello.core.models import Currency, CustomFieldDefinition, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class ResponseCacheTest(BaseTestCase):
+    """
+    Test that unit and currency lists and custom field metadata are served from the response cache,
+    scoped to the user's companies and invalidated by writes.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(3)
+        self.companies = self.create_company(2)
+        self.companies[0].members.add(self.users[0])
+        self.companies[1].members.add(self.users[1])
+        self.users[2].is_staff = True
+        self.users[2].save()
+
+        self.unit = Unit.objects.create(company=self.companies[0], short_name="h", long_name="hours")
+        Unit.objects.create(company=self.companies[1], short_name="d", long_name="days")
+        self.currency = Currency.objects.create(company=self.companies[0], symbol="€", short_name="EUR", long_name="Euro")
+        self.definition = CustomFieldDefinition.objects.create(
+            key="skill_level",
+            name="Skill level",
+            data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=ContentType.objects.get_for_model(Item),
+            company=self.companies[0],
+        )
+        self.for_model_url = reverse("core:custom_fields-for-model") + (
+            f"?model_type_id={self.definition.model_type_id}&company_uuid={self.companies[0].uuid}"
+        )
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def names(self, url) -> list[str]:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [row["short_name"] for row in response.json()["results"]]
+
+    def test_hit_without_queries(self):
+        for url in [reverse("core:units-list"), reverse("core:currencies-list") + "?fields=uuid,symbol"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Session and user, the memberships and the response come from the cache
+            with self.assertNumQueries(2):
+                cached = self.client.get(url)
+            self.assertEqual(cached.status_code, 200)
+            self.assertEqual(cached.content, response.content)
+            self.assertEqual(cached["Content-Type"], response["Content-Type"])
+            self.assertEqual(cached["ETag"], response["ETag"])
+
+            cached = self.client.get(url, headers={"if_none_match": response["ETag"]})
+            self.assertEqual(cached.status_code, 304)
+
+    def test_invalidation(self):
+        url = reverse("core:units-list")
+        self.assertEqual(self.names(url), ["h"])
+
+        response = self.client.post(url, {"company": str(self.companies[0].uuid), "short_name": "m", "long_name": "months"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(self.names(url)), ["h", "m"])
+
+        self.unit.short_name = "hrs"
+        self.unit.save()
+        self.assertEqual(sorted(self.names(url)), ["hrs", "m"])
+
+        url = reverse("core:currencies-list")
+        self.assertEqual(self.names(url), ["EUR"])
+        self.currency.delete()
+        self.assertEqual(self.names(url), [])
+
+    def test_scope(self):
+        url = reverse("core:units-list")
+        self.assertEqual(self.names(url), ["h"])
+
+        # Members of other companies get their own responses
+        self.logout()
+        self.assertTrue(self.login(self.users[1].email, USER_PASSWORD))
+        self.assertEqual(self.names(url), ["d"])
+        self.companies[0].members.add(self.users[1])
+        self.assertEqual(sorted(self.names(url)), ["d", "h"])
+
+        # Staff users see every company and bypass the cache
+        self.logout()
+        self.assertTrue(self.login(self.users[2].email, USER_PASSWORD))
+        self.assertEqual(sorted(self.names(url)), ["d", "h"])
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_custom_field_metadata(self):
+        url = reverse("core:custom_fields-metadata")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).content, response.content)
+
+        response = self.client.get(self.for_model_url)
+        self.assertEqual([field["key"] for field in response.json()], ["skill_level"])
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.for_model_url).content, response.content)
+
+        self.definition.name = "Seniority"
+        self.definition.save()
+        self.assertEqual([field["name"] for field in self.client.get(self.for_model_url).json()], ["Seniority"])
+
+        # Membership is checked before a cached response is served
+        self.logout()
+        self.assertTrue(self.login(self.users[1].email, USER_PASSWORD))
+        self.assertEqual(self.client.get(self.for_model_url).status_code, 403)
@@ -0,0 +1,110 @@
+"""
+Tests for sparse fieldsets (?fields=) on API endpoints.
+"""
+
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kompello.core.models import Currency, Customer, CustomFieldDefinition, CustomFieldInstance, Item, Unit
+from kompello.core.tests.helper import USER_PASSWORD, BaseTestCase
+
+
+class SparseFieldsTest(BaseTestCase):
+    """
+    Test that ?fields= trims both the response and the SQL that produces it.
+    """
+
+    def setUp(self):
+        self.users = self.create_user(1)
+        self.company = self.create_company(1)[0]
+        self.company.members.add(self.users[0])
+
+        unit = Unit.objects.create(company=self.company, short_name="h", long_name="hours")
+        currency = Currency.objects.create(company=self.company, symbol="€", short_name="EUR", long_name="Euro")
+        self.item = Item.objects.create(
+            company=self.company,
+            name="Consulting",
+            description="A very long description",
+            currency=currency,
+            unit=unit,
+            price_per_unit=Decimal("100.00"),
+        )
+        definition = CustomFieldDefinition.objects.create(
+            key="skill_level",
+            name="Skill Level",
+            data_type=CustomFieldDefinition.FieldDataType.TEXT,
+            model_type=ContentType.objects.get_for_model(Item),
+            company=self.company,
+        )
+        CustomFieldInstance.objects.create(
+            custom_field=definition,
+            content_type=ContentType.objects.get_for_model(Item),
+            object_id=self.item.id,
+            value="Senior",
+        )
+        Customer.objects.create(company=self.company, firstname="Jane", lastname="Doe", notes="Lots of notes")
+        self.assertTrue(self.login(self.users[0].email, USER_PASSWORD))
+
+    def test_list_returns_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:items-list") + "?fields=uuid,name,price_per_unit")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"uuid": str(self.item.uuid), "name": "Consulting", "price_per_unit": "100.00"}],
+        )
+        item_queries = [query["sql"] for query in queries if "core_item" in query["sql"]]
+        self.assertTrue(item_queries)
+        for sql in item_queries:
+            self.assertNotIn('"core_item"."description"', sql)
+            self.assertNotIn("core_currency", sql)
+
+    def test_list_joins_only_requested_relations(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:items-list") + "?fields=uuid,currency_symbol")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [{"uuid": str(self.item.uuid), "currency_symbol": "€"}])
+        # Leaves out the aggregate query computing the list's version for conditional GETs
+        item_queries = [query["sql"] for query in queries if "core_item" in query["sql"] and "MAX(" not in query["sql"]]
+        self.assertEqual(len(item_queries), 1)
+        self.assertIn("core_currency", item_queries[0])
+        self.assertNotIn("core_unit", item_queries[0])
+
+    def test_retrieve_skips_custom_fields_when_not_requested(self):
+        url = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url + "?fields=uuid,name")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"uuid": str(self.item.uuid), "name": "Consulting"})
+        self.assertFalse([query for query in queries if "core_customfieldinstance" in query["sql"]])
+
+        response = self.client.get(url + "?fields=uuid,custom_fields")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"uuid": str(self.item.uuid), "custom_fields": {"skill_level": "Senior"}})
+
+    def test_customer_list_defers_notes(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:customers-list") + "?fields=uuid,firstname,lastname")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data["results"][0].keys()), ["uuid", "firstname", "lastname"])
+        customer_queries = [query["sql"] for query in queries if "core_customer" in query["sql"]]
+        self.assertTrue(customer_queries)
+        for sql in customer_queries:
+            self.assertNotIn('"core_customer"."notes"', sql)
+            self.assertNotIn("core_address", sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse("core:items-list") + "?fields=uuid,does_not_exist")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.data)
+
+    def test_fields_ignored_on_write(self):
+        url = reverse("core:items-detail", kwargs={"uuid": self.item.uuid})
+        response = self.client.patch(url + "?fields=uuid", {"name": "Renamed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["name"], "Renamed")
+        self.assertIn("description", response.data)
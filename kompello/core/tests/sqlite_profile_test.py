@@ -0,0 +1,41 @@
+"""
+Tests for the SQLite performance profile.
+"""
+
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from kompello.core.sqlite_profile import get_pragmas
+
+
+class SqliteProfileTest(SimpleTestCase):
+    """
+    Test the pragmas configured from SQLITE_PRAGMAS and applied to new connections.
+    """
+
+    databases = {"default"}
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite only")
+    def test_connection_has_profile(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA temp_store")
+            # 2 = MEMORY
+            self.assertEqual(cursor.fetchone()[0], 2)
+        # IMMEDIATE is opt-in through SQLITE_TRANSACTION_MODE
+        self.assertIsNone(connection.transaction_mode)
+
+    def test_overrides(self):
+        with mock.patch.dict("os.environ", {"KOMPELLO_SQLITE_PRAGMAS": '{"mmap_size": 0, "journal_mode": null}'}):
+            pragmas = get_pragmas()
+        self.assertEqual(pragmas["mmap_size"], 0)
+        self.assertNotIn("journal_mode", pragmas)
+        self.assertEqual(pragmas["synchronous"], "NORMAL")
+
+        for override in ['{"mmap_size": "1; DROP TABLE x"}', '{"mmap size": 1}']:
+            with mock.patch.dict("os.environ", {"KOMPELLO_SQLITE_PRAGMAS": override}):
+                with self.assertRaises(ValueError):
+                    get_pragmas()
@@ -55,8 +55,8 @@ class UnitApiViewsetTest(BaseTestCase):
             {"path": reverse("core:units-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
-        uuids = [item["uuid"] for item in response.data]
+        self.assertEqual(len(response.data["results"]), 2)
+        uuids = [item["uuid"] for item in response.data["results"]]
         self.assertIn(str(unit1.uuid), uuids)
         self.assertIn(str(unit2.uuid), uuids)
         self.assertNotIn(str(unit3.uuid), uuids)
@@ -68,8 +68,8 @@ class UnitApiViewsetTest(BaseTestCase):
             {"path": reverse("core:units-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(unit3.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(unit3.uuid))
 
     def test_list_units_filter_by_company(self):
         """Test filtering units by company UUID."""
@@ -83,8 +83,8 @@ class UnitApiViewsetTest(BaseTestCase):
             {"path": f"{reverse('core:units-list')}?company={self.companies[0].uuid}"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["uuid"], str(unit1.uuid))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uuid"], str(unit1.uuid))
 
     def test_list_units_admin_sees_all(self):
         """Test that admin users see all units."""
@@ -97,7 +97,7 @@ class UnitApiViewsetTest(BaseTestCase):
             {"path": reverse("core:units-list")},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_retrieve_unit(self):
         """Test retrieving a specific unit."""
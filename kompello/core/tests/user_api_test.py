@@ -61,7 +61,7 @@ class UserViewsetTest(BaseTestCase):
         self.login(email=self.admin_users[0].email, password=USER_PASSWORD)
         list_auth_resp = self.client.get(reverse("core:users-list"), format="json")
         self.assertEqual(list_auth_resp.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(list_auth_resp.data), 6)
+        self.assertEqual(len(list_auth_resp.data["results"]), 6)
 
     def test_get(self):
         """
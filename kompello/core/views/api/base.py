@@ -1,15 +1,46 @@
-from rest_framework import viewsets, permissions
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema
+from rest_framework import viewsets, permissions, serializers
+from rest_framework.decorators import action, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from kompello.app.config import CONFIG
+from kompello.core.autocomplete import suggest
+from kompello.core.conditional import (
+    collection_version,
+    has_modified_on,
+    make_etag,
+    not_modified,
+    object_version,
+    set_validators,
+)
+from kompello.core.db_router import read_from_replicas, record_write, routing_scope
+from kompello.core.export import CSVRenderer, NDJSONRenderer, export_response
+from kompello.core.history import object_history
+from kompello.core.membership import get_company_id, get_company_ids
+from kompello.core.pagination import HistoryPagination
+from kompello.core.response_cache import get_cached_response, get_response_key, store_response
+from kompello.core.models.custom_field_models import CustomFieldCacheModel
+from kompello.core.serializers.base_serializers import AutocompleteQuerySerializer, AutocompleteSuggestionSerializer
+from kompello.core.serializers.history_serializers import HistoryQuerySerializer, LogEntrySerializer
+
 
 class BaseModelViewSet(viewsets.ModelViewSet):
     lookup_field = "uuid"
     permission_classes = [permissions.IsAuthenticated]
+    fields_query_param = "fields"
+    include_query_param = "include"
 
     def get_permissions(self):
         """
         Returns the list of permissions that the current action requires.
 
         If the current action method has a 'permission_classes' attribute, instantiate and return those permissions.
-        Otherwise, defer to the superclass implementation.
+        Otherwise, defer to the superclass implementation. The history action requires the permissions of retrieve.
 
         Returns:
             list: A list of instantiated permission classes.
@@ -19,7 +50,373 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         if self.action is None:
             return super().get_permissions()
 
-        action = getattr(self, self.action, None)
+        action = getattr(self, "retrieve" if self.action == "history" else self.action, None)
         if action and hasattr(action, "permission_classes"):
             return super().get_permissions() + [permission() for permission in action.permission_classes]
         return super().get_permissions()
+
+    def dispatch(self, request, *args, **kwargs):
+        """Runs the request in its own database routing scope, see kompello.core.db_router."""
+        with routing_scope():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Sends the reads of safe requests to the read replicas once the user is authenticated and
+        permitted. Reads stay on the primary for users who wrote within the sticky window.
+        """
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS:
+            read_from_replicas(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Keeps the user's next reads on the primary after a write request."""
+        if request.method not in permissions.SAFE_METHODS:
+            record_write(getattr(request, "user", None))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_list_queryset(self):
+        """Returns the queryset of the list action, filtered."""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_list_version(self, rows: list, paginated: bool) -> list:
+        """
+        Returns the version parts of a list response (see kompello.core.conditional): the
+        collection_version() of its rows, the links of the page and the companies the user sees.
+        """
+        user = self.request.user
+        links = [self.paginator.get_previous_link(), self.paginator.get_next_link()] if paginated else None
+        return [collection_version(rows), links, None if user.is_staff else sorted(get_company_ids(user))]
+
+    def get_sparse_fields(self) -> list[str] | None:
+        """
+        Returns the field names requested with ?fields=uuid,name,... or None if all fields are requested.
+        Sparse fieldsets only apply to read requests; writes always validate and return the full representation.
+        """
+        request = getattr(self, "request", None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        fields = request.query_params.get(self.fields_query_param)
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(",") if field.strip()]
+
+    def get_includes(self) -> set[str]:
+        """
+        Returns the optional fields requested with ?include=custom_fields,...
+        Optional fields are listed in the serializer's Meta.optional_fields and left out of
+        read responses unless they are included here (or named in the sparse fieldset).
+        """
+        request = getattr(self, "request", None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return set()
+        include = request.query_params.get(self.include_query_param, "")
+        return {field.strip() for field in include.split(",") if field.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        """Returns the serializer instance without unrequested optional fields, trimmed to the requested sparse fieldset."""
+        serializer = super().get_serializer(*args, **kwargs)
+        target = getattr(serializer, "child", serializer)
+
+        optional_fields = getattr(getattr(target, "Meta", None), "optional_fields", [])
+        includes = self.get_includes()
+        unknown = [field for field in includes if field not in optional_fields]
+        if unknown:
+            raise ValidationError({self.include_query_param: [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        includes.update(self.get_sparse_fields() or [])
+        for name in optional_fields:
+            if name not in includes:
+                target.fields.pop(name, None)
+
+        sparse_fields = self.get_sparse_fields()
+        if sparse_fields is not None:
+            fields = target.fields
+            unknown = [field for field in sparse_fields if field not in fields]
+            if unknown:
+                raise ValidationError({self.fields_query_param: [f"Unknown field(s): {', '.join(unknown)}."]})
+            for name in list(fields):
+                if name not in sparse_fields:
+                    fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the regular filter backends and, for sparse fieldset requests, restricts the
+        loaded columns and relations to what the requested serializer fields need.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None:
+            return queryset
+        return self.restrict_queryset(queryset, self.get_serializer().fields)
+
+    def restrict_queryset(self, queryset, fields):
+        """
+        Turns the given serializer fields into .only() column selection and drops the
+        select_related/prefetch_related lookups that none of the fields use.
+        Falls back to the unmodified queryset if a field's data source can't be determined
+        (e.g. SerializerMethodField or model properties).
+        """
+        model = queryset.model
+        ordering = queryset.query.order_by or model._meta.ordering
+        only = {model._meta.pk.name, self.lookup_field}
+        only.update(
+            field.lstrip("-") for field in ordering
+            if isinstance(field, str) and "__" not in field and field.lstrip("-") not in queryset.query.annotations
+        )
+        # Foreign key columns are cheap and keep object permission checks free of deferred loads
+        only.update(field.name for field in model._meta.concrete_fields if field.is_relation)
+        # The version of a conditional GET (kompello.core.conditional) is built from modified_on
+        if has_modified_on(model):
+            only.add("modified_on")
+        select_related = set()
+        relations = set()
+
+        for field in fields.values():
+            if field.source == "*":
+                return queryset
+            try:
+                model_field = model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                return queryset
+
+            name = model_field.name
+            if not model_field.is_relation:
+                only.add(name)
+            elif not model_field.concrete:
+                if name == "custom_fields" and issubclass(model, CustomFieldCacheModel):
+                    # Served from the denormalized column instead of the generic relation
+                    only.add("custom_fields_cache")
+                else:
+                    # Reverse and generic relations are loaded through prefetch_related
+                    relations.add(name)
+            elif isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization():
+                only.add(name)
+            else:
+                relations.add(name)
+                select_related.add(name)
+                if has_modified_on(model_field.related_model):
+                    only.add(f"{name}__modified_on")
+                if isinstance(field, serializers.SlugRelatedField):
+                    only.add(f"{name}__{field.slug_field}")
+                elif len(field.source_attrs) > 1 and not isinstance(field, serializers.BaseSerializer):
+                    only.add(f"{name}__{field.source_attrs[1]}")
+                else:
+                    only.update(f"{name}__{related.name}" for related in model_field.related_model._meta.concrete_fields)
+
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if (lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup).split("__")[0] in relations
+        ]
+
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset.only(*only)
+
+    def list(self, request: Request, *args, **kwargs):
+        """Lists the objects, or answers 304 if the client's copy of the list is current."""
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        etag = make_etag(request, *self.get_list_version(rows, page is not None))
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            return set_validators(self.get_paginated_response(serializer.data), etag)
+        return set_validators(Response(serializer.data), etag)
+
+    def retrieve(self, request: Request, *args, **kwargs):
+        """Returns the object, or answers 304 if the client's copy of it is current."""
+        instance = self.get_object()
+        parts, last_modified = object_version(instance)
+        etag = make_etag(request, *parts)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    @extend_schema(
+        description=(
+            "Change log of the object, newest first, paginated with cursors. "
+            "Changed custom field values are listed as custom_fields.<key>."
+        ),
+        parameters=[HistoryQuerySerializer],
+        responses=LogEntrySerializer(many=True),
+    )
+    @action(detail=True, methods=["get"], pagination_class=HistoryPagination)
+    def history(self, request: Request, *args, **kwargs):
+        """Returns the recorded changes of the object, see kompello.core.history."""
+        instance = self.get_object()
+        query = HistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        entries = self.paginate_queryset(object_history(instance, **query.validated_data))
+        for entry in entries:
+            entry.object_uuid = instance.uuid
+        return self.get_paginated_response(LogEntrySerializer(entries, many=True).data)
+
+
+class CompanyScopedViewSet(BaseModelViewSet):
+    """
+    Base ViewSet for models that belong to a company.
+    Non-detail actions only see objects from companies the user is a member of,
+    detail actions rely on object-level permissions.
+    """
+    object_permission_actions = ["retrieve", "update", "partial_update", "destroy", "history"]
+
+    def get_queryset(self):
+        """Filter queryset to only include objects from companies the user is a member of."""
+        queryset = super().get_queryset()
+
+        # For retrieve/update/destroy operations, allow all objects through
+        # and rely on object-level permissions
+        if self.action in self.object_permission_actions:
+            return queryset
+
+        # Admin users can see all objects in list
+        if self.request.user.is_staff:
+            return queryset
+
+        # Regular users can only see objects from their companies in list
+        return queryset.filter(company_id__in=get_company_ids(self.request.user))
+
+    def get_list_queryset(self):
+        """Returns the queryset of the list action, filtered and narrowed to ?company=<uuid>."""
+        queryset = super().get_list_queryset()
+        company_uuid = self.request.query_params.get("company")
+        if company_uuid:
+            queryset = queryset.filter(company__uuid=company_uuid)
+        return queryset
+
+
+class AutocompleteMixin:
+    """
+    Adds GET .../autocomplete/?company=<uuid>&q=<prefix> to a viewset, answered from the
+    in-process prefix index of kompello.core.autocomplete (autocomplete_kind) without
+    loading or serializing any model instances.
+    """
+    autocomplete_kind = None
+
+    @extend_schema(
+        description=(
+            "Suggest objects of a company whose name starts with q, ordered alphabetically. "
+            "Case and accents are ignored. Meant to be called on every keystroke."
+        ),
+        parameters=[AutocompleteQuerySerializer],
+        responses=AutocompleteSuggestionSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    @permission_classes([permissions.IsAuthenticated])
+    def autocomplete(self, request: Request):
+        """Suggest objects of a company by the start of their name."""
+        query = AutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        company_id = get_company_id(query.validated_data["company"])
+        if company_id is None:
+            raise NotFound("Company not found.")
+        if not request.user.is_staff and company_id not in get_company_ids(request.user):
+            raise PermissionDenied("You are not a member of this company.")
+
+        suggestions = suggest(
+            self.autocomplete_kind, company_id, query.validated_data["q"], query.validated_data["limit"]
+        )
+        return Response([{"uuid": suggestion.uuid, "label": suggestion.label} for suggestion in suggestions])
+
+
+class ExportMixin:
+    """
+    Adds GET .../export/?format=csv|ndjson to a viewset, which streams every row of the list
+    (with the list's filters, unpaginated) in the columns of export_columns, see kompello.core.export.
+    """
+    export_columns = []
+    export_chunk_size = CONFIG.get("API_EXPORT_CHUNK_SIZE", 2000)
+
+    @extend_schema(
+        description=(
+            "Export all objects of the list, with the list's filters, as CSV (the default) or as "
+            "NDJSON (one JSON object per line). The file is streamed while it is read from the database."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="format",
+                type=OpenApiTypes.STR,
+                enum=[CSVRenderer.format, NDJSONRenderer.format],
+                description="File format of the export.",
+                required=False,
+            ),
+        ],
+        responses={(200, CSVRenderer.media_type): OpenApiTypes.STR, (200, NDJSONRenderer.media_type): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["get"], pagination_class=None, renderer_classes=[CSVRenderer, NDJSONRenderer])
+    @permission_classes([permissions.IsAuthenticated])
+    def export(self, request: Request):
+        """Stream all objects of the list as a CSV or NDJSON file."""
+        return export_response(
+            self.get_list_queryset(),
+            self.export_columns,
+            request.accepted_renderer.format,
+            self.basename,
+            self.export_chunk_size,
+        )
+
+
+class ResponseCacheMixin:
+    """
+    Serves the actions in response_cache_actions from the cache of rendered responses in
+    kompello.core.response_cache, for reference data that rarely changes. A cached response is
+    only served after authentication and permission checks, and only for the companies the user
+    is a member of (from the cached membership set), so a hit doesn't query the database.
+
+    Only JSON responses are cached. Staff users, who see every company, bypass the cache unless
+    get_response_cache_companies() says otherwise.
+    """
+    response_cache_actions = ("list",)
+    response_cache_key = None
+
+    def get_response_cache_companies(self):
+        """
+        Returns the IDs of the companies whose data the response of the current action may show,
+        or None if it must not be cached. By default the companies of the user, which lists are scoped to.
+        """
+        user = self.request.user
+        if user.is_staff:
+            return None
+        return get_company_ids(user)
+
+    def cached_response(self):
+        """Returns the cached response of the current request, or None on a miss (remembering the key to store the response under)."""
+        if self.action not in self.response_cache_actions:
+            return None
+        company_ids = self.get_response_cache_companies()
+        if company_ids is None:
+            return None
+        self.response_cache_key = get_response_key(self.request, company_ids)
+        return get_cached_response(self.request, self.response_cache_key)
+
+    def is_response_cacheable(self, response) -> bool:
+        return (
+            self.response_cache_key is not None
+            and isinstance(response, Response)
+            and response.status_code == 200
+            and isinstance(getattr(self.request, "accepted_renderer", None), JSONRenderer)
+        )
+
+    def list(self, request: Request, *args, **kwargs):
+        response = self.cached_response()
+        if response is not None:
+            return response
+        return super().list(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if self.is_response_cacheable(response):
+            store_response(self.response_cache_key, response.render())
+        return response
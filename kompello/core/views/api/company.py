@@ -5,34 +5,36 @@ from rest_framework.generics import QuerySet
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from kompello.core.history import company_activity
+from kompello.core.membership import get_company_ids, is_company_member
 from kompello.core.models import Company, KompelloUser
+from kompello.core.pagination import HistoryPagination
 from kompello.core.permissions import NoOne
 from kompello.core.serializers.base_serializers import UuidListSerializer
 from kompello.core.serializers.company_serializers import CompanySerializer
+from kompello.core.serializers.history_serializers import HistoryQuerySerializer, LogEntrySerializer
 from kompello.core.serializers.user_serializers import UserSerializer
 from kompello.core.views.api.base import BaseModelViewSet
 
 
 class IsMemberOfCompany(permissions.BasePermission):
     def has_object_permission(self, request: Request, view, obj: Company | QuerySet):
-        return obj.members.filter(id=request.user.id).exists()
+        return is_company_member(request.user, obj)
 
 
 class CompanyViewSet(BaseModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
 
+    def get_list_queryset(self):
+        queryset = super().get_list_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(id__in=get_company_ids(self.request.user))
+
     @permission_classes([IsMemberOfCompany | permissions.IsAdminUser])
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        queryset = queryset.filter(members__id=request.user.id) if not request.user.is_staff else queryset
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
 
     @permission_classes([IsMemberOfCompany | permissions.IsAdminUser])
     def retrieve(self, request, *args, **kwargs):
@@ -66,6 +68,29 @@ class CompanyViewSet(BaseModelViewSet):
         serializer = UserSerializer(company.members.all(), many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        parameters=[HistoryQuerySerializer],
+        responses={200: LogEntrySerializer(many=True)},
+        description=(
+            "Activity feed of a company: the recorded changes of all its objects, newest first, "
+            "paginated with cursors. Users and addresses don't belong to a company and are not included."
+        ),
+        operation_id="company_activity",
+    )
+    @action(detail=True, methods=["get"], pagination_class=HistoryPagination)
+    @permission_classes([IsMemberOfCompany | permissions.IsAdminUser])
+    def activity(self, request: Request, uuid=None):
+        company = self.get_object()
+        query = HistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        rows = self.paginate_queryset(company_activity(company.id, **query.validated_data))
+        entries = []
+        for row in rows:
+            row.log_entry.object_uuid = row.object_uuid
+            entries.append(row.log_entry)
+        return self.get_paginated_response(LogEntrySerializer(entries, many=True).data)
+
     @extend_schema(
         request=UuidListSerializer(),
         responses={200: {}},
@@ -4,7 +4,9 @@ from rest_framework.decorators import action, permission_classes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 from django.contrib.contenttypes.models import ContentType
 
-from kompello.core.views.api.base import BaseModelViewSet
+from kompello.core.custom_field_registry import get_definition_set
+from kompello.core.membership import get_company_id, get_company_ids, is_company_member
+from kompello.core.views.api.base import BaseModelViewSet, ResponseCacheMixin
 from kompello.core.models.custom_field_models import CustomFieldDefinition
 from kompello.core.serializers.custom_field_serializers import (
     CustomFieldDefinitionSerializer,
@@ -15,22 +17,40 @@ from kompello.core.models.company_models import Company
 from kompello.core.permissions import IsMemberOfCompany
 
 
-class CustomFieldDefinitionViewSet(BaseModelViewSet):
+class CustomFieldDefinitionViewSet(ResponseCacheMixin, BaseModelViewSet):
     queryset = CustomFieldDefinition.objects.all()
     serializer_class = CustomFieldDefinitionSerializer
+    response_cache_actions = ("metadata", "for_model")
+
+    def get_serializer_class(self):
+        """Use the read serializer (with expanded model_type) for read actions."""
+        if self.action in ["list", "retrieve", "for_model"]:
+            return CustomFieldDefinitionReadSerializer
+        return CustomFieldDefinitionSerializer
+
+    def get_list_queryset(self):
+        # members should only see fields for their companies unless admin
+        queryset = super().get_list_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(company_id__in=get_company_ids(self.request.user))
+
+    def get_response_cache_companies(self):
+        """metadata is the same for everyone, for_model shows the definitions of one company of the user."""
+        if self.action == "metadata":
+            return []
+        user = self.request.user
+        company_id = get_company_id(self.request.query_params.get("company_uuid", ""))
+        if company_id is None or not (user.is_staff or company_id in get_company_ids(user)):
+            return None
+        return [company_id]
 
     @permission_classes([IsMemberOfCompany | permissions.IsAdminUser])
     def list(self, request, *args, **kwargs):
-        # members should only see fields for their companies unless admin
-        qs = self.get_queryset()
-        if not request.user.is_staff:
-            qs = qs.filter(company__members__id=request.user.id)
-        serializer = CustomFieldDefinitionReadSerializer(qs, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
 
     @permission_classes([IsMemberOfCompany | permissions.IsAdminUser])
     def retrieve(self, request, *args, **kwargs):
-        self.serializer_class = CustomFieldDefinitionReadSerializer
         return super().retrieve(request, *args, **kwargs)
 
     @permission_classes([permissions.IsAuthenticated])
@@ -44,7 +64,7 @@ class CustomFieldDefinitionViewSet(BaseModelViewSet):
                 company = Company.objects.get(uuid=company_uuid)
             except Company.DoesNotExist:
                 return Response({"company": "Invalid company."}, status=status.HTTP_400_BAD_REQUEST)
-            if not company.members.filter(id=request.user.id).exists():
+            if not is_company_member(request.user, company):
                 return Response(status=status.HTTP_403_FORBIDDEN)
 
         return super().create(request, *args, **kwargs)
@@ -75,6 +95,10 @@ class CustomFieldDefinitionViewSet(BaseModelViewSet):
     )
     @action(detail=False, methods=["get"])
     def metadata(self, request):
+        response = self.cached_response()
+        if response is not None:
+            return response
+
         from kompello.core.models.billing_models import Item
         
         # Hardcoded list of models that support custom fields
@@ -129,6 +153,10 @@ class CustomFieldDefinitionViewSet(BaseModelViewSet):
         - company_uuid: Company UUID (required)
         - show_in_ui: If true, only return fields with show_in_ui=true (optional, default=true)
         """
+        response = self.cached_response()
+        if response is not None:
+            return response
+
         model_type_id = request.query_params.get("model_type_id")
         company_uuid = request.query_params.get("company_uuid")
         show_in_ui = request.query_params.get("show_in_ui", "true").lower() == "true"
@@ -140,8 +168,9 @@ class CustomFieldDefinitionViewSet(BaseModelViewSet):
             )
         
         try:
-            model_type = ContentType.objects.get(id=model_type_id)
-        except ContentType.DoesNotExist:
+            # get_for_id is served from ContentType's in-process cache
+            model_type = ContentType.objects.get_for_id(int(model_type_id))
+        except (ContentType.DoesNotExist, ValueError):
             return Response(
                 {"detail": "Invalid model_type_id."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -156,19 +185,15 @@ class CustomFieldDefinitionViewSet(BaseModelViewSet):
             )
         
         # Check user is member of company
-        if not request.user.is_staff and not company.members.filter(id=request.user.id).exists():
+        if not request.user.is_staff and not is_company_member(request.user, company):
             return Response(status=status.HTTP_403_FORBIDDEN)
         
         # Filter by model type, company, not archived
-        queryset = CustomFieldDefinition.objects.filter(
-            model_type=model_type,
-            company=company,
-            is_archived=False
-        )
-        
-        if show_in_ui:
-            queryset = queryset.filter(show_in_ui=True)
-        
-        queryset = queryset.order_by("name")
-        serializer = CustomFieldDefinitionReadSerializer(queryset, many=True)
+        definitions = [
+            definition
+            for definition in get_definition_set(company.id, model_type.id).definitions.values()
+            if not definition.is_archived and (definition.show_in_ui or not show_in_ui)
+        ]
+        definitions.sort(key=lambda definition: definition.name)
+        serializer = self.get_serializer(definitions, many=True)
         return Response(serializer.data)
@@ -2,19 +2,34 @@
 ViewSets for Customer and Address management.
 """
 
+import csv
+import json
+
+from django.db import DatabaseError
+from django.http import HttpResponse
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema
 from rest_framework import permissions, status
-from rest_framework.decorators import permission_classes
+from rest_framework.decorators import action, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from kompello.core.models import Customer, Company
 from kompello.core.permissions import NoOne
+from kompello.core.search import search_customers
 from kompello.core.serializers.customer_serializers import (
     CustomerSerializer,
     CustomerListSerializer,
+    CustomerImportSerializer,
+    CustomerSearchQuerySerializer,
+    CustomerSearchResultSerializer,
 )
-from kompello.core.views.api.base import BaseModelViewSet
+from kompello.core.autocomplete import CUSTOMERS
+from kompello.core.customer_import import ImportFileError, import_customers, read_csv
+from kompello.core.membership import get_company_ids, is_company_member
+from kompello.core.export import ExportColumn, NDJSONRenderer
+from kompello.core.views.api.base import AutocompleteMixin, CompanyScopedViewSet, ExportMixin
 
 
 class IsMemberOfCustomerCompany(permissions.BasePermission):
@@ -23,10 +38,10 @@ class IsMemberOfCustomerCompany(permissions.BasePermission):
     """
     
     def has_object_permission(self, request: Request, view, obj: Customer):
-        return obj.company.members.filter(id=request.user.id).exists()
+        return is_company_member(request.user, obj.company_id)
 
 
-class CustomerViewSet(BaseModelViewSet):
+class CustomerViewSet(AutocompleteMixin, ExportMixin, CompanyScopedViewSet):
     """
     ViewSet for managing customers.
     Users can only access customers from companies they are members of.
@@ -34,25 +49,28 @@ class CustomerViewSet(BaseModelViewSet):
     
     queryset = Customer.objects.select_related("company", "address").all()
     serializer_class = CustomerSerializer
-    
-    def get_queryset(self):
-        """Filter queryset to only include customers from companies the user is a member of (for list operations)."""
-        queryset = super().get_queryset()
-        
-        # For retrieve/update/destroy operations, allow all objects through
-        # and rely on object-level permissions
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
-            return queryset
-        
-        # Admin users can see all customers in list
-        if self.request.user.is_staff:
-            return queryset
-        
-        # Regular users can only see customers from their companies in list
-        company_ids = Company.objects.filter(
-            members__id=self.request.user.id
-        ).values_list("id", flat=True)
-        return queryset.filter(company_id__in=company_ids)
+    autocomplete_kind = CUSTOMERS
+    export_columns = [
+        ExportColumn("uuid", "uuid"),
+        ExportColumn("company", "company__uuid"),
+        ExportColumn("title", "title"),
+        ExportColumn("firstname", "firstname"),
+        ExportColumn("lastname", "lastname"),
+        ExportColumn("birthdate", "birthdate"),
+        ExportColumn("email", "email"),
+        ExportColumn("mobile_phone", "mobile_phone"),
+        ExportColumn("landline_phone", "landline_phone"),
+        ExportColumn("address_street", "address__street"),
+        ExportColumn("address_street_2", "address__street_2"),
+        ExportColumn("address_city", "address__city"),
+        ExportColumn("address_state", "address__state"),
+        ExportColumn("address_postal_code", "address__postal_code"),
+        ExportColumn("address_country", "address__country"),
+        ExportColumn("notes", "notes"),
+        ExportColumn("is_active", "is_active"),
+        ExportColumn("created_on", "created_on"),
+        ExportColumn("modified_on", "modified_on"),
+    ]
     
     def get_serializer_class(self):
         """Use lightweight serializer for list views."""
@@ -60,6 +78,14 @@ class CustomerViewSet(BaseModelViewSet):
             return CustomerListSerializer
         return CustomerSerializer
     
+    def get_list_queryset(self):
+        """Narrow the list to ?is_active=true|false in addition to the company."""
+        queryset = super().get_list_queryset()
+        is_active = self.request.query_params.get("is_active")
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active.lower() == "true")
+        return queryset
+    
     @extend_schema(
         description="List customers from companies the user is a member of.",
         parameters=[
@@ -81,25 +107,102 @@ class CustomerViewSet(BaseModelViewSet):
     @permission_classes([permissions.IsAuthenticated])
     def list(self, request: Request, *args, **kwargs):
         """List customers from companies the user is a member of."""
-        queryset = self.filter_queryset(self.get_queryset())
+        return super().list(request, *args, **kwargs)
+    
+    @extend_schema(
+        description=(
+            "Full-text search over the name, email, notes and address street and city of the customers "
+            "of the user's companies. Every term matches the start of a word, all terms must match. "
+            "Hits are ranked by relevance (name matches first) and carry a snippet of the best matching field."
+        ),
+        parameters=[CustomerSearchQuerySerializer],
+        responses=CustomerSearchResultSerializer(many=True),
+        operation_id="customers_search",
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    @permission_classes([permissions.IsAuthenticated])
+    def search(self, request: Request):
+        """Search customers of the user's companies."""
+        query = CustomerSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
         
-        # Optional filter by company UUID
-        company_uuid = request.query_params.get("company")
+        company_ids = None if request.user.is_staff else get_company_ids(request.user)
+        company_uuid = query.validated_data.get("company")
         if company_uuid:
-            queryset = queryset.filter(company__uuid=company_uuid)
+            company_id = Company.objects.filter(uuid=company_uuid).values_list("id", flat=True).first()
+            if company_ids is None:
+                company_ids = {company_id} if company_id else set()
+            else:
+                company_ids = company_ids & {company_id}
         
-        # Optional filter by active status
-        is_active = request.query_params.get("is_active")
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == "true")
+        hits = search_customers(query.validated_data["q"], company_ids, query.validated_data["limit"])
+        customers = Customer.objects.select_related("address").in_bulk([hit.customer_id for hit in hits])
+        results = []
+        for hit in hits:
+            customer = customers.get(hit.customer_id)
+            if customer is not None:
+                customer.score, customer.snippet = hit.score, hit.snippet
+                results.append(customer)
+        return Response(CustomerSearchResultSerializer(results, many=True).data)
+    
+    @extend_schema(
+        description=(
+            "Import customers from a UTF-8 CSV file in the columns of the customer export "
+            "(the key field's column is required, address_* columns form the address). "
+            "Every row is validated like a single customer creation; invalid rows are reported and skipped. "
+            "Rows whose key field matches a customer of the company or an earlier row are skipped, "
+            "so an import can be re-run safely. The response has one JSON line per batch with the "
+            "totals so far and the errors of the batch (row 1 is the first line after the header). "
+            "If the import stops early, the last line has a detail message instead, with status 500 "
+            "when a batch can't be saved; the batches before it stay imported."
+        ),
+        request={"multipart/form-data": CustomerImportSerializer},
+        responses={(200, NDJSONRenderer.media_type): OpenApiTypes.STR},
+        operation_id="customers_import",
+    )
+    @action(detail=False, methods=["post"], url_path="import", url_name="import", parser_classes=[MultiPartParser])
+    @permission_classes([permissions.IsAuthenticated])
+    def import_csv(self, request: Request):
+        """
+        Import customers from a CSV file.
+        User must be a member of the company the customers are imported into.
+        """
+        serializer = CustomerImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        company = Company.objects.filter(uuid=serializer.validated_data["company"]).first()
+        if company is None:
+            raise NotFound("Company not found.")
+        if not request.user.is_staff and not is_company_member(request.user, company):
+            raise PermissionDenied("You do not have permission to add customers to this company.")
+        
+        try:
+            rows = read_csv(serializer.validated_data["file"], serializer.validated_data["key"])
+        except ImportFileError as e:
+            raise ValidationError({"file": [str(e)]})
         
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        # The batches run inside the request, so its audit batch, routing and error handling cover
+        # every write; a batch that can't be saved ends the import with an explicit error line
+        lines = []
+        status_code = status.HTTP_200_OK
+        created = 0
+        try:
+            for batch in import_customers(rows, company, serializer.validated_data["key"]):
+                created = batch.created
+                lines.append(json.dumps(batch.as_dict()))
+        except (UnicodeDecodeError, csv.Error) as e:
+            lines.append(json.dumps({"detail": f"The import stopped, the file can't be read: {e}"}))
+        except DatabaseError as e:
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            lines.append(
+                json.dumps({"detail": f"The import stopped after {created} created customers, a batch can't be saved: {e}"})
+            )
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return HttpResponse(
+            "".join(line + "\n" for line in lines),
+            content_type=f"{NDJSONRenderer.media_type}; charset=utf-8",
+            status=status_code,
+        )
     
     @permission_classes([IsMemberOfCustomerCompany | permissions.IsAdminUser])
     def retrieve(self, request: Request, *args, **kwargs):
@@ -129,7 +232,7 @@ class CustomerViewSet(BaseModelViewSet):
         
         # Check if user is a member of the company (unless admin)
         if not request.user.is_staff:
-            if not company.members.filter(id=request.user.id).exists():
+            if not is_company_member(request.user, company):
                 return Response(
                     {"detail": "You do not have permission to add customers to this company."},
                     status=status.HTTP_403_FORBIDDEN
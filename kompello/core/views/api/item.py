@@ -4,18 +4,30 @@ ViewSet for Item model.
 
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, OpenApiExample, extend_schema, inline_serializer
 from rest_framework import permissions, status, serializers
-from rest_framework.decorators import permission_classes
+from rest_framework.decorators import action, permission_classes
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from kompello.app.config import CONFIG
 from kompello.core.models.billing_models import Item
 from kompello.core.models import Company
 from kompello.core.permissions import NoOne, IsMemberOfCompany
-from kompello.core.serializers.item_serializers import ItemSerializer, ItemListSerializer
-from kompello.core.views.api.base import BaseModelViewSet
+from kompello.core.serializers.item_serializers import (
+    ItemSerializer,
+    ItemListSerializer,
+    ItemBulkSerializer,
+    ItemBulkListSerializer,
+    ItemPriceUpdateSerializer,
+    ItemPriceUpdateResultSerializer,
+)
+from kompello.core.filters import CustomFieldFilter
+from kompello.core.autocomplete import ITEMS
+from kompello.core.membership import get_company_ids, is_company_member
+from kompello.core.export import ExportColumn
+from kompello.core.views.api.base import AutocompleteMixin, CompanyScopedViewSet, ExportMixin
 
 
-class ItemViewSet(BaseModelViewSet):
+class ItemViewSet(AutocompleteMixin, ExportMixin, CompanyScopedViewSet):
     """
     ViewSet for managing items.
     Users can only access items from companies they are members of.
@@ -24,27 +36,42 @@ class ItemViewSet(BaseModelViewSet):
     Custom fields are included in all responses and can be set during creation/updates.
     """
     
-    queryset = Item.objects.select_related("company", "currency", "unit").prefetch_related("custom_fields__custom_field").all()
+    # Custom fields are served from Item.custom_fields_cache, so the generic relation is not prefetched
+    queryset = Item.objects.select_related("company", "currency", "unit").all()
     serializer_class = ItemSerializer
+    autocomplete_kind = ITEMS
+    # The custom field values are appended to the export from custom_fields_cache
+    export_columns = [
+        ExportColumn("uuid", "uuid"),
+        ExportColumn("company", "company__uuid"),
+        ExportColumn("name", "name"),
+        ExportColumn("description", "description"),
+        ExportColumn("currency", "currency__uuid"),
+        ExportColumn("currency_short_name", "currency__short_name"),
+        ExportColumn("unit", "unit__uuid"),
+        ExportColumn("unit_short_name", "unit__short_name"),
+        ExportColumn("price_per_unit", "price_per_unit"),
+        ExportColumn("price_max", "price_max"),
+        ExportColumn("created_on", "created_on"),
+        ExportColumn("modified_on", "modified_on"),
+    ]
+    filter_backends = [CustomFieldFilter]
+    ordering_fields = ["name", "price_per_unit", "created_on", "modified_on"]
+    bulk_max_size = CONFIG.get("API_BULK_MAX_SIZE", 10000)
     
     def get_queryset(self):
-        """Filter queryset to only include items from companies the user is a member of."""
+        """
+        Skip loading the cached custom field values when the list response doesn't include them,
+        and load the companies of currency and unit along with the item for single item responses.
+        """
         queryset = super().get_queryset()
-        
-        # For retrieve/update/destroy operations, allow all objects through
-        # and rely on object-level permissions
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
-            return queryset
-        
-        # Admin users can see all items in list
-        if self.request.user.is_staff:
-            return queryset
-        
-        # Regular users can only see items from their companies in list
-        company_ids = Company.objects.filter(
-            members__id=self.request.user.id
-        ).values_list("id", flat=True)
-        return queryset.filter(company_id__in=company_ids)
+        requested = self.get_includes().union(self.get_sparse_fields() or [])
+        if self.action == "list" and "custom_fields" not in requested:
+            queryset = queryset.defer("custom_fields_cache")
+        elif self.action in ("retrieve", "update", "partial_update"):
+            # currency_details and unit_details show the UUID of their company
+            queryset = queryset.select_related("currency__company", "unit__company")
+        return queryset
     
     def get_serializer_class(self):
         """Use lightweight serializer for list views."""
@@ -61,26 +88,39 @@ class ItemViewSet(BaseModelViewSet):
                 description="Filter items by company UUID.",
                 required=False,
             ),
+            OpenApiParameter(
+                name="include",
+                type=OpenApiTypes.STR,
+                description="Set to custom_fields to include the custom field values of every item.",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="cf.<key>",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Filter items by a custom field value, e.g. cf.skill_level=Senior. "
+                    "Append __gt, __gte, __lt or __lte for ranges (text and number fields) "
+                    "or __icontains for text search (e.g. cf.max_hours__gte=40)."
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="ordering",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Comma separated sort fields, prefix with - for descending order. "
+                    "Supports name, price_per_unit, created_on, modified_on and cf.<key> for custom fields "
+                    "(items without a value come first)."
+                ),
+                required=False,
+            ),
         ],
         responses=ItemListSerializer(many=True),
     )
     @permission_classes([permissions.IsAuthenticated])
     def list(self, request: Request, *args, **kwargs):
         """List items from companies the user is a member of."""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Optional filter by company UUID
-        company_uuid = request.query_params.get("company")
-        if company_uuid:
-            queryset = queryset.filter(company__uuid=company_uuid)
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
     
     @extend_schema(
         description=(
@@ -161,7 +201,7 @@ class ItemViewSet(BaseModelViewSet):
         
         # Check if user is a member of the company (unless admin)
         if not request.user.is_staff:
-            if not company.members.filter(id=request.user.id).exists():
+            if not is_company_member(request.user, company):
                 return Response(
                     {"detail": "You do not have permission to add items to this company."},
                     status=status.HTTP_403_FORBIDDEN
@@ -169,6 +209,64 @@ class ItemViewSet(BaseModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
+    @extend_schema(
+        description=(
+            "Create many items at once. "
+            "Every row is validated like a single item creation before anything is written; "
+            "if any row is invalid nothing is created and the response contains one error object per row "
+            "(empty for valid rows). All items and their custom field values are inserted in one transaction."
+        ),
+        request=ItemSerializer(many=True),
+        responses={201: ItemListSerializer(many=True)},
+        operation_id="items_bulk_create",
+    )
+    @action(detail=False, methods=["post"])
+    @permission_classes([permissions.IsAuthenticated])
+    def bulk(self, request: Request):
+        """
+        Create many items at once.
+        User must be a member of the company of every item.
+        """
+        context = self.get_serializer_context()
+        if isinstance(request.data, list):
+            context.update(ItemBulkListSerializer.preload(request.data))
+        context["company_ids"] = None if request.user.is_staff else get_company_ids(request.user)
+
+        serializer = ItemBulkSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=self.bulk_max_size,
+            context=context,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.save()
+        return Response(ItemListSerializer(items, many=True).data, status=status.HTTP_201_CREATED)
+    
+    @extend_schema(
+        description=(
+            "Update the prices of all items matching the given filters with a single SQL UPDATE. "
+            "The company filter is required unless the items are selected by uuids. "
+            "Set an absolute price, change prices by a percentage and/or round them to an increment. "
+            "Only items from companies the user is a member of are affected. "
+            "Every changed price is recorded in the item's history."
+        ),
+        request=ItemPriceUpdateSerializer,
+        responses={200: ItemPriceUpdateResultSerializer},
+        operation_id="items_price_update",
+    )
+    @action(detail=False, methods=["post"])
+    @permission_classes([permissions.IsAuthenticated])
+    def price_update(self, request: Request):
+        """Update the prices of many items at once."""
+        serializer = ItemPriceUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # get_queryset limits the update to the user's companies
+        updated = serializer.update_prices(self.get_queryset())
+        return Response(ItemPriceUpdateResultSerializer({"updated": updated}).data)
+    
     @extend_schema(
         description=(
             "Update an existing item. "
@@ -12,10 +12,11 @@ from kompello.core.models.billing_models import Unit
 from kompello.core.models import Company
 from kompello.core.permissions import NoOne, IsMemberOfCompany
 from kompello.core.serializers.unit_serializers import UnitSerializer
-from kompello.core.views.api.base import BaseModelViewSet
+from kompello.core.membership import is_company_member
+from kompello.core.views.api.base import CompanyScopedViewSet, ResponseCacheMixin
 
 
-class UnitViewSet(BaseModelViewSet):
+class UnitViewSet(ResponseCacheMixin, CompanyScopedViewSet):
     """
     ViewSet for managing units.
     Users can only access units from companies they are members of.
@@ -24,25 +25,6 @@ class UnitViewSet(BaseModelViewSet):
     queryset = Unit.objects.select_related("company").all()
     serializer_class = UnitSerializer
     
-    def get_queryset(self):
-        """Filter queryset to only include units from companies the user is a member of."""
-        queryset = super().get_queryset()
-        
-        # For retrieve/update/destroy operations, allow all objects through
-        # and rely on object-level permissions
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
-            return queryset
-        
-        # Admin users can see all units in list
-        if self.request.user.is_staff:
-            return queryset
-        
-        # Regular users can only see units from their companies in list
-        company_ids = Company.objects.filter(
-            members__id=self.request.user.id
-        ).values_list("id", flat=True)
-        return queryset.filter(company_id__in=company_ids)
-    
     @extend_schema(
         description="List units from companies the user is a member of.",
         parameters=[
@@ -58,20 +40,7 @@ class UnitViewSet(BaseModelViewSet):
     @permission_classes([permissions.IsAuthenticated])
     def list(self, request: Request, *args, **kwargs):
         """List units from companies the user is a member of."""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Optional filter by company UUID
-        company_uuid = request.query_params.get("company")
-        if company_uuid:
-            queryset = queryset.filter(company__uuid=company_uuid)
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
     
     @extend_schema(
         description="Retrieve a specific unit by UUID.",
@@ -110,7 +79,7 @@ class UnitViewSet(BaseModelViewSet):
         
         # Check if user is a member of the company (unless admin)
         if not request.user.is_staff:
-            if not company.members.filter(id=request.user.id).exists():
+            if not is_company_member(request.user, company):
                 return Response(
                     {"detail": "You do not have permission to add units to this company."},
                     status=status.HTTP_403_FORBIDDEN